@@ -0,0 +1,353 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import Counter
+
+import web3
+from eth_account import Account
+from web3 import AsyncWeb3, Web3
+
+from catalyst.allowances import AllowanceCache
+from catalyst.batching import MULTICALL3_ADDRESS
+from catalyst.chunking import to_base_units
+from catalyst.contracts import (
+    CHAIN_ID,
+    DISTRIBUTOR_ADDRESS,
+    KNOWN_TOKENS,
+    NATIVE_TOKEN,
+    ROUTER_OPTIONS,
+    USDC_ADDRESS,
+    USDT_ADDRESS,
+    WMON_ADDRESS,
+)
+from catalyst.engine import Engine
+from catalyst.token_registry import TokenRegistry
+
+SOLC_VERSION = "0.8.24"
+CONTRACTS_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solidity", "StandIns.sol")
+# Well-known anvil dev accounts 0 and 1: the deployer and the benchmarked wallet
+DEPLOYER_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+WALLET_KEY = "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d"
+ANVIL_PORT = 8545
+TOKEN_SUPPLY = 10**30
+ROUTER_MON_BALANCE = 10**24
+# Pool reserves per router, in whole tokens, so each router quotes a slightly different price
+POOL_DEPTH = [1_000_000, 900_000, 1_100_000, 950_000]
+SWAP_PAIRS = [
+    (NATIVE_TOKEN, USDT_ADDRESS, "0.01"),
+    (USDT_ADDRESS, USDC_ADDRESS, "5"),
+    (USDC_ADDRESS, NATIVE_TOKEN, "5"),
+    (NATIVE_TOKEN, WMON_ADDRESS, "0.01")
+]
+TOKEN_INFO = {token["address"]: token for token in KNOWN_TOKENS}
+
+
+def compile_stand_ins():
+    try:
+        import solcx
+    except ImportError:
+        raise Exception("The benchmark compiles its stand-in contracts with py-solc-x: pip install py-solc-x")
+    if SOLC_VERSION not in [str(version) for version in solcx.get_installed_solc_versions()]:
+        solcx.install_solc(SOLC_VERSION)
+    compiled = solcx.compile_files([CONTRACTS_SOURCE], output_values=["abi", "bin"], solc_version=SOLC_VERSION)
+    return {name.split(":")[-1]: artifact for name, artifact in compiled.items()}
+
+
+def start_anvil(port):
+    if shutil.which("anvil") is None:
+        raise Exception("anvil not found; install Foundry or pass --rpc-url of a running dev node")
+    process = subprocess.Popen(
+        ["anvil", "--chain-id", str(CHAIN_ID), "--port", str(port), "--silent"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+class RpcCounter:
+    """Counts HTTP round-trips (a JSON-RPC batch is one) and calls per method made through a provider."""
+
+    def __init__(self, provider):
+        self.round_trips = 0
+        self.methods = Counter()
+        make_request = provider.make_request
+        make_batch_request = provider.make_batch_request
+
+        async def counted_request(method, params):
+            self.round_trips += 1
+            self.methods[method] += 1
+            return await make_request(method, params)
+
+        async def counted_batch_request(requests):
+            self.round_trips += 1
+            for method, _ in requests:
+                self.methods[method] += 1
+            return await make_batch_request(requests)
+
+        provider.make_request = counted_request
+        provider.make_batch_request = counted_batch_request
+
+
+class DevChain:
+    """Stand-in contracts placed at the real Monad testnet addresses on a local dev node.
+
+    Each contract is deployed once and its runtime code copied to every
+    address that needs it with anvil_setCode, so the Engine runs against
+    the local node without any change to its addresses.
+    """
+
+    def __init__(self, rpc_url):
+        self.w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(rpc_url))
+        self.deployer = Account.from_key(DEPLOYER_KEY).address
+        self.artifacts = compile_stand_ins()
+
+    async def rpc(self, method, params):
+        response = await self.w3.provider.make_request(method, params)
+        if "error" in response:
+            raise Exception(f"{method} failed: {response['error']}")
+        return response.get("result")
+
+    async def transact(self, function):
+        tx_hash = await function.transact({"from": self.deployer})
+        receipt = await self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        if receipt.status != 1:
+            raise Exception(f"Setup transaction {tx_hash.hex()} reverted")
+
+    def contract(self, name, address):
+        return self.w3.eth.contract(address=address, abi=self.artifacts[name]["abi"])
+
+    async def place(self, name, addresses, *args):
+        artifact = self.artifacts[name]
+        factory = self.w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bin"])
+        tx_hash = await factory.constructor(*args).transact({"from": self.deployer})
+        receipt = await self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        code = Web3.to_hex(await self.w3.eth.get_code(receipt.contractAddress))
+        for address in addresses:
+            await self.rpc("anvil_setCode", [address, code])
+
+    async def setup(self, wallet):
+        if await self.w3.eth.chain_id != CHAIN_ID:
+            raise Exception(f"The dev node must run with --chain-id {CHAIN_ID}")
+        routers = [address for _, address in ROUTER_OPTIONS.values()]
+        await self.rpc("evm_setAutomine", [True])
+        await self.place("StandInToken", [USDT_ADDRESS, USDC_ADDRESS], 6)
+        await self.place("StandInWMON", [WMON_ADDRESS])
+        await self.place("StandInRouter", routers, WMON_ADDRESS)
+        await self.place("StandInDistributor", [DISTRIBUTOR_ADDRESS])
+        await self.place("StandInMulticall3", [MULTICALL3_ADDRESS])
+
+        for token in (USDT_ADDRESS, USDC_ADDRESS):
+            minter = self.contract("StandInToken", token).functions.mint
+            for holder in [wallet, DISTRIBUTOR_ADDRESS] + routers:
+                await self.transact(minter(holder, TOKEN_SUPPLY))
+        for router, depth in zip(routers, POOL_DEPTH):
+            await self.rpc("anvil_setBalance", [router, hex(ROUTER_MON_BALANCE)])
+            set_reserves = self.contract("StandInRouter", router).functions.setReserves
+            await self.transact(set_reserves(WMON_ADDRESS, USDT_ADDRESS, depth * 10**18, depth * 4 * 10**6))
+            await self.transact(set_reserves(WMON_ADDRESS, USDC_ADDRESS, depth * 10**18, depth * 4 * 10**6))
+            await self.transact(set_reserves(USDT_ADDRESS, USDC_ADDRESS, depth * 10**6, depth * 10**6))
+        await self.rpc("anvil_setBalance", [DISTRIBUTOR_ADDRESS, hex(ROUTER_MON_BALANCE)])
+
+    async def mine_every(self, block_time):
+        """Switch from instant mining to fixed-interval blocks, which is closer to a real chain."""
+        if block_time > 0:
+            await self.rpc("evm_setAutomine", [False])
+            await self.rpc("evm_setIntervalMining", [block_time])
+
+
+class Benchmark:
+    def __init__(self, engine, counter):
+        self.engine = engine
+        self.counter = counter
+        self.results = []
+
+    async def gas_used(self, tx_hashes):
+        receipts = await asyncio.gather(*(self.engine.w3.eth.get_transaction_receipt(tx_hash) for tx_hash in tx_hashes))
+        return sum(receipt.gasUsed for receipt in receipts)
+
+    async def measure(self, name, operations, details):
+        """Run `operations` (coroutine factories) concurrently and record throughput, latency, RPC calls and gas.
+
+        Every operation returns (successes, tx_hashes) for the transactions it sent.
+        """
+        latencies = []
+        sent = []
+
+        async def timed(operation):
+            started = time.perf_counter()
+            result = await operation()
+            latencies.append(time.perf_counter() - started)
+            return result
+
+        round_trips = self.counter.round_trips
+        methods = Counter(self.counter.methods)
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(timed(operation) for operation in operations), return_exceptions=True)
+        seconds = time.perf_counter() - started
+        calls = self.counter.round_trips - round_trips
+        method_calls = self.counter.methods - methods
+
+        errors = [str(outcome) for outcome in outcomes if isinstance(outcome, Exception)]
+        successes = 0
+        for outcome in outcomes:
+            if not isinstance(outcome, Exception):
+                successes += sum(outcome[0])
+                sent.extend(outcome[1])
+        result = {
+            "benchmark": name,
+            **details,
+            "operations": len(operations),
+            "transactions": len(sent),
+            "successful_transactions": successes,
+            "errors": errors[:5],
+            "seconds": round(seconds, 3),
+            "transactions_per_second": round(len(sent) / seconds, 2) if seconds else None,
+            "rpc_round_trips": calls,
+            "rpc_round_trips_per_operation": round(calls / len(operations), 2),
+            "rpc_methods": dict(method_calls),
+            "latency_p50": percentile(latencies, 50),
+            "latency_p99": percentile(latencies, 99),
+            "gas_used": await self.gas_used(sent) if sent else 0
+        }
+        self.results.append(result)
+        print(
+            f"{name} {details}: {len(sent)} tx in {result['seconds']}s "
+            f"({result['transactions_per_second']} tx/s, {result['rpc_round_trips_per_operation']} RPC/op, "
+            f"p50 {result['latency_p50']:.3f}s, p99 {result['latency_p99']:.3f}s)" if latencies else f"{name} {details}: failed"
+        )
+
+    async def distribution(self, token_address, recipient_count, repeats):
+        token_info = TOKEN_INFO[token_address]
+
+        def operation():
+            recipients = [Web3.to_checksum_address(os.urandom(20)) for _ in range(recipient_count)]
+
+            async def run():
+                chunks = await self.engine.distribute_tokens(token_info, "1", recipients)
+                return [success for success, _, _ in chunks], [tx_hash for _, tx_hash, _ in chunks]
+            return run
+
+        # Repeats run one after another so each one measures a full distribution
+        for repeat in range(repeats):
+            await self.measure("distribute_tokens", [operation()], {
+                "token": token_info["symbol"], "recipients": recipient_count, "repeat": repeat
+            })
+
+    async def withdrawals(self, token_address, count):
+        token_info = TOKEN_INFO[token_address]
+
+        async def run():
+            success, tx_hash = await self.engine.withdraw_tokens(token_info, "0.001")
+            return [success], [tx_hash]
+
+        await self.measure("withdraw_tokens", [run for _ in range(count)], {"token": token_info["symbol"]})
+
+    async def swap_burst(self, count, slippage_bps):
+        decimals = {address: info["decimals"] for address, info in TOKEN_INFO.items()}
+
+        def operation(from_token, to_token, amount):
+            async def run():
+                success, tx_hash, _ = await self.engine.best_swap(
+                    from_token, to_token, to_base_units(amount, decimals[from_token]), slippage_bps
+                )
+                return [success], [tx_hash]
+            return run
+
+        await self.measure("swap_burst", [operation(*SWAP_PAIRS[i % len(SWAP_PAIRS)]) for i in range(count)], {
+            "swaps": count, "max_in_flight": self.engine.max_in_flight
+        })
+
+
+async def run(args):
+    anvil = None
+    rpc_url = args.rpc_url
+    if rpc_url is None:
+        anvil, rpc_url = start_anvil(args.port)
+    state_dir = tempfile.mkdtemp(prefix="catalyst-bench-")
+    try:
+        chain = DevChain(rpc_url)
+        for _ in range(50):
+            if await chain.w3.is_connected():
+                break
+            await asyncio.sleep(0.2)
+        engine = Engine(WALLET_KEY, rpc_urls=[rpc_url], max_in_flight=args.max_in_flight)
+        # Keep allowance and token caches of the dev chain away from the real ones
+        engine.allowances = AllowanceCache(CHAIN_ID, os.path.join(state_dir, "allowances.json"))
+        engine.registry = TokenRegistry(CHAIN_ID, os.path.join(state_dir, "tokens.json"))
+        counter = RpcCounter(engine.w3.provider)
+
+        print("Deploying stand-in contracts...")
+        await chain.setup(engine.address)
+        await chain.mine_every(args.block_time)
+        await engine.connect()
+        bench = Benchmark(engine, counter)
+        try:
+            for size in args.sizes:
+                for token in (NATIVE_TOKEN, USDT_ADDRESS):
+                    await bench.distribution(token, size, args.repeats)
+            for token in (NATIVE_TOKEN, USDT_ADDRESS):
+                await bench.withdrawals(token, args.withdrawals)
+            for count in args.swaps:
+                await bench.swap_burst(count, args.slippage_bps)
+        finally:
+            await engine.close()
+
+        report = {
+            "commit": git_commit(),
+            "timestamp": int(time.time()),
+            "web3": web3.__version__,
+            "block_time": args.block_time,
+            "max_in_flight": args.max_in_flight,
+            "results": bench.results
+        }
+        output = args.output or f"benchmark-{report['commit']}.json"
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {output}")
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+        if anvil is not None:
+            anvil.terminate()
+            anvil.wait()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark distributions, withdrawals and swaps on a local dev chain")
+    parser.add_argument("--rpc-url", help="Use an already running anvil node instead of starting one")
+    parser.add_argument("--port", type=int, default=ANVIL_PORT, help="Port for the anvil node started by the benchmark")
+    parser.add_argument("--block-time", type=int, default=1, help="Seconds between blocks (0 mines every transaction at once)")
+    parser.add_argument("--sizes", type=lambda text: [int(size) for size in text.split(",")], default=[10, 100, 1000, 10000],
+                        help="Recipient counts to distribute to, comma-separated")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per distribution size")
+    parser.add_argument("--withdrawals", type=int, default=20, help="Concurrent withdrawTokens calls per token")
+    parser.add_argument("--swaps", type=lambda text: [int(count) for count in text.split(",")], default=[10, 100],
+                        help="Swap burst sizes, comma-separated")
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--slippage-bps", type=int, default=50)
+    parser.add_argument("--output", help="Result file (default: benchmark-<commit>.json)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
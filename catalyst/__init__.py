@@ -0,0 +1,25 @@
+"""Swaps and token distributions on the Monad testnet.
+
+Names are imported from their submodule on first access, so importing the
+package is cheap and nothing talks to a node until an operation runs.
+"""
+from importlib import import_module
+
+_EXPORTS = {
+    "Catalyst": "client",
+    "Engine": "engine",
+    "Journal": "journal",
+    "Reverted": "preflight",
+    "WalletPool": "wallet_pool",
+    "load_settings": "config",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
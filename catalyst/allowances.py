@@ -0,0 +1,52 @@
+import json
+import os
+
+ALLOWANCE_CACHE_PATH = "allowances.json"
+
+# Routers only ever get approved for 2**256 - 1, and tokens that decrement
+# even infinite allowances stay far above this
+INFINITE_ALLOWANCE = 2**255
+
+
+class AllowanceCache:
+    """On-disk record of (token, owner, spender) triples known to have an infinite allowance.
+
+    Entries are kept per chain ID. A cached entry lets a swap skip both the
+    allowance read and the approval; entries are dropped again when a
+    transaction relying on them fails.
+    """
+
+    def __init__(self, chain_id, path=ALLOWANCE_CACHE_PATH):
+        self.chain_id = str(chain_id)
+        self.path = path
+        self._data = {}
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                self._data = json.load(file)
+        self._known = set(self._data.get(self.chain_id, []))
+
+    @staticmethod
+    def _key(token, owner, spender):
+        return f"{token}:{owner}:{spender}".lower()
+
+    def is_infinite(self, token, owner, spender):
+        return self._key(token, owner, spender) in self._known
+
+    def remember(self, token, owner, spender):
+        key = self._key(token, owner, spender)
+        if key not in self._known:
+            self._known.add(key)
+            self._save()
+
+    def forget(self, token, owner, spender):
+        key = self._key(token, owner, spender)
+        if key in self._known:
+            self._known.discard(key)
+            self._save()
+
+    def _save(self):
+        self._data[self.chain_id] = sorted(self._known)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self._data, file, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import time
+
+from web3 import Web3
+
+from .batching import async_read_balances, async_rpc_batch
+from .contracts import is_native
+from .poller import Poller
+
+BALANCE_CHECKPOINT_PATH = "balances.json"
+
+TRANSFER_TOPIC = Web3.to_hex(Web3.keccak(text="Transfer(address,address,uint256)"))
+# WMON-style wrap and unwrap, which move balances without a Transfer log
+DEPOSIT_TOPIC = Web3.to_hex(Web3.keccak(text="Deposit(address,uint256)"))
+WITHDRAWAL_TOPIC = Web3.to_hex(Web3.keccak(text="Withdrawal(address,uint256)"))
+
+DEFAULT_POLL_SECONDS = 1
+# Local balances are only used while the last successful poll is at most this old
+MAX_STALENESS_SECONDS = 5
+# Widest eth_getLogs range asked for at once
+MAX_LOG_BLOCKS = 100
+# After a longer gap, e.g. an old checkpoint, balances are read again instead of replayed from logs
+MAX_REPLAY_BLOCKS = 10000
+# Minimum time between checkpoint writes, in seconds
+CHECKPOINT_SECONDS = 30
+
+
+def _topic(address):
+    return "0x" + "0" * 24 + address[2:].lower()
+
+
+def _address(topic):
+    return Web3.to_checksum_address("0x" + topic[-40:])
+
+
+class BalanceTracker:
+    """Token balances of many holders, kept current from event logs instead of being read again.
+
+    A (holder, token) pair is read once, when it is first tracked, at the
+    block the logs have been applied up to. Every poll then fetches the
+    Transfer logs from and to the holders, and the Deposit and Withdrawal
+    logs of WMON-style tokens, for the new blocks and applies them, so a
+    balance check is a dictionary lookup. Native MON moves without logs,
+    so native balances are read again with eth_getBalance in the same
+    JSON-RPC batch. The snapshot and its block are checkpointed to disk,
+    and after a restart only the logs since the checkpoint are replayed.
+    """
+
+    def __init__(self, w3, chain_id, path=BALANCE_CHECKPOINT_PATH, poll_seconds=DEFAULT_POLL_SECONDS):
+        self.w3 = w3
+        self.chain_id = str(chain_id)
+        self.path = path
+        self._balances = {}
+        self._last_block = None
+        self._synced_at = None
+        self._saved_at = 0
+        self._dirty = False
+        self._lock = asyncio.Lock()
+        self._poller = Poller(self.poll, poll_seconds)
+
+    @property
+    def fresh(self):
+        return self._synced_at is not None and time.monotonic() - self._synced_at <= MAX_STALENESS_SECONDS
+
+    @property
+    def block(self):
+        """Block the snapshot is current as of."""
+        return self._last_block
+
+    def load(self):
+        """Restore the checkpoint of this chain, if any; the next poll replays the blocks since."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as file:
+            checkpoint = json.load(file).get(self.chain_id)
+        if checkpoint:
+            self._last_block = checkpoint["block"]
+            self._balances = {
+                tuple(key.split(":")): int(balance) for key, balance in checkpoint["balances"].items()
+            }
+
+    def save(self):
+        if self._last_block is None:
+            return
+        data = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        data[self.chain_id] = {
+            "block": self._last_block,
+            "balances": {f"{holder}:{token}": str(balance) for (holder, token), balance in self._balances.items()}
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(data, file, indent=2)
+        os.replace(tmp_path, self.path)
+        self._saved_at = time.monotonic()
+        self._dirty = False
+
+    def balance(self, holder, token):
+        """Tracked balance, or None if the pair is not tracked."""
+        return self._balances.get((Web3.to_checksum_address(holder), Web3.to_checksum_address(token)))
+
+    def snapshot(self):
+        """{holder: {token: balance}} for everything tracked, as of `block`."""
+        portfolio = {}
+        for (holder, token), balance in self._balances.items():
+            portfolio.setdefault(holder, {})[token] = balance
+        return portfolio
+
+    async def get(self, holders, tokens):
+        """{(holder, token): balance} for every pair, tracking new ones first; None while the snapshot is stale."""
+        if not self.fresh:
+            return None
+        pairs = [(holder, token) for holder in holders for token in tokens]
+        keys = [(Web3.to_checksum_address(holder), Web3.to_checksum_address(token)) for holder, token in pairs]
+        if any(key not in self._balances for key in keys):
+            await self.track(holders, tokens)
+        return {pair: self._balances[key] for pair, key in zip(pairs, keys)}
+
+    async def track(self, holders, tokens):
+        """Start following every holder x token pair that is not tracked yet."""
+        async with self._lock:
+            if not self.fresh:
+                await self._poll()
+            holders = [Web3.to_checksum_address(holder) for holder in holders]
+            tokens = [Web3.to_checksum_address(token) for token in tokens]
+            pairs = [(holder, token) for holder in holders for token in tokens if (holder, token) not in self._balances]
+            if not pairs:
+                return
+            # Read at the block the logs are applied up to, so the next poll neither misses nor repeats a transfer
+            balances = await async_read_balances(
+                self.w3, list(dict.fromkeys(holder for holder, _ in pairs)),
+                list(dict.fromkeys(token for _, token in pairs)), self._last_block
+            )
+            for pair in pairs:
+                self._balances[pair] = balances[pair]
+            self._dirty = True
+
+    async def poll(self):
+        """Apply the logs of every block since the last poll and read native balances again."""
+        async with self._lock:
+            await self._poll()
+
+    async def _poll(self):
+        head = await self.w3.eth.block_number
+        if self._last_block is None or head - self._last_block > MAX_REPLAY_BLOCKS:
+            await self._reload(head)
+        while self._last_block < head:
+            end = min(self._last_block + MAX_LOG_BLOCKS, head)
+            requests = self._log_requests(self._last_block + 1, end)
+            natives = [pair for pair in self._balances if is_native(pair[1])] if end == head else []
+            requests += [("eth_getBalance", [holder, hex(end)]) for holder, _ in natives]
+            results = await async_rpc_batch(self.w3, requests)
+            if any(result is None for result in results):
+                raise Exception(f"Could not read logs and balances up to block {end}")
+            logs = results[:len(results) - len(natives)]
+            self._apply([log for batch in logs for log in batch])
+            for pair, balance in zip(natives, results[len(logs):]):
+                if self._balances[pair] != int(balance, 16):
+                    self._balances[pair] = int(balance, 16)
+                    self._dirty = True
+            self._last_block = end
+        self._synced_at = time.monotonic()
+        if self._dirty and time.monotonic() - self._saved_at >= CHECKPOINT_SECONDS:
+            self.save()
+
+    async def _reload(self, head):
+        holders = list(dict.fromkeys(holder for holder, _ in self._balances))
+        tokens = list(dict.fromkeys(token for _, token in self._balances))
+        balances = await async_read_balances(self.w3, holders, tokens, head) if self._balances else {}
+        self._balances = {pair: balances[pair] for pair in self._balances}
+        self._last_block = head
+        self._dirty = True
+
+    def _log_requests(self, start, end):
+        tokens = sorted({token for _, token in self._balances if not is_native(token)})
+        if not tokens:
+            return []
+        holders = sorted({_topic(holder) for holder, token in self._balances if not is_native(token)})
+        query = {"fromBlock": hex(start), "toBlock": hex(end), "address": tokens}
+        # The first topic is the sender of a Transfer and the holder of a Deposit or Withdrawal, the second the receiver
+        return [
+            ("eth_getLogs", [dict(query, topics=[[TRANSFER_TOPIC, DEPOSIT_TOPIC, WITHDRAWAL_TOPIC], holders])]),
+            ("eth_getLogs", [dict(query, topics=[TRANSFER_TOPIC, None, holders])])
+        ]
+
+    def _apply(self, logs):
+        seen = set()
+        for log in logs:
+            # A transfer between two tracked holders matches both queries
+            key = (log["transactionHash"], log["logIndex"])
+            topics = log["topics"]
+            if key in seen or log.get("removed") or len(topics) < 2 or len(log["data"]) < 66:
+                continue
+            seen.add(key)
+            token = Web3.to_checksum_address(log["address"])
+            amount = int(log["data"][2:66], 16)
+            if topics[0] == TRANSFER_TOPIC and len(topics) == 3:
+                self._add(_address(topics[1]), token, -amount)
+                self._add(_address(topics[2]), token, amount)
+            elif topics[0] == DEPOSIT_TOPIC:
+                self._add(_address(topics[1]), token, amount)
+            elif topics[0] == WITHDRAWAL_TOPIC:
+                self._add(_address(topics[1]), token, -amount)
+
+    def _add(self, holder, token, amount):
+        key = (holder, token)
+        if key in self._balances:
+            self._balances[key] += amount
+            self._dirty = True
+
+    def start(self):
+        self._poller.start()
+
+    async def stop(self):
+        await self._poller.stop()
+        if self._dirty:
+            self.save()
@@ -0,0 +1,187 @@
+from eth_abi import decode, encode
+from web3 import Web3
+
+from .contracts import is_native
+
+# Multicall3 is deployed at the same address on every EVM chain, Monad testnet included
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+
+def selector(signature):
+    return Web3.keccak(text=signature)[:4]
+
+
+def encode_call(signature, types=(), args=()):
+    """ABI-encode a call to `signature` without building a contract object."""
+    return selector(signature) + encode(list(types), list(args))
+
+
+BALANCE_OF = selector("balanceOf(address)")
+ALLOWANCE = selector("allowance(address,address)")
+DECIMALS = selector("decimals()")
+SYMBOL = selector("symbol()")
+NAME = selector("name()")
+GET_ETH_BALANCE = selector("getEthBalance(address)")
+
+
+class Read:
+    """A single read for `async_batch_read`.
+
+    `target`/`data` describe the eth_call; native balances are expressed as a
+    call to Multicall3's getEthBalance so they fit in the same aggregate3
+    call, with `holder` kept around for the eth_getBalance fallback.
+    """
+
+    def __init__(self, target, data, output_type="uint256", holder=None):
+        self.target = target
+        self.data = data
+        self.output_type = output_type
+        self.holder = holder
+
+
+def balance_read(holder, token):
+    holder = Web3.to_checksum_address(holder)
+    if is_native(token):
+        data = GET_ETH_BALANCE + encode(["address"], [holder])
+        return Read(MULTICALL3_ADDRESS, data, holder=holder)
+    data = BALANCE_OF + encode(["address"], [holder])
+    return Read(Web3.to_checksum_address(token), data)
+
+
+def allowance_read(token, owner, spender):
+    data = ALLOWANCE + encode(["address", "address"], [Web3.to_checksum_address(owner), Web3.to_checksum_address(spender)])
+    return Read(Web3.to_checksum_address(token), data)
+
+
+def decimals_read(token):
+    return Read(Web3.to_checksum_address(token), DECIMALS, output_type="uint8")
+
+
+def symbol_read(token):
+    return Read(Web3.to_checksum_address(token), SYMBOL, output_type="string")
+
+
+def name_read(token):
+    return Read(Web3.to_checksum_address(token), NAME, output_type="string")
+
+
+def _decode(read, success, data):
+    if not success or not data:
+        return None
+    if read.output_type == "string" and len(data) == 32:
+        # Some older tokens (MKR-style) return bytes32 instead of string
+        return data.rstrip(b"\x00").decode("utf-8", errors="replace")
+    return decode([read.output_type], data)[0]
+
+
+async def async_aggregate3(w3, reads, block="latest"):
+    multicall = w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    results = await multicall.functions.aggregate3([(read.target, True, read.data) for read in reads]).call(
+        block_identifier=block
+    )
+    return [_decode(read, success, data) for read, (success, data) in zip(reads, results)]
+
+
+async def async_rpc_batch(w3, requests):
+    """Send `requests` as one JSON-RPC batch and return the results in order.
+
+    Failed entries come back as None; a failure of the whole batch raises.
+    """
+    if not requests:
+        return []
+    responses = await w3.provider.make_batch_request(requests)
+    if isinstance(responses, dict):
+        raise Exception(f"Batch request failed: {responses.get('error')}")
+    return [response.get("result") for response in responses]
+
+
+def _read_requests(reads, block="latest"):
+    if isinstance(block, int):
+        block = hex(block)
+    requests = []
+    for read in reads:
+        if read.holder is not None:
+            requests.append(("eth_getBalance", [read.holder, block]))
+        else:
+            call = {"to": read.target, "data": Web3.to_hex(read.data)}
+            requests.append(("eth_call", [call, block]))
+    return requests
+
+
+def _decode_read_results(reads, results):
+    values = []
+    for read, result in zip(reads, results):
+        if result is None:
+            values.append(None)
+        elif read.holder is not None:
+            values.append(int(result, 16))
+        else:
+            values.append(_decode(read, True, Web3.to_bytes(hexstr=result)))
+    return values
+
+
+async def async_batch_read(w3, reads, block="latest"):
+    """Resolve every read in one round-trip; `block` is a block number or tag to read at.
+
+    Uses a single Multicall3 aggregate3 call, falling back to one JSON-RPC
+    batch request on chains or nodes where Multicall3 is unavailable. Reads
+    that revert come back as None.
+    """
+    if not reads:
+        return []
+    try:
+        return await async_aggregate3(w3, reads, block)
+    except Exception:
+        return _decode_read_results(reads, await async_rpc_batch(w3, _read_requests(reads, block)))
+
+
+async def async_read_balances(w3, holders, tokens, block="latest"):
+    """Return {(holder, token): balance_wei} for every holder x token pair."""
+    pairs = [(holder, token) for holder in holders for token in tokens]
+    values = await async_batch_read(w3, [balance_read(holder, token) for holder, token in pairs], block)
+    balances = {}
+    for (holder, token), value in zip(pairs, values):
+        if value is None:
+            raise ValueError(f"Could not read balance of {holder} for token {token}")
+        balances[(holder, token)] = value
+    return balances
+
+
+async def async_read_allowances(w3, triples):
+    """Return {(token, owner, spender): allowance} for every triple, in one round-trip."""
+    values = await async_batch_read(w3, [allowance_read(*triple) for triple in triples])
+    allowances = {}
+    for triple, value in zip(triples, values):
+        if value is None:
+            raise ValueError(f"Could not read allowance of token {triple[0]}")
+        allowances[triple] = value
+    return allowances
@@ -0,0 +1,300 @@
+import argparse
+import asyncio
+import os
+import time
+from web3 import Web3
+from web3.exceptions import InvalidAddress
+from .chunking import to_base_units
+from .config import SETTINGS_PATH, load_settings
+from .contracts import CHAIN_ID, DISTRIBUTOR_ADDRESS, KNOWN_TOKENS
+from .engine import Engine
+from .journal import Journal, job_results, reconcile
+from .preflight import Reverted
+from .recipients import RecipientFile
+
+# Token list
+TOKENS = {token["symbol"]: token for token in KNOWN_TOKENS}
+
+def is_valid_address(address):
+    try:
+        Web3.to_checksum_address(address)
+        return True
+    except (InvalidAddress, ValueError):
+        return False
+
+async def ainput(prompt):
+    return await asyncio.to_thread(input, prompt)
+
+async def get_token_balances(engine, token_info, addresses):
+    """Read the token balance of every address in a single batched call."""
+    if not is_valid_address(token_info["address"]):
+        raise ValueError(f"Invalid token address: {token_info['address']}")
+    balances_wei = await engine.get_balances(addresses, [token_info["address"]])
+    balances = []
+    for address in addresses:
+        balance = balances_wei[(address, token_info["address"])]
+        balances.append((balance, balance / 10**token_info["decimals"]))
+    return balances
+
+async def select_token(engine):
+    """Prompt user to select a token by number, including custom token option."""
+    print("\nAvailable tokens:")
+    token_list = list(TOKENS.keys())
+    for i, token in enumerate(token_list, 1):
+        print(f"{i}. {TOKENS[token]['name']} ({token})")
+    print(f"{len(token_list) + 1}. Custom Token")
+    
+    try:
+        choice = int(await ainput(f"Select token (1-{len(token_list) + 1}): "))
+        if 1 <= choice <= len(token_list):
+            return token_list[choice - 1], TOKENS[token_list[choice - 1]]
+        elif choice == len(token_list) + 1:
+            # Custom token input
+            custom_address = (await ainput("Enter custom token contract address: ")).strip()
+            if not is_valid_address(custom_address):
+                print("Invalid contract address!")
+                return None, None
+            try:
+                custom_token = (await engine.registry.resolve(engine.w3, [custom_address]))[custom_address]
+            except Exception as e:
+                print(f"Could not read token details: {e}")
+                return None, None
+            print(f"Found {custom_token['name']} ({custom_token['symbol']}), {custom_token['decimals']} decimals")
+            return custom_token["symbol"], custom_token
+        else:
+            print(f"Invalid selection! Choose a number between 1 and {len(token_list) + 1}.")
+            return None, None
+    except ValueError:
+        print("Invalid input! Please enter a number.")
+        return None, None
+
+async def run_job(engine, job, burst=False):
+    """Send every chunk of a journaled distribution that has not landed yet, printing progress."""
+    _, paid = job.progress()
+    failed = 0
+    try:
+        async for success, tx_hash, count in job_results(engine, job, burst):
+            if success:
+                paid += count
+                print(f"Distributed to {paid}/{job.recipient_count} recipients. Transaction hash: {tx_hash}")
+            elif isinstance(tx_hash, Reverted):
+                failed += count
+                print(f"Distribution to {count} recipients not sent: {tx_hash}")
+            else:
+                failed += count
+                print(f"Distribution to {count} recipients failed. Transaction hash: {tx_hash}")
+    except Exception as e:
+        print(f"Error during distribution: {e}")
+        print("Progress is saved; choose 'Resume Distribution' to continue.")
+        return
+    if failed:
+        print(f"{failed} recipients were in failed transactions; choose 'Resume Distribution' to retry them.")
+        return
+    job.finish()
+    print(f"Distribution successful! {paid} recipients paid.")
+
+async def resume_distribution(engine, journal, burst=False):
+    """Pick an unfinished distribution, settle what was in flight and send the rest."""
+    jobs = journal.unfinished_jobs(CHAIN_ID, engine.address)
+    if not jobs:
+        print("No unfinished distributions.")
+        return
+    print("\nUnfinished distributions:")
+    for i, job in enumerate(jobs, 1):
+        token_info = job.token_info
+        _, paid = job.progress()
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(job.created))
+        source = job.source or "typed addresses"
+        print(f"{i}. {started}: {job.total / 10**token_info['decimals']} {token_info['symbol']} "
+              f"to {job.recipient_count} recipients from {source}, {paid} paid")
+    try:
+        job = jobs[int(await ainput(f"Select distribution (1-{len(jobs)}): ")) - 1]
+    except (ValueError, IndexError):
+        print("Invalid selection!")
+        return
+    action = (await ainput("Resume (r), discard (d) or cancel (c)? ")).lower()
+    if action == "d":
+        job.finish()
+        print("Distribution discarded.")
+        return
+    if action != "r":
+        return
+    print("Checking transactions that were in flight...")
+    try:
+        if not await reconcile(engine, job):
+            print("Some transactions are still pending; resume again once they are mined.")
+            return
+        await run_job(engine, job, burst)
+    except Exception as e:
+        print(f"Error resuming distribution: {e}")
+
+async def distribute_file(engine, journal, token_symbol, token_info, path, burst=False):
+    """Distribute to every recipient in a CSV/text file, streaming it in chunks instead of loading it."""
+    print("Checking recipients file...")
+    recipients = await asyncio.to_thread(RecipientFile(path, token_info["decimals"]).scan)
+    for error in recipients.errors:
+        print(f"Skipping {error}")
+    if recipients.invalid > len(recipients.errors):
+        print(f"...and {recipients.invalid - len(recipients.errors)} more invalid lines")
+    if recipients.duplicates:
+        print(f"Skipping {recipients.duplicates} duplicate addresses")
+    if not recipients.count:
+        print("No valid recipients in file!")
+        return
+
+    unit = 10**token_info["decimals"]
+    if recipients.has_amounts:
+        total_wei = recipients.total
+    else:
+        try:
+            total_wei = to_base_units(
+                (await ainput(f"Enter total amount to distribute (in {token_info['name']}): ")).strip(),
+                token_info["decimals"]
+            )
+            if total_wei <= 0:
+                raise ValueError("Amount must be positive")
+        except (ValueError, ArithmeticError) as e:
+            print(f"Invalid amount: {e}")
+            return
+
+    print(f"\nDistribution Summary:")
+    print(f"Token: {token_info['name']}")
+    print(f"Total Amount: {total_wei / unit} {token_symbol}")
+    print(f"Recipients: {recipients.count} from {path}")
+    if not recipients.has_amounts:
+        print(f"Amount per recipient: {total_wei / recipients.count / unit} {token_symbol}")
+    confirm = (await ainput("Proceed with distribution? (y/n): ")).lower()
+    if confirm != 'y':
+        print("Distribution cancelled.")
+        return
+
+    await run_job(engine, journal.create_job(CHAIN_ID, engine.address, token_info, total_wei, source=recipients), burst)
+
+async def run(settings):
+    """The interactive distributor menu."""
+    burst = settings.get("burst_distributions", False)
+    engine = Engine.from_settings(settings)
+    await engine.connect()
+    journal = Journal()
+    unfinished = journal.unfinished_jobs(CHAIN_ID, engine.address)
+    if unfinished:
+        print(f"\n{len(unfinished)} unfinished distribution(s) found; choose 'Resume Distribution' to continue them.")
+    while True:
+        print("\nToken Distributor Bot")
+        print("1. Distribute Tokens")
+        print("2. Withdraw Tokens")
+        print("3. Resume Distribution")
+        print("4. Exit")
+        choice = await ainput("Select an option (1-4): ")
+        
+        if choice == "4":
+            print("Exiting...")
+            await engine.close()
+            journal.close()
+            break
+
+        if choice == "3":
+            await resume_distribution(engine, journal, burst)
+            continue
+        
+        if choice not in ["1", "2"]:
+            print("Invalid option!")
+            continue
+        
+        # Select token
+        token_symbol, token_info = await select_token(engine)
+        if not token_symbol or not token_info:
+            continue
+        
+        try:
+            (wallet_balance_wei, wallet_balance_readable), (contract_balance_wei, contract_balance_readable) = \
+                await get_token_balances(engine, token_info, [engine.address, DISTRIBUTOR_ADDRESS])
+            print(f"Your {token_info['name']} balance: {wallet_balance_readable} {token_symbol}")
+            print(f"Contract {token_info['name']} balance: {contract_balance_readable} {token_symbol}")
+        except Exception as e:
+            print(f"Error fetching balances: {e}")
+            print("Please verify the token address and ensure it’s a valid ERC20 contract.")
+            continue
+        
+        if choice == "1":
+            recipients_input = (await ainput(
+                "Enter recipient addresses (space-separated, e.g., 0x89283 0x628277) or a recipients file: "
+            )).strip()
+            if os.path.isfile(recipients_input):
+                await distribute_file(engine, journal, token_symbol, token_info, recipients_input, burst)
+                continue
+
+            try:
+                total_amount = float(await ainput(f"Enter total amount to distribute (in {token_info['name']}): "))
+                if total_amount <= 0:
+                    raise ValueError("Amount must be positive")
+            except ValueError as e:
+                print(f"Invalid amount: {e}")
+                continue
+            
+            recipients = recipients_input.split()
+            if not recipients:
+                print("No recipients provided!")
+                continue
+            
+            try:
+                recipients = [Web3.to_checksum_address(addr) for addr in recipients]
+            except ValueError:
+                print("Invalid address format!")
+                continue
+            
+            print(f"\nDistribution Summary:")
+            print(f"Token: {token_info['name']}")
+            print(f"Total Amount: {total_amount} {token_symbol}")
+            print(f"Recipients ({len(recipients)}): {', '.join(recipients)}")
+            print(f"Amount per recipient: {total_amount / len(recipients)} {token_symbol}")
+            confirm = (await ainput("Proceed with distribution? (y/n): ")).lower()
+            
+            if confirm != 'y':
+                print("Distribution cancelled.")
+                continue
+            
+            try:
+                total_wei = to_base_units(total_amount, token_info["decimals"])
+            except ValueError as e:
+                print(f"Invalid amount: {e}")
+                continue
+            job = journal.create_job(CHAIN_ID, engine.address, token_info, total_wei, recipients=recipients)
+            await run_job(engine, job, burst)
+        
+        elif choice == "2":
+            try:
+                amount = float(await ainput(f"Enter amount to withdraw from contract (in {token_info['name']}): "))
+                if amount <= 0:
+                    raise ValueError("Amount must be positive")
+            except ValueError as e:
+                print(f"Invalid amount: {e}")
+                continue
+            
+            print(f"\nWithdrawal Summary:")
+            print(f"Token: {token_info['name']}")
+            print(f"Amount: {amount} {token_symbol}")
+            print(f"Contract balance: {contract_balance_readable} {token_symbol}")
+            confirm = (await ainput("Proceed with withdrawal? (y/n): ")).lower()
+            
+            if confirm != 'y':
+                print("Withdrawal cancelled.")
+                continue
+            
+            try:
+                success, tx_hash = await engine.withdraw_tokens(token_info, amount)
+                if success:
+                    print(f"Withdrawal successful! Transaction hash: {tx_hash}")
+                else:
+                    print("Withdrawal failed. Check transaction receipt for details.")
+            except Exception as e:
+                print(f"Error during withdrawal: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Distribute and withdraw tokens through the TokenDistributor")
+    parser.add_argument("--settings", default=SETTINGS_PATH, help="settings file (default: %(default)s)")
+    args = parser.parse_args()
+    asyncio.run(run(load_settings(args.settings)))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from web3 import Web3
+
+# Upper bound for a single distributeTokens transaction; keeps chunks well
+# under the block gas limit so several of them fit in one block
+MAX_CHUNK_GAS = 8_000_000
+GAS_MARGIN_PERCENT = 115
+GAS_SAMPLE_SIZE = 16
+
+
+def to_base_units(amount, decimals):
+    """Convert a human readable amount to integer base units without float rounding."""
+    units = Decimal(str(amount)).scaleb(decimals)
+    if units != units.to_integral_value():
+        raise ValueError(f"{amount} has more than {decimals} decimal places")
+    return int(units)
+
+
+class GasModel:
+    """Linear gas cost of distributeTokens: base + per_recipient * len(recipients)."""
+
+    def __init__(self, base, per_recipient):
+        self.base = base
+        self.per_recipient = per_recipient
+
+    def gas_for(self, count):
+        return (self.base + self.per_recipient * count) * GAS_MARGIN_PERCENT // 100
+
+    def chunk_size(self, gas_budget=MAX_CHUNK_GAS):
+        size = (gas_budget * 100 // GAS_MARGIN_PERCENT - self.base) // self.per_recipient
+        if size < 1:
+            raise ValueError("Gas budget is too small for even one recipient")
+        return size
+
+
+def fresh_recipients(count):
+    """`count` addresses no one holds anything at, so estimates for them cost what a first transfer does.
+
+    Sending to a new holder writes a zeroed balance slot, the most
+    expensive case, so a model fitted on these never undersizes a chunk.
+    """
+    return [Web3.to_checksum_address(Web3.keccak(text=f"catalyst gas sample {i}")[-20:]) for i in range(count)]
+
+
+def gas_samples(recipients, sample_size=GAS_SAMPLE_SIZE):
+    """Recipient lists to estimate distributeTokens gas for, largest first."""
+    large = min(sample_size, len(recipients))
+    if large == 1:
+        return [recipients[:1]]
+    return [recipients[:large], recipients[:1]]
+
+
+def fit_gas_model(samples, estimates):
+    """Fit a GasModel from the gas estimates of the lists returned by `gas_samples`."""
+    gas_large = estimates[0]
+    if len(samples) == 1:
+        return GasModel(gas_large // 2, gas_large - gas_large // 2)
+    gas_small = estimates[1]
+    large = len(samples[0])
+    per_recipient = max(1, -(-(gas_large - gas_small) // (large - 1)))
+    return GasModel(max(0, gas_small - per_recipient), per_recipient)
+
+
+def split_amount(total, recipients, size):
+    """Split `total` base units over chunks of at most `size` recipients.
+
+    Chunk amounts are proportional to chunk length and always add up to
+    exactly `total`; per-recipient shares differ by at most one unit.
+    Returns a list of (recipients, amount) pairs.
+    """
+    count = len(recipients)
+    chunks = []
+    for start in range(0, count, size):
+        end = min(start + size, count)
+        amount = total * end // count - total * start // count
+        chunks.append((recipients[start:end], amount))
+    return chunks
@@ -0,0 +1,164 @@
+import asyncio
+import os
+
+from web3 import Web3
+
+from .chunking import to_base_units
+from .config import SETTINGS_PATH, load_settings
+from .contracts import CHAIN_ID, DISTRIBUTOR_ADDRESS, KNOWN_TOKENS
+from .journal import Journal, job_results, reconcile
+from .quotes import DEFAULT_SLIPPAGE_BPS
+from .recipients import RecipientFile
+from .wallet_pool import WalletPool
+
+
+class Catalyst:
+    """Swaps, distributions and withdrawals for a long-lived process.
+
+    Building a Catalyst makes no network calls. The wallet pool is created
+    and connected on the first operation, once even if several start
+    together, and reused by everything after it. Tokens are a symbol from
+    KNOWN_TOKENS or an ERC20 address, amounts are in whole tokens.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._pool = None
+        self._journal = None
+        # Created on first use: on Python 3.9 a lock binds to the loop current when it is built
+        self._connecting = None
+
+    @classmethod
+    def from_file(cls, path=SETTINGS_PATH):
+        return cls(load_settings(path))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def pool(self):
+        if self._pool is None:
+            if self._connecting is None:
+                self._connecting = asyncio.Lock()
+            async with self._connecting:
+                if self._pool is None:
+                    pool = WalletPool.from_settings(self.settings)
+                    await pool.connect()
+                    self._pool = pool
+        return self._pool
+
+    async def engine(self):
+        """The first wallet's Engine, which distributions and withdrawals use."""
+        return (await self.pool()).primary
+
+    @property
+    def journal(self):
+        if self._journal is None:
+            self._journal = Journal()
+        return self._journal
+
+    async def token(self, token):
+        """Metadata (address, decimals, symbol, name) of a known symbol or any token address."""
+        for known in KNOWN_TOKENS:
+            if token.lower() in (known["symbol"].lower(), known["address"].lower()):
+                return known
+        if not Web3.is_address(token):
+            raise ValueError(f"Unknown token: {token}")
+        engine = await self.engine()
+        address = Web3.to_checksum_address(token)
+        return (await engine.registry.resolve(engine.w3, [address]))[address]
+
+    async def quote(self, from_token, to_token, amount):
+        """Every router's Quote for swapping `amount`, best first."""
+        engine = await self.engine()
+        from_info, to_info = await self.token(from_token), await self.token(to_token)
+        return await engine.quote(from_info["address"], to_info["address"], to_base_units(amount, from_info["decimals"]))
+
+    async def swap(self, from_token, to_token, amount, slippage_bps=None, on_sent=None):
+        """Swap through the best quote on whichever wallet holds enough; returns (success, tx_hash, quote)."""
+        pool = await self.pool()
+        from_info, to_info = await self.token(from_token), await self.token(to_token)
+        amount_in = to_base_units(amount, from_info["decimals"])
+        if slippage_bps is None:
+            slippage_bps = self.settings.get("slippage_bps", DEFAULT_SLIPPAGE_BPS)
+        return await pool.run(from_info["address"], amount_in, lambda engine: engine.best_swap(
+            from_info["address"], to_info["address"], amount_in, slippage_bps, on_sent
+        ))
+
+    async def distribute(self, token, recipients, total=None, on_result=None):
+        """Distribute `total` over `recipients` as a journaled job; returns (recipients paid, recipients failed).
+
+        `recipients` is a list of addresses or the path of a recipients
+        file; `total` may be left out when the file gives every amount.
+        `on_result(success, tx_hash, count)` is called for every chunk.
+        """
+        engine = await self.engine()
+        token_info = await self.token(token)
+        if total is None and not isinstance(recipients, (str, os.PathLike)):
+            raise ValueError("A total amount is needed for a list of recipients")
+        if isinstance(recipients, (str, os.PathLike)):
+            source = await asyncio.to_thread(RecipientFile(os.fspath(recipients), token_info["decimals"]).scan)
+            if not source.count:
+                raise ValueError(f"No valid recipients in {recipients}")
+            if not source.has_amounts and total is None:
+                raise ValueError(f"{recipients} has no amounts, so a total amount is needed")
+            total_wei = source.total if source.has_amounts else to_base_units(total, token_info["decimals"])
+            job = self.journal.create_job(CHAIN_ID, engine.address, token_info, total_wei, source=source)
+        else:
+            recipients = [Web3.to_checksum_address(address) for address in recipients]
+            total_wei = to_base_units(total, token_info["decimals"])
+            job = self.journal.create_job(CHAIN_ID, engine.address, token_info, total_wei, recipients=recipients)
+        return await self.run_job(job, on_result)
+
+    async def unfinished_jobs(self):
+        """Journaled distributions of the first wallet that never finished."""
+        engine = await self.engine()
+        return self.journal.unfinished_jobs(CHAIN_ID, engine.address)
+
+    async def resume(self, job, on_result=None):
+        """Settle what was in flight for an unfinished Job and send the rest; see run_job."""
+        if not await reconcile(await self.engine(), job):
+            raise Exception("Some transactions of the distribution are still pending")
+        return await self.run_job(job, on_result)
+
+    async def run_job(self, job, on_result=None):
+        """Send a job's remaining chunks; the job is finished when none failed."""
+        engine = await self.engine()
+        paid = failed = 0
+        async for success, tx_hash, count in job_results(engine, job, self.settings.get("burst_distributions", False)):
+            if success:
+                paid += count
+            else:
+                failed += count
+            if on_result:
+                on_result(success, tx_hash, count)
+        if not failed:
+            job.finish()
+        return paid, failed
+
+    async def portfolio(self, tokens=None):
+        """{holder: {token: balance}} of every wallet and the TokenDistributor, in base units.
+
+        With `balance_tracker` on this is answered from the tracker's
+        snapshot without RPC once the pairs are tracked.
+        """
+        pool = await self.pool()
+        tokens = [token["address"] for token in KNOWN_TOKENS] if tokens is None else tokens
+        holders = pool.addresses + [DISTRIBUTOR_ADDRESS]
+        balances = await pool.primary.get_balances(holders, tokens)
+        return {holder: {token: balances[(holder, token)] for token in tokens} for holder in holders}
+
+    async def withdraw(self, token, amount, on_sent=None):
+        """Withdraw tokens held by the TokenDistributor; returns (success, tx_hash)."""
+        engine = await self.engine()
+        return await engine.withdraw_tokens(await self.token(token), amount, on_sent)
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
@@ -0,0 +1,9 @@
+import toml
+
+SETTINGS_PATH = "settings.toml"
+
+
+def load_settings(path=SETTINGS_PATH):
+    """The [settings] table of a settings.toml file."""
+    with open(path, "r") as file:
+        return toml.load(file)["settings"]
@@ -0,0 +1,175 @@
+import json
+
+MONAD_RPC_URL = "https://testnet-rpc.monad.xyz"
+CHAIN_ID = 10143
+
+NATIVE_TOKEN = "0x0000000000000000000000000000000000000000"
+WMON_ADDRESS = "0x760AfE86e5de5fa0Ee542fc7B7B713e1c5425701"
+USDT_ADDRESS = "0x88b8E2161DEDC77EF4ab7585569D2415a1C1055D"
+USDC_ADDRESS = "0xf817257fed379853cDe0fa4F97AB987181B1E5Ea"
+
+# Metadata for tokens we already know, so nothing has to be fetched for them
+KNOWN_TOKENS = [
+    {"address": NATIVE_TOKEN, "decimals": 18, "symbol": "MON", "name": "Native MON"},
+    {"address": USDT_ADDRESS, "decimals": 6, "symbol": "USDT", "name": "Tether USD"},
+    {"address": USDC_ADDRESS, "decimals": 6, "symbol": "USDC", "name": "USD Coin"},
+    {"address": WMON_ADDRESS, "decimals": 18, "symbol": "WMON", "name": "Wrapped MON"}
+]
+
+ROUTER_OPTIONS = {
+    1: ("Octoswap", "0xb6091233aAcACbA45225a2B2121BBaC807aF4255"),
+    2: ("Mondafund", "0xc80585f78A6e44fb46e1445006f820448840386e"),
+    3: ("Bean Exchange", "0xCa810D095e90Daae6e867c19DF6D9A8C56db2c89"),
+    4: ("Monad Madness", "0x64Aff7245EbdAAECAf266852139c67E4D8DBa4de")
+}
+
+# TokenDistributor contract details
+DISTRIBUTOR_ADDRESS = "0xC36eb65362eF39E26FC4e483Ed032Aa19D9f85d1"
+DISTRIBUTOR_ABI = [
+    {
+        "constant": False,
+        "inputs": [
+            {"name": "tokenAddress", "type": "address"},
+            {"name": "totalAmount", "type": "uint256"},
+            {"name": "recipients", "type": "address[]"}
+        ],
+        "name": "distributeTokens",
+        "outputs": [],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "constant": False,
+        "inputs": [
+            {"name": "tokenAddress", "type": "address"},
+            {"name": "amount", "type": "uint256"}
+        ],
+        "name": "withdrawTokens",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    }
+]
+
+ROUTER_ABI = json.loads('''
+[
+    {
+        "constant": true,
+        "inputs": [
+            {"name": "amountIn", "type": "uint256"},
+            {"name": "path", "type": "address[]"}
+        ],
+        "name": "getAmountsOut",
+        "outputs": [{"name": "amounts", "type": "uint256[]"}],
+        "payable": false,
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "constant": false,
+        "inputs": [
+            {"name": "amountOutMin", "type": "uint256"},
+            {"name": "path", "type": "address[]"},
+            {"name": "to", "type": "address"},
+            {"name": "deadline", "type": "uint256"}
+        ],
+        "name": "swapExactETHForTokens",
+        "outputs": [{"name": "amounts", "type": "uint256[]"}],
+        "payable": true,
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "constant": false,
+        "inputs": [
+            {"name": "amountIn", "type": "uint256"},
+            {"name": "amountOutMin", "type": "uint256"},
+            {"name": "path", "type": "address[]"},
+            {"name": "to", "type": "address"},
+            {"name": "deadline", "type": "uint256"}
+        ],
+        "name": "swapExactTokensForTokens",
+        "outputs": [{"name": "amounts", "type": "uint256[]"}],
+        "payable": false,
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+    {
+        "constant": false,
+        "inputs": [
+            {"name": "amountIn", "type": "uint256"},
+            {"name": "amountOutMin", "type": "uint256"},
+            {"name": "path", "type": "address[]"},
+            {"name": "to", "type": "address"},
+            {"name": "deadline", "type": "uint256"}
+        ],
+        "name": "swapExactTokensForETH",
+        "outputs": [{"name": "amounts", "type": "uint256[]"}],
+        "payable": false,
+        "stateMutability": "nonpayable",
+        "type": "function"
+    }
+]
+''')
+
+WMON_ABI = json.loads('''
+[
+    {
+        "constant": false,
+        "inputs": [],
+        "name": "deposit",
+        "outputs": [],
+        "payable": true,
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "constant": false,
+        "inputs": [{"name": "wad", "type": "uint256"}],
+        "name": "withdraw",
+        "outputs": [],
+        "payable": false,
+        "stateMutability": "nonpayable",
+        "type": "function"
+    }
+]
+''')
+
+ERC20_ABI = json.loads('''
+[
+    {
+        "constant": false,
+        "inputs": [
+            {"name": "_spender", "type": "address"},
+            {"name": "_value", "type": "uint256"}
+        ],
+        "name": "approve",
+        "outputs": [{"name": "", "type": "bool"}],
+        "payable": false,
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+    {
+        "constant": true,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "payable": false,
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "constant": true,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "payable": false,
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+''')
+
+
+def is_native(token_address):
+    return int(token_address, 16) == 0
@@ -0,0 +1,848 @@
+import asyncio
+import time
+from collections import deque
+from itertools import islice
+
+from web3 import AsyncWeb3, Web3
+
+from .allowances import INFINITE_ALLOWANCE, AllowanceCache
+from .balances import BalanceTracker
+from .batching import async_read_allowances, async_read_balances
+from .chunking import GAS_SAMPLE_SIZE, fit_gas_model, fresh_recipients, gas_samples, split_amount, to_base_units
+from .contracts import (
+    CHAIN_ID,
+    DISTRIBUTOR_ABI,
+    DISTRIBUTOR_ADDRESS,
+    ERC20_ABI,
+    KNOWN_TOKENS,
+    MONAD_RPC_URL,
+    ROUTER_ABI,
+    WMON_ABI,
+    WMON_ADDRESS,
+    is_native,
+)
+from .fees import DEFAULT_REFRESH_SECONDS, FeeEngine
+from .metrics import NULL_METRICS, Metrics
+from .nonce_manager import AsyncNonceManager
+from .preflight import Preflight, Reverted
+from .presign import (
+    DEPOSIT,
+    DISTRIBUTE_TOKENS,
+    SWAP_EXACT_ETH_FOR_TOKENS,
+    SWAP_EXACT_TOKENS_FOR_ETH,
+    SWAP_EXACT_TOKENS_FOR_TOKENS,
+    WITHDRAW,
+    Signer,
+    SigningPool,
+    broadcast_raw,
+)
+from .quotes import DEFAULT_SLIPPAGE_BPS, best_quote, is_wrap, min_out, quote_all, swap_path
+from .reserves import ReserveMirror
+from .routes import RouteFinder
+from .receipts import DEFAULT_RECEIPT_TIMEOUT, ReceiptTracker, TransactionCancelled, TransactionDropped
+from .replacements import ReplacementManager
+from .rpc_pool import RpcPool
+from .token_registry import TokenRegistry
+
+# Used only when a gas estimate fails, e.g. while the approval it depends on is pending
+GAS_LIMIT_APPROVE = 50000
+GAS_LIMIT_SWAP = 160000
+# Added to GAS_LIMIT_SWAP for each swap after the first in a multi-hop path
+GAS_LIMIT_HOP = 90000
+GAS_LIMIT_DEPOSIT = 30000
+GAS_LIMIT_WITHDRAW = 40000
+GAS_LIMIT_DISTRIBUTOR_WITHDRAW = 100000
+
+MAX_UINT256 = 2**256 - 1
+DEFAULT_MAX_IN_FLIGHT = 16
+# distributeTokens chunks awaiting their receipt before sending more
+DISTRIBUTION_WINDOW = 64
+
+# Connection, fee, receipt and cache state that every wallet of one process shares
+SHARED_STATE = (
+    "w3", "fees", "receipts", "replacements", "metrics", "preflight", "reserves", "routes", "balances", "signing",
+    "distributor", "wmon", "gas_models", "allowances", "registry", "_confirm_hooks", "_routers", "_tokens"
+)
+
+
+def private_keys(settings):
+    """Keys from `private_keys` (a list) or the single `private_key` in settings.toml."""
+    keys = settings.get("private_keys") or [settings["private_key"]]
+    return list(dict.fromkeys(keys))
+
+
+def get_deadline():
+    return int(time.time()) + 600
+
+
+class Engine:
+    """Asyncio execution engine for swaps and TokenDistributor operations.
+
+    Transactions are signed locally with nonces from an AsyncNonceManager and
+    broadcast without waiting on each other; at most `max_in_flight`
+    operations (a swap, a distribution, a withdrawal) run at once.
+    """
+
+    def __init__(self, private_key, rpc_urls=(MONAD_RPC_URL,), max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 fee_refresh_seconds=DEFAULT_REFRESH_SECONDS, receipt_timeout=DEFAULT_RECEIPT_TIMEOUT, metrics=None, preflight=False,
+                 reserve_mirror=False, route_tokens=(), balance_tracker=False, replace_after=None, cancel_after=None,
+                 sign_workers=None, shared=None):
+        if shared is not None:
+            for name in SHARED_STATE:
+                setattr(self, name, getattr(shared, name))
+        else:
+            self.w3 = AsyncWeb3(RpcPool(list(rpc_urls)))
+            self.fees = FeeEngine(self.w3, fee_refresh_seconds)
+            self.receipts = ReceiptTracker(self.w3, timeout=receipt_timeout)
+            self.replacements = (
+                ReplacementManager(self.fees, self.receipts, replace_after, cancel_after) if replace_after else None
+            )
+            self.metrics = metrics or NULL_METRICS
+            self.metrics.install(self.w3)
+            self.preflight = Preflight(self.w3) if preflight else None
+            self.reserves = None
+            self.routes = None
+            if reserve_mirror:
+                tokens = [token["address"] for token in KNOWN_TOKENS if not is_native(token["address"])]
+                self.reserves = ReserveMirror(self.w3, tokens + [token for token in route_tokens if token not in tokens])
+                self.routes = RouteFinder(self.reserves)
+            self.balances = BalanceTracker(self.w3, CHAIN_ID) if balance_tracker else None
+            self.signing = SigningPool(sign_workers)
+            self.distributor = self.w3.eth.contract(address=DISTRIBUTOR_ADDRESS, abi=DISTRIBUTOR_ABI)
+            self.wmon = self.w3.eth.contract(address=WMON_ADDRESS, abi=WMON_ABI)
+            self.gas_models = {}
+            self.allowances = AllowanceCache(CHAIN_ID)
+            self.registry = TokenRegistry(CHAIN_ID)
+            self._confirm_hooks = {}
+            self._routers = {}
+            self._tokens = {}
+        # Everything below belongs to this wallet alone
+        self.account = self.w3.eth.account.from_key(private_key)
+        self.address = self.account.address
+        self.nonces = AsyncNonceManager(self.w3, self.address)
+        self.signer = Signer(bytes(self.account.key), self.signing)
+        self.max_in_flight = max_in_flight
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self._allowance_values = {}
+        self._allowance_lock = asyncio.Lock()
+        self._approvals = {}
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build an Engine for the first key in the [settings] table of settings.toml."""
+        return cls(
+            private_keys(settings)[0],
+            rpc_urls=settings.get("rpc_urls") or [MONAD_RPC_URL],
+            max_in_flight=settings.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT),
+            fee_refresh_seconds=settings.get("fee_refresh_seconds", DEFAULT_REFRESH_SECONDS),
+            receipt_timeout=settings.get("receipt_timeout", DEFAULT_RECEIPT_TIMEOUT),
+            metrics=Metrics.from_settings(settings),
+            preflight=settings.get("preflight", False),
+            reserve_mirror=settings.get("reserve_mirror", False),
+            route_tokens=settings.get("route_tokens", ()),
+            balance_tracker=settings.get("balance_tracker", False),
+            replace_after=settings.get("replace_after_seconds"),
+            cancel_after=settings.get("cancel_after_seconds"),
+            sign_workers=settings.get("sign_workers")
+        )
+
+    def for_wallet(self, private_key):
+        """Engine for another key that shares this engine's connection, fee engine, receipts and caches."""
+        return Engine(private_key, max_in_flight=self.max_in_flight, shared=self)
+
+    async def connect(self):
+        if not await self.w3.is_connected():
+            raise Exception("Failed to connect to Monad testnet")
+        self.w3.provider.start()
+        await self.fees.refresh()
+        self.fees.start()
+        if self.reserves:
+            try:
+                await self.reserves.load()
+            except Exception:
+                # Quotes go to the routers until the mirror's poller manages to load
+                pass
+            self.reserves.start()
+        if self.balances:
+            self.balances.load()
+            try:
+                await self.balances.track([self.address, DISTRIBUTOR_ADDRESS], [token["address"] for token in KNOWN_TOKENS])
+            except Exception:
+                # Balances are read on chain until the tracker's poller catches up
+                pass
+            self.balances.start()
+
+    async def close(self):
+        self.signing.close()
+        await self.fees.stop()
+        await self.receipts.stop()
+        if self.replacements:
+            await self.replacements.stop()
+        if self.reserves:
+            await self.reserves.stop()
+        if self.balances:
+            await self.balances.stop()
+        await self.w3.provider.stop()
+        self.metrics.export()
+
+    def router(self, address):
+        if address not in self._routers:
+            self._routers[address] = self.w3.eth.contract(address=address, abi=ROUTER_ABI)
+        return self._routers[address]
+
+    def token(self, address):
+        if address not in self._tokens:
+            self._tokens[address] = self.w3.eth.contract(address=address, abi=ERC20_ABI)
+        return self._tokens[address]
+
+    async def get_balances(self, holders, tokens):
+        """{(holder, token): balance}, looked up in the balance tracker while it is current, else read on chain."""
+        if self.balances:
+            balances = await self.balances.get(holders, tokens)
+            if balances is not None:
+                return balances
+        return await async_read_balances(self.w3, holders, tokens)
+
+    async def get_decimals(self, tokens):
+        return await self.registry.decimals(self.w3, tokens)
+
+    async def estimate_gas(self, key, function, value, fallback):
+        """Cached gas limit for `function`, see FeeEngine.gas_limit."""
+        async def estimate():
+            with self.metrics.phase("estimate"):
+                return await function.estimate_gas({"from": self.address, "value": value})
+
+        return await self.fees.gas_limit(key, estimate, fallback)
+
+    async def estimate_call_gas(self, key, to, data, value, fallback):
+        """estimate_gas for prepared calldata, sharing its cache keys."""
+        async def estimate():
+            with self.metrics.phase("estimate"):
+                return await self.w3.eth.estimate_gas({"from": self.address, "to": to, "data": data, "value": value})
+
+        return await self.fees.gas_limit(key, estimate, fallback)
+
+    async def simulate(self, function, tx_params):
+        """Revert reason if `function` sent with `tx_params` would revert, None if not or if preflight is off."""
+        if self.preflight is None:
+            return None
+        return await self.simulate_call(
+            (function.address, function._encode_transaction_data(), tx_params.get("value", 0), tx_params.get("gas"))
+        )
+
+    async def simulate_call(self, call):
+        """simulate for a prepared (to, data, value, gas) call."""
+        if self.preflight is None:
+            return None
+        to, data, value, gas = call
+        tx = {"from": self.address, "to": to, "data": Web3.to_hex(data), "value": Web3.to_hex(value)}
+        if gas is not None:
+            tx["gas"] = Web3.to_hex(gas)
+        with self.metrics.phase("preflight"):
+            return await self.preflight.simulate(tx)
+
+    async def send(self, function, tx_params, on_sent=None, on_signed=None, preflight=True):
+        """Sign and broadcast a contract call with the next local nonce; returns (nonce, tx_hash).
+
+        Fee fields come from the fee engine unless `tx_params` sets its own.
+        `on_signed(nonce, signed_tx)` runs between signing and broadcasting.
+        With preflight on, a call that would revert raises Reverted before a
+        nonce is taken; pass preflight=False when the call depends on a
+        transaction that is not mined yet.
+        """
+        if preflight:
+            reason = await self.simulate(function, tx_params)
+            if reason is not None:
+                raise Reverted(reason)
+        fee_fields = {} if "gasPrice" in tx_params or "maxFeePerGas" in tx_params else await self.fees.fee_fields()
+        nonce = await self.nonces.allocate()
+        signed_tx = None
+        try:
+            with self.metrics.phase("build"):
+                tx = await function.build_transaction({
+                    "from": self.address,
+                    "chainId": CHAIN_ID,
+                    **fee_fields,
+                    **tx_params,
+                    "nonce": nonce
+                })
+            with self.metrics.phase("sign"):
+                signed_tx = self.account.sign_transaction(tx)
+            if on_signed:
+                on_signed(nonce, signed_tx)
+            # Track before broadcasting so the receipt poller cannot miss the block
+            self.receipts.track(signed_tx.hash)
+            with self.metrics.phase("send"):
+                tx_hash = await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception:
+            if signed_tx is not None:
+                self.receipts.forget(signed_tx.hash)
+            self.nonces.release(nonce)
+            await self.nonces.sync()
+            await self.nonces.fill_gaps(self.send_filler)
+            raise
+        self.nonces.mark_sent(nonce)
+        if self.replacements:
+            self.replacements.watch(self, nonce, tx, tx_hash)
+        if on_sent:
+            on_sent(tx_hash)
+        return nonce, tx_hash
+
+    async def send_filler(self, nonce):
+        """Occupy an unused nonce with a zero-value transfer to ourselves."""
+        tx = {
+            "from": self.address,
+            "to": self.address,
+            "value": 0,
+            "nonce": nonce,
+            "gas": 21000,
+            "chainId": CHAIN_ID,
+            **await self.fees.fee_fields()
+        }
+        signed_tx = self.account.sign_transaction(tx)
+        await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        if self.replacements:
+            # A stuck filler holds up every nonce above it
+            self.replacements.watch(self, nonce, tx, signed_tx.hash)
+
+    async def wait(self, nonce, tx_hash):
+        try:
+            with self.metrics.phase("receipt"):
+                receipt = await self.receipts.wait(tx_hash)
+        except TransactionDropped as e:
+            if isinstance(e, TransactionCancelled):
+                self.nonces.mark_confirmed(nonce)
+            hook = self._confirm_hooks.pop(tx_hash, None)
+            if hook:
+                hook(False)
+            raise
+        self.nonces.mark_confirmed(nonce)
+        hook = self._confirm_hooks.pop(tx_hash, None)
+        if hook:
+            hook(receipt.status == 1)
+        return receipt.status == 1
+
+    async def wait_all(self, pending):
+        return await asyncio.gather(*(self.wait(nonce, tx_hash) for nonce, tx_hash in pending))
+
+    # Pre-signed bursts
+
+    async def presign(self, calls):
+        """Build and sign (to, data, value, gas) calls on consecutive nonces without broadcasting them.
+
+        Fee fields are fixed at signing time. The nonces stay reserved until
+        the transactions go through `broadcast`.
+        """
+        fee_fields = await self.fees.fee_fields()
+        nonces = [await self.nonces.allocate() for _ in calls]
+        txs = [
+            {"to": to, "data": data, "value": value, "gas": gas, "nonce": nonce, "chainId": CHAIN_ID, **fee_fields}
+            for (to, data, value, gas), nonce in zip(calls, nonces)
+        ]
+        try:
+            with self.metrics.phase("sign"):
+                return await self.signer.sign(txs)
+        except Exception:
+            for nonce in nonces:
+                self.nonces.release(nonce)
+            raise
+
+    async def broadcast(self, signed_txs, on_sent=None):
+        """Send pre-signed transactions in one burst of batched eth_sendRawTransaction requests.
+
+        Returns (nonce, tx_hash) per transaction, or None where the node
+        rejected it; rejected nonces are handed back and any hole they leave
+        is filled.
+        """
+        ordered = sorted(signed_txs, key=lambda tx: tx.nonce)
+        for tx in ordered:
+            self.receipts.track(tx.hash)
+        with self.metrics.phase("send"):
+            errors = await broadcast_raw(self.w3, ordered)
+        rejected = set()
+        for tx, error in zip(ordered, errors):
+            if error is None:
+                self.nonces.mark_sent(tx.nonce)
+                if self.replacements and tx.tx is not None:
+                    self.replacements.watch(self, tx.nonce, tx.tx, tx.hash)
+                if on_sent:
+                    on_sent(tx.hash)
+            else:
+                rejected.add(tx.nonce)
+                self.receipts.forget(tx.hash)
+                self.nonces.release(tx.nonce)
+        if rejected:
+            await self.nonces.sync()
+            await self.nonces.fill_gaps(self.send_filler)
+        return [None if tx.nonce in rejected else (tx.nonce, tx.hash) for tx in signed_txs]
+
+    # Swaps
+
+    async def approve(self, token_address, spender, amount, on_sent=None):
+        function = self.token(token_address).functions.approve(spender, amount)
+        gas = await self.estimate_gas((token_address, "approve"), function, 0, GAS_LIMIT_APPROVE)
+        return await self.send(function, {"gas": gas}, on_sent)
+
+    async def prefetch_allowances(self, tokens, spenders):
+        """Read every uncached token x spender allowance for our address in one call."""
+        triples = [
+            (token, self.address, spender)
+            for token in tokens if not is_native(token)
+            for spender in spenders
+            if not self.allowances.is_infinite(token, self.address, spender)
+        ]
+        if not triples:
+            return
+        for (token, _, spender), value in (await async_read_allowances(self.w3, triples)).items():
+            if value >= INFINITE_ALLOWANCE:
+                self.allowances.remember(token, self.address, spender)
+            else:
+                self._allowance_values[(token, spender)] = value
+
+    async def ensure_allowance(self, token_address, spender, amount, on_sent=None):
+        """Approve `spender` for an infinite amount unless it can already pull `amount`.
+
+        Returns the pending approvals the caller's transaction depends on:
+        an empty list, or the one approval broadcast for this pair.
+        """
+        async with self._allowance_lock:
+            if self.allowances.is_infinite(token_address, self.address, spender):
+                return []
+            key = (token_address, spender)
+            if key in self._approvals:
+                return [self._approvals[key]]
+            if key not in self._allowance_values:
+                await self.prefetch_allowances([token_address], [spender])
+                if self.allowances.is_infinite(token_address, self.address, spender):
+                    return []
+            if self._allowance_values[key] >= amount:
+                self._allowance_values[key] -= amount
+                return []
+
+            approval = await self.approve(token_address, spender, MAX_UINT256, on_sent=on_sent)
+            self._approvals[key] = approval
+
+            def confirmed(success):
+                self._approvals.pop(key, None)
+                self._allowance_values.pop(key, None)
+                if success:
+                    self.allowances.remember(token_address, self.address, spender)
+
+            self._confirm_hooks[approval[1]] = confirmed
+            return [approval]
+
+    def forget_allowance(self, token_address, spender):
+        self._approvals.pop((token_address, spender), None)
+        self._allowance_values.pop((token_address, spender), None)
+        self.allowances.forget(token_address, self.address, spender)
+
+    async def deposit(self, amount_in, on_sent=None):
+        function = self.wmon.functions.deposit()
+        gas = await self.estimate_gas(("deposit",), function, amount_in, GAS_LIMIT_DEPOSIT)
+        return await self.send(function, {"value": amount_in, "gas": gas}, on_sent)
+
+    async def withdraw(self, amount_in, on_sent=None):
+        function = self.wmon.functions.withdraw(amount_in)
+        gas = await self.estimate_gas(("withdraw",), function, 0, GAS_LIMIT_WITHDRAW)
+        return await self.send(function, {"value": 0, "gas": gas}, on_sent)
+
+    async def send_swap(self, function, router_address, name, path, value, on_sent, preflight=True):
+        # Gas depends on the router and the number of hops, not on the amounts
+        fallback = GAS_LIMIT_SWAP + GAS_LIMIT_HOP * (len(path) - 2)
+        gas = await self.estimate_gas((router_address, name, len(path)), function, value, fallback)
+        return await self.send(function, {"value": value, "gas": gas}, on_sent, preflight=preflight)
+
+    async def swap_exact_eth_for_tokens(self, router_address, amount_in, amount_out_min, path, on_sent=None):
+        function = self.router(router_address).functions.swapExactETHForTokens(
+            amount_out_min, path, self.address, get_deadline()
+        )
+        return await self.send_swap(function, router_address, "swapExactETHForTokens", path, amount_in, on_sent)
+
+    async def swap_exact_tokens_for_eth(self, router_address, amount_in, amount_out_min, path, on_sent=None,
+                                        preflight=True):
+        function = self.router(router_address).functions.swapExactTokensForETH(
+            amount_in, amount_out_min, path, self.address, get_deadline()
+        )
+        return await self.send_swap(function, router_address, "swapExactTokensForETH", path, 0, on_sent, preflight)
+
+    async def swap_exact_tokens_for_tokens(self, router_address, amount_in, amount_out_min, path, on_sent=None,
+                                           preflight=True):
+        function = self.router(router_address).functions.swapExactTokensForTokens(
+            amount_in, amount_out_min, path, self.address, get_deadline()
+        )
+        return await self.send_swap(function, router_address, "swapExactTokensForTokens", path, 0, on_sent, preflight)
+
+    async def submit_swap(self, router_address, from_token, to_token, amount_in, amount_out_min=0, on_sent=None,
+                          path=None):
+        """Broadcast every transaction a swap needs and return their (nonce, tx_hash) pairs.
+
+        MON <-> WMON goes through WMON deposit/withdraw, everything else
+        through the router with MON legs wrapped via WMON. `path` is the
+        router path of a quote, by default the direct one.
+        """
+        if is_wrap(from_token, to_token):
+            if is_native(from_token):
+                return [await self.deposit(amount_in, on_sent)]
+            return [await self.withdraw(amount_in, on_sent)]
+        path = path or swap_path(from_token, to_token)
+        if is_native(from_token):
+            return [await self.swap_exact_eth_for_tokens(router_address, amount_in, amount_out_min, path, on_sent)]
+        # Any approval is broadcast on an earlier nonce than the swap, so both
+        # land in order without waiting for the approval receipt
+        approvals = await self.ensure_allowance(from_token, router_address, amount_in, on_sent)
+        # A swap behind a pending approval would fail any simulation
+        preflight = not approvals
+        if is_native(to_token):
+            swap = await self.swap_exact_tokens_for_eth(
+                router_address, amount_in, amount_out_min, path, on_sent, preflight
+            )
+        else:
+            swap = await self.swap_exact_tokens_for_tokens(
+                router_address, amount_in, amount_out_min, path, on_sent, preflight
+            )
+        return approvals + [swap]
+
+    async def swap(self, router_address, from_token, to_token, amount_in, amount_out_min=0, on_sent=None, path=None):
+        """Run one swap to completion; returns (success, tx_hash) of the final transaction."""
+        async with self.slots, self.metrics.phase("swap"):
+            pending = await self.submit_swap(
+                router_address, from_token, to_token, amount_in, amount_out_min, on_sent, path
+            )
+            results = await self.wait_all(pending)
+            if not results[-1] and not is_native(from_token):
+                # The cached allowance may be stale; re-read it before the next swap
+                self.forget_allowance(from_token, router_address)
+            return all(results), pending[-1][1].hex()
+
+    async def quote(self, from_token, to_token, amount_in):
+        """Quotes from every router in ROUTER_OPTIONS, best first: from the route finder, or in one round-trip."""
+        with self.metrics.phase("quote"):
+            return await quote_all(self.w3, from_token, to_token, amount_in, local=self.routes)
+
+    async def best_swap(self, from_token, to_token, amount_in, slippage_bps=DEFAULT_SLIPPAGE_BPS, on_sent=None):
+        """Swap on whichever router quotes the most output, with amountOutMin from that quote.
+
+        Returns (success, tx_hash, quote).
+        """
+        with self.metrics.phase("quote"):
+            quote = await best_quote(self.w3, from_token, to_token, amount_in, local=self.routes)
+        amount_out_min = min_out(quote.amount_out, slippage_bps)
+        success, tx_hash = await self.swap(
+            quote.router_address, from_token, to_token, amount_in, amount_out_min, on_sent, quote.path
+        )
+        return success, tx_hash, quote
+
+    def plan_split(self, from_token, to_token, amount_in):
+        """SplitPlan for a swap over the mirrored pools, or None without a current reserve mirror."""
+        return self.routes.split(from_token, to_token, amount_in) if self.routes else None
+
+    async def split_swap(self, plan, slippage_bps=DEFAULT_SLIPPAGE_BPS, on_sent=None):
+        """Send every leg of a SplitPlan at once, on consecutive nonces, and wait for all of them.
+
+        Each leg's amountOutMin comes from its own expected output. Returns
+        (success, tx_hashes) with the final transaction of every leg.
+        """
+        async with self.slots, self.metrics.phase("swap"):
+            submitted = await asyncio.gather(*(
+                self.submit_swap(
+                    leg.router_address, plan.from_token, plan.to_token, leg.amount_in,
+                    min_out(leg.amount_out, slippage_bps), on_sent, leg.path
+                )
+                for leg in plan.legs
+            ), return_exceptions=True)
+            # Legs that went out are settled even if another leg failed to send
+            sent = [(leg, pending) for leg, pending in zip(plan.legs, submitted) if not isinstance(pending, BaseException)]
+            results = await asyncio.gather(*(self.wait_all(pending) for _, pending in sent))
+            for (leg, _), leg_results in zip(sent, results):
+                if not leg_results[-1] and not is_native(plan.from_token):
+                    self.forget_allowance(plan.from_token, leg.router_address)
+            for error in submitted:
+                if isinstance(error, BaseException):
+                    raise error
+            return all(all(leg_results) for leg_results in results), [pending[-1][1].hex() for _, pending in sent]
+
+    async def swap_call(self, router_address, from_token, to_token, amount_in, amount_out_min=0, path=None):
+        """((to, data, value, gas), approvals) for the transaction that performs a swap, for `presign`.
+
+        Calldata comes from cached templates. The router is approved first
+        if it needs to be, with an ordinary transaction that goes out ahead
+        of the burst; `approvals` holds its (nonce, tx_hash), which the
+        caller must wait for.
+        """
+        if is_wrap(from_token, to_token):
+            if is_native(from_token):
+                data = DEPOSIT.encode()
+                gas = await self.estimate_call_gas(("deposit",), WMON_ADDRESS, data, amount_in, GAS_LIMIT_DEPOSIT)
+                return (WMON_ADDRESS, data, amount_in, gas), []
+            data = WITHDRAW.encode(amount_in)
+            gas = await self.estimate_call_gas(("withdraw",), WMON_ADDRESS, data, 0, GAS_LIMIT_WITHDRAW)
+            return (WMON_ADDRESS, data, 0, gas), []
+        path = path or swap_path(from_token, to_token)
+        deadline = get_deadline()
+        value = 0
+        approvals = []
+        if is_native(from_token):
+            name, value = "swapExactETHForTokens", amount_in
+            data = SWAP_EXACT_ETH_FOR_TOKENS.encode(amount_out_min, path, self.address, deadline)
+        else:
+            approvals = await self.ensure_allowance(from_token, router_address, amount_in)
+            template = SWAP_EXACT_TOKENS_FOR_ETH if is_native(to_token) else SWAP_EXACT_TOKENS_FOR_TOKENS
+            name = "swapExactTokensForETH" if is_native(to_token) else "swapExactTokensForTokens"
+            data = template.encode(amount_in, amount_out_min, path, self.address, deadline)
+        fallback = GAS_LIMIT_SWAP + GAS_LIMIT_HOP * (len(path) - 2)
+        gas = await self.estimate_call_gas((router_address, name, len(path)), router_address, data, value, fallback)
+        return (router_address, data, value, gas), approvals
+
+    async def burst_swaps(self, orders, on_sent=None):
+        """Sign every swap in `orders` ahead of time, broadcast them in one burst and wait for all of them.
+
+        Orders are (router_address, from_token, to_token, amount_in,
+        amount_out_min, path) tuples, as for `swap`. Returns (success,
+        tx_hash) per order; a swap the node rejected has no hash, and one
+        that was dropped, cancelled or timed out gets that exception
+        instead, so the other orders' outcomes are kept.
+        """
+        async with self.slots, self.metrics.phase("burst"):
+            prepared = [await self.swap_call(*order) for order in orders]
+            # Orders on the same token and router share one approval
+            approvals = list(dict.fromkeys(approval for _, pending in prepared for approval in pending))
+            sent = await self.broadcast(await self.presign([call for call, _ in prepared]), on_sent)
+            # Waiting on the approvals runs their confirm hooks, which settle the allowance cache; a failed
+            # approval shows up in the swaps that needed it
+            results = await asyncio.gather(
+                *(self.wait(*pending) for pending in approvals + [pending for pending in sent if pending]),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException) and not isinstance(result, Exception):
+                    raise result
+            outcomes = iter(results[len(approvals):])
+            summary = []
+            for (router_address, from_token, _, _, _, _), pending in zip(orders, sent):
+                outcome = next(outcomes) if pending else False
+                if outcome is not True and not is_native(from_token):
+                    self.forget_allowance(from_token, router_address)
+                if isinstance(outcome, Exception):
+                    summary.append(outcome)
+                else:
+                    summary.append((outcome, pending[1].hex() if pending else None))
+            return summary
+
+    # TokenDistributor
+
+    async def estimate_distribution(self, token_address, amount_wei, recipients, native):
+        function = self.distributor.functions.distributeTokens(token_address, amount_wei, recipients)
+        return await function.estimate_gas({"from": self.address, "value": amount_wei if native else 0})
+
+    async def measure_distribution_gas(self, token_address, amount_wei, count, native):
+        """Estimate the per-recipient gas cost of distributeTokens for this token.
+
+        The samples go to fresh addresses rather than to the first
+        recipients, who may already hold the token and cost far less gas
+        than the rest.
+        """
+        samples = gas_samples(fresh_recipients(count))
+        estimates = await asyncio.gather(*(
+            self.estimate_distribution(token_address, amount_wei * len(sample) // count, sample, native)
+            for sample in samples
+        ))
+        return fit_gas_model(samples, estimates)
+
+    async def prepare_distribution(self, token_address, total_wei, make_chunks, on_sent=None, chunk_size=None):
+        """Approve the distributor for `total_wei` and get the token's gas model; None if there are no chunks.
+
+        A model cached from an earlier distribution is only reused once
+        this one's first chunk (of `chunk_size`, or the model's size)
+        estimates within it; otherwise it is measured again. Both estimates
+        need the allowance in place, so the approval is mined on return.
+        """
+        native = is_native(token_address)
+        if not native:
+            approval = await self.approve(token_address, DISTRIBUTOR_ADDRESS, total_wei, on_sent=on_sent)
+            if not await self.wait(*approval):
+                raise Exception("Token approval failed")
+
+        model = self.gas_models.get(token_address)
+        if model is not None:
+            first = next(iter(make_chunks(chunk_size or model.chunk_size())), None)
+            if first is None:
+                return None
+            chunk, amount = first
+            if await self.estimate_distribution(token_address, amount, chunk, native) > model.gas_for(len(chunk)):
+                model = None
+        if model is None:
+            sample = next(iter(make_chunks(GAS_SAMPLE_SIZE)), None)
+            if sample is None:
+                return None
+            model = await self.measure_distribution_gas(token_address, sample[1], len(sample[0]), native)
+            self.gas_models[token_address] = model
+        return model
+
+    async def distribute_tokens(self, token_info, total_amount, recipients, on_sent=None):
+        """Distribute in gas-sized chunks, broadcast on sequential nonces without waiting in between.
+
+        Returns a list of (success, tx_hash, recipient_count), one per chunk.
+        """
+        amount_wei = to_base_units(total_amount, token_info["decimals"])
+        return [result async for result in self.stream_distribution(
+            token_info, amount_wei, lambda size: split_amount(amount_wei, recipients, size), on_sent
+        )]
+
+    async def stream_distribution(self, token_info, total_wei, make_chunks, on_sent=None, window=DISTRIBUTION_WINDOW,
+                                  job=None):
+        """Distribute `total_wei` over the chunks from `make_chunks(size)`, yielding results as they confirm.
+
+        `make_chunks(size)` returns (recipients, amount) pairs of at most
+        `size` recipients and is called more than once: for the first chunk
+        or a small sample to check the gas model with, then for the real run.
+        At most `window` chunks are pending at a time, so recipients can
+        come from a file of any size. Yields (success, tx_hash,
+        recipient_count) per chunk, in order.
+
+        With preflight on, chunks are simulated a window at a time in one
+        batch before any of them is signed. A chunk that would revert is not
+        sent and yields (False, Reverted, recipient_count) instead.
+
+        With a journal `job`, each chunk is recorded before it is broadcast
+        and its outcome once it is mined; chunks the job already settled are
+        skipped and chunk boundaries are kept from its first run.
+        """
+        async with self.slots, self.metrics.phase("distribute"):
+            token_address = Web3.to_checksum_address(token_info["address"])
+            native = is_native(token_address)
+            chunk_size = job and job.chunk_size
+            model = await self.prepare_distribution(token_address, total_wei, make_chunks, on_sent, chunk_size)
+            if model is None:
+                return
+            size = chunk_size or model.chunk_size()
+            settled = job.settled() if job else set()
+
+            async def outcome(task, tx_hash):
+                try:
+                    success = await task
+                except TransactionDropped:
+                    if job:
+                        job.record_outcome(tx_hash, "dropped")
+                    raise
+                if job:
+                    job.record_outcome(tx_hash, "success" if success else "reverted")
+                return success
+
+            async def result(entry):
+                task, tx_hash, count = entry
+                if task is None:
+                    # Never sent; tx_hash holds the Reverted error
+                    return False, tx_hash, count
+                return await outcome(task, tx_hash), tx_hash.hex(), count
+
+            def chunk_calls():
+                for seq, (chunk, chunk_amount) in enumerate(make_chunks(size)):
+                    if seq not in settled:
+                        function = self.distributor.functions.distributeTokens(token_address, chunk_amount, chunk)
+                        tx_params = {"value": chunk_amount if native else 0, "gas": model.gas_for(len(chunk))}
+                        yield seq, chunk, chunk_amount, function, tx_params
+
+            # One simulation batch per window of chunks, or one chunk at a time without preflight
+            calls = chunk_calls()
+            group_size = window if self.preflight else 1
+            pending = deque()
+            try:
+                while group := list(islice(calls, group_size)):
+                    reasons = [None] * len(group)
+                    if self.preflight:
+                        reasons = await asyncio.gather(*(self.simulate(call[3], call[4]) for call in group))
+                    for (seq, chunk, chunk_amount, function, tx_params), reason in zip(group, reasons):
+                        if reason is not None:
+                            pending.append((None, Reverted(reason), len(chunk)))
+                        else:
+                            on_signed = None
+                            if job:
+                                def on_signed(nonce, signed_tx):
+                                    job.record_send(seq, size, nonce, signed_tx, chunk, chunk_amount)
+                            nonce, tx_hash = await self.send(function, tx_params, on_sent, on_signed, preflight=False)
+                            pending.append((asyncio.ensure_future(self.wait(nonce, tx_hash)), tx_hash, len(chunk)))
+                        if len(pending) >= window:
+                            yield await result(pending.popleft())
+                while pending:
+                    yield await result(pending.popleft())
+            finally:
+                # Sending failed or the caller stopped early: still settle what was broadcast
+                tasks = [task for task, _, _ in pending if task is not None]
+                if tasks:
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def burst_distribution(self, token_info, total_wei, make_chunks, on_sent=None, job=None):
+        """stream_distribution with every chunk built and signed before the first is broadcast.
+
+        All chunks are held in memory, signed in the signer's worker
+        processes and sent in one burst of batched requests, so the time to
+        broadcast them is bound by the network rather than by signing.
+        Returns a list of (success, tx_hash, recipient_count) per chunk; as
+        with streaming, a chunk preflight rejected carries a Reverted error,
+        and one the node rejected is not sent and has success False.
+        """
+        async with self.slots, self.metrics.phase("distribute"):
+            token_address = Web3.to_checksum_address(token_info["address"])
+            native = is_native(token_address)
+            chunk_size = job and job.chunk_size
+            model = await self.prepare_distribution(token_address, total_wei, make_chunks, on_sent, chunk_size)
+            if model is None:
+                return []
+            size = chunk_size or model.chunk_size()
+            settled = job.settled() if job else set()
+            chunks = [(seq, chunk, amount) for seq, (chunk, amount) in enumerate(make_chunks(size)) if seq not in settled]
+            calls = [
+                (DISTRIBUTOR_ADDRESS, DISTRIBUTE_TOKENS.encode(token_address, amount, chunk),
+                 amount if native else 0, model.gas_for(len(chunk)))
+                for _, chunk, amount in chunks
+            ]
+            reasons = await asyncio.gather(*(self.simulate_call(call) for call in calls))
+            ready = [index for index, reason in enumerate(reasons) if reason is None]
+            signed = await self.presign([calls[index] for index in ready])
+            signed_by_index = dict(zip(ready, signed))
+            if job:
+                for index, tx in signed_by_index.items():
+                    seq, chunk, amount = chunks[index]
+                    job.record_send(seq, size, tx.nonce, tx, chunk, amount)
+            sent = dict(zip(ready, await self.broadcast(signed, on_sent)))
+            waits = {
+                index: asyncio.ensure_future(self.wait(*pending)) for index, pending in sent.items() if pending
+            }
+            try:
+                results = []
+                for index, (_, chunk, _) in enumerate(chunks):
+                    if reasons[index] is not None:
+                        results.append((False, Reverted(reasons[index]), len(chunk)))
+                    elif index not in waits:
+                        results.append((False, signed_by_index[index].hash.hex(), len(chunk)))
+                    else:
+                        tx_hash = sent[index][1]
+                        try:
+                            success = await waits[index]
+                        except TransactionDropped:
+                            if job:
+                                job.record_outcome(tx_hash, "dropped")
+                            raise
+                        if job:
+                            job.record_outcome(tx_hash, "success" if success else "reverted")
+                        results.append((success, tx_hash.hex(), len(chunk)))
+                return results
+            finally:
+                await asyncio.gather(*waits.values(), return_exceptions=True)
+
+    async def withdraw_tokens(self, token_info, amount, on_sent=None):
+        """Call withdrawTokens on the TokenDistributor contract."""
+        async with self.slots, self.metrics.phase("withdraw"):
+            amount_wei = to_base_units(amount, token_info["decimals"])
+            token_address = Web3.to_checksum_address(token_info["address"])
+
+            balances = await self.get_balances([DISTRIBUTOR_ADDRESS], [token_address])
+            balance_wei = balances[(DISTRIBUTOR_ADDRESS, token_address)]
+            if balance_wei < amount_wei:
+                balance_readable = balance_wei / 10**token_info["decimals"]
+                raise Exception(f"Insufficient balance in contract: {balance_readable} {token_info['name']}")
+
+            function = self.distributor.functions.withdrawTokens(token_address, amount_wei)
+            gas = await self.estimate_gas(("withdrawTokens", token_address), function, 0, GAS_LIMIT_DISTRIBUTOR_WITHDRAW)
+            nonce, tx_hash = await self.send(function, {"gas": gas}, on_sent)
+            return await self.wait(nonce, tx_hash), tx_hash.hex()
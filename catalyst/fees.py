@@ -0,0 +1,91 @@
+import asyncio
+import statistics
+
+from .poller import Poller
+
+FEE_HISTORY_BLOCKS = 10
+PRIORITY_FEE_PERCENTILE = 50
+DEFAULT_REFRESH_SECONDS = 5
+GAS_LIMIT_MARGIN_PERCENT = 120
+# Nodes accept a transaction replacing one with the same nonce only if every fee field is at least 10% higher
+REPLACEMENT_BUMP_PERCENT = 12
+FEE_FIELDS = ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas")
+
+
+def _bumped(fee):
+    return fee * (100 + REPLACEMENT_BUMP_PERCENT) // 100 + 1
+
+
+def replacement_fees(tx, market):
+    """Fee fields for a transaction replacing `tx`: REPLACEMENT_BUMP_PERCENT above its own, and never below `market`."""
+    if "gasPrice" in tx:
+        return {"gasPrice": max(_bumped(tx["gasPrice"]), market.get("gasPrice", market.get("maxFeePerGas", 0)))}
+    priority_fee = max(_bumped(tx["maxPriorityFeePerGas"]), market.get("maxPriorityFeePerGas", 0))
+    max_fee = max(_bumped(tx["maxFeePerGas"]), market.get("maxFeePerGas", market.get("gasPrice", 0)), priority_fee)
+    return {"maxFeePerGas": max_fee, "maxPriorityFeePerGas": priority_fee}
+
+
+class FeeEngine:
+    """Fee fields and gas limits shared by every transaction the engine sends.
+
+    Fees are sampled from eth_feeHistory by a background task instead of
+    being fetched per transaction, and produce EIP-1559 fields
+    (maxFeePerGas = 2 x next base fee + median tip). Nodes without
+    eth_feeHistory fall back to a legacy gasPrice.
+
+    Gas limits are estimated once per key, e.g. (router, function, path
+    length), and reused with a safety margin.
+    """
+
+    def __init__(self, w3, refresh_seconds=DEFAULT_REFRESH_SECONDS):
+        self.w3 = w3
+        self._fields = None
+        self._gas_limits = {}
+        self._estimating = {}
+        # A failed refresh keeps the last good sample until the next one
+        self._poller = Poller(self.refresh, refresh_seconds, wait_first=True)
+
+    async def refresh(self):
+        try:
+            history = await self.w3.eth.fee_history(FEE_HISTORY_BLOCKS, "latest", [PRIORITY_FEE_PERCENTILE])
+            base_fee = history["baseFeePerGas"][-1]
+            tips = [reward[0] for reward in history.get("reward") or [] if reward]
+            priority_fee = int(statistics.median(tips)) if tips else await self.w3.eth.max_priority_fee
+            self._fields = {
+                "maxFeePerGas": 2 * base_fee + priority_fee,
+                "maxPriorityFeePerGas": priority_fee
+            }
+        except Exception:
+            self._fields = {"gasPrice": await self.w3.eth.gas_price}
+        return self._fields
+
+    async def fee_fields(self):
+        """The fee fields to merge into a transaction; samples once if nothing is cached yet."""
+        if self._fields is None:
+            await self.refresh()
+        return dict(self._fields)
+
+    def start(self):
+        self._poller.start()
+
+    async def stop(self):
+        await self._poller.stop()
+
+    async def gas_limit(self, key, estimate, fallback):
+        """Gas limit for `key`, estimated with `estimate()` the first time it is needed.
+
+        If the estimate fails (for example because an approval it depends on
+        is still pending), `fallback` is used and nothing is cached.
+        Concurrent callers of a key that is not cached yet share one estimate.
+        """
+        if key not in self._gas_limits:
+            task = self._estimating.get(key)
+            if task is None:
+                task = self._estimating[key] = asyncio.ensure_future(estimate())
+                task.add_done_callback(lambda _: self._estimating.pop(key, None))
+            try:
+                gas = await asyncio.shield(task)
+            except Exception:
+                return fallback
+            self._gas_limits[key] = gas * GAS_LIMIT_MARGIN_PERCENT // 100
+        return self._gas_limits[key]
@@ -0,0 +1,304 @@
+import json
+import os
+import sqlite3
+import time
+
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from .chunking import split_amount
+from .receipts import TransactionDropped
+from .recipients import RecipientFile
+
+JOURNAL_PATH = "distributions.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    created INTEGER NOT NULL,
+    chain_id INTEGER NOT NULL,
+    sender TEXT NOT NULL,
+    token TEXT NOT NULL,
+    total TEXT NOT NULL,
+    source TEXT,
+    source_size INTEGER,
+    source_mtime REAL,
+    source_count INTEGER,
+    source_amounts INTEGER,
+    recipients TEXT,
+    finished INTEGER
+);
+CREATE TABLE IF NOT EXISTS sends (
+    tx_hash TEXT PRIMARY KEY,
+    job INTEGER NOT NULL REFERENCES jobs(id),
+    seq INTEGER NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    nonce INTEGER NOT NULL,
+    raw_tx BLOB NOT NULL,
+    recipients TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    sent INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sends_by_job ON sends (job, seq);
+CREATE TABLE IF NOT EXISTS outcomes (
+    tx_hash TEXT PRIMARY KEY REFERENCES sends(tx_hash),
+    status TEXT NOT NULL,
+    settled INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS replacements (
+    tx_hash TEXT PRIMARY KEY,
+    replaces TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    nonce INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    fees TEXT NOT NULL,
+    raw_tx BLOB NOT NULL,
+    sent INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS replacements_by_original ON replacements (replaces);
+"""
+
+
+class Journal:
+    """Durable record of bulk distributions, kept in SQLite in WAL mode.
+
+    A job is created before anything is sent. Every distributeTokens chunk
+    is appended to `sends` (recipients, amount, nonce, signed transaction
+    and hash) and committed before it is broadcast, and its receipt status
+    is appended to `outcomes` once known, so after a crash each chunk is
+    either settled, provably unsent, or recoverable from its own signed
+    transaction. Rows are never updated except to mark a job finished.
+
+    Any transaction the engines replace with the same nonce, distribution
+    chunk or not, is appended to `replacements` with the hash of the
+    original it replaces, so a send can be followed to whatever was mined.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # Commit to disk before returning: a chunk must be on record before it is broadcast
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def create_job(self, chain_id, sender, token_info, total, source=None, recipients=None):
+        """Start a job for a scanned RecipientFile (`source`) or an in-memory list (`recipients`).
+
+        The file's size, modification time, recipient count and whether it
+        carries amounts are stored, so a resume neither re-scans it nor
+        runs on a file that changed.
+        """
+        path = size = mtime = count = amounts = None
+        if source is not None:
+            path = os.path.abspath(source.path)
+            size, mtime = os.path.getsize(path), os.path.getmtime(path)
+            count, amounts = source.count, int(source.has_amounts)
+        cursor = self.db.execute(
+            "INSERT INTO jobs (created, chain_id, sender, token, total, source, source_size, source_mtime, "
+            "source_count, source_amounts, recipients) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (int(time.time()), chain_id, sender, json.dumps(token_info), str(total), path, size, mtime, count, amounts,
+             None if recipients is None else "\n".join(recipients))
+        )
+        return Job(self, cursor.lastrowid)
+
+    def job(self, job_id):
+        return Job(self, job_id)
+
+    def unfinished_jobs(self, chain_id, sender):
+        rows = self.db.execute(
+            "SELECT id FROM jobs WHERE chain_id = ? AND sender = ? AND finished IS NULL ORDER BY id",
+            (chain_id, sender)
+        )
+        return [Job(self, job_id) for job_id, in rows]
+
+    def record_replacement(self, tx_hash, sender, nonce, kind, fees, signed_tx):
+        """Append a `kind` ('bump' or 'cancel') replacement of the original transaction `tx_hash`."""
+        self.db.execute(
+            "INSERT OR IGNORE INTO replacements (tx_hash, replaces, sender, nonce, kind, fees, raw_tx, sent) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (Web3.to_hex(signed_tx.hash), Web3.to_hex(tx_hash), sender, nonce, kind, json.dumps(fees),
+             bytes(signed_tx.raw_transaction), int(time.time()))
+        )
+
+    def replacements(self, tx_hash):
+        """(tx_hash, kind, raw_tx) of every replacement of a transaction, oldest first."""
+        if not isinstance(tx_hash, str):
+            tx_hash = Web3.to_hex(tx_hash)
+        return self.db.execute(
+            "SELECT tx_hash, kind, raw_tx FROM replacements WHERE replaces = ? ORDER BY rowid", (tx_hash,)
+        ).fetchall()
+
+
+class Job:
+    def __init__(self, journal, job_id):
+        self.journal = journal
+        self.db = journal.db
+        self.id = job_id
+        row = self.db.execute(
+            "SELECT created, token, total, source, source_size, source_mtime, source_count, source_amounts, recipients "
+            "FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"No distribution job {job_id}")
+        (self.created, token, total, self.source, self.source_size, self.source_mtime,
+         self.source_count, source_amounts, recipients) = row
+        self.source_amounts = bool(source_amounts)
+        self.token_info = json.loads(token)
+        self.total = int(total)
+        self.recipients = recipients.split("\n") if recipients else None
+
+    @property
+    def recipient_count(self):
+        return len(self.recipients) if self.recipients is not None else self.source_count
+
+    @property
+    def chunk_size(self):
+        """Chunk size of the first send; chunks must keep their boundaries across resumes."""
+        row = self.db.execute("SELECT chunk_size FROM sends WHERE job = ? LIMIT 1", (self.id,)).fetchone()
+        return row[0] if row else None
+
+    def settled(self):
+        """Sequence numbers of chunks that were mined successfully."""
+        rows = self.db.execute(
+            "SELECT s.seq FROM sends s JOIN outcomes o ON o.tx_hash = s.tx_hash WHERE s.job = ? AND o.status = 'success'",
+            (self.id,)
+        )
+        return {seq for seq, in rows}
+
+    def in_doubt(self):
+        """(nonce, tx_hash, raw_tx) of sends without a recorded outcome, lowest nonce first."""
+        return self.db.execute(
+            "SELECT s.nonce, s.tx_hash, s.raw_tx FROM sends s LEFT JOIN outcomes o ON o.tx_hash = s.tx_hash "
+            "WHERE s.job = ? AND o.tx_hash IS NULL ORDER BY s.nonce",
+            (self.id,)
+        ).fetchall()
+
+    def progress(self):
+        """(chunks settled, recipients paid)."""
+        return self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(s.recipients) - LENGTH(REPLACE(s.recipients, ',', '')) + 1), 0) "
+            "FROM sends s JOIN outcomes o ON o.tx_hash = s.tx_hash WHERE s.job = ? AND o.status = 'success'",
+            (self.id,)
+        ).fetchone()
+
+    def record_send(self, seq, chunk_size, nonce, signed_tx, recipients, amount):
+        self.db.execute(
+            "INSERT INTO sends (tx_hash, job, seq, chunk_size, nonce, raw_tx, recipients, amount, sent) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (Web3.to_hex(signed_tx.hash), self.id, seq, chunk_size, nonce, bytes(signed_tx.raw_transaction),
+             ",".join(recipients), str(amount), int(time.time()))
+        )
+
+    def record_outcome(self, tx_hash, status):
+        """Append the final status of a send: success, reverted or dropped."""
+        if not isinstance(tx_hash, str):
+            tx_hash = Web3.to_hex(tx_hash)
+        self.db.execute(
+            "INSERT OR IGNORE INTO outcomes (tx_hash, status, settled) VALUES (?, ?, ?)",
+            (tx_hash, status, int(time.time()))
+        )
+
+    def finish(self):
+        self.db.execute("UPDATE jobs SET finished = ? WHERE id = ?", (int(time.time()), self.id))
+
+    def make_chunks(self):
+        """The job's chunk factory for Engine.stream_distribution, over its file or stored list."""
+        if self.recipients is not None:
+            return lambda size: split_amount(self.total, self.recipients, size)
+        if (os.path.getsize(self.source), os.path.getmtime(self.source)) != (self.source_size, self.source_mtime):
+            raise Exception(f"{self.source} changed since the distribution started; it cannot be resumed safely")
+        recipients = RecipientFile(self.source, self.token_info["decimals"])
+        recipients.count, recipients.has_amounts = self.source_count, self.source_amounts
+        return lambda size: recipients.chunks(size, self.total)
+
+
+async def job_results(engine, job, burst=False):
+    """Results of a job's remaining chunks, streamed or, with `burst`, signed up front and sent at once."""
+    if burst:
+        for result in await engine.burst_distribution(job.token_info, job.total, job.make_chunks(), job=job):
+            yield result
+    else:
+        async for result in engine.stream_distribution(job.token_info, job.total, job.make_chunks(), job=job):
+            yield result
+
+
+async def _mined_status(engine, tx_hash, replacements):
+    """Outcome of a send or of whichever of its replacements was mined, None if none was."""
+    for candidate, kind in [(tx_hash, None)] + [(replacement, kind) for replacement, kind, _ in replacements]:
+        try:
+            receipt = await engine.w3.eth.get_transaction_receipt(candidate)
+        except TransactionNotFound:
+            continue
+        if kind == "cancel":
+            return "dropped"
+        return "success" if receipt.status == 1 else "reverted"
+    return None
+
+
+async def reconcile(engine, job):
+    """Settle every send of `job` whose outcome was never recorded.
+
+    Mined sends are settled from their receipt, or from the receipt of a
+    replacement that took their nonce (a mined cancellation counts as
+    dropped). The rest are rebroadcast from their stored signed
+    transactions, the latest replacement the node accepts first, with the
+    same nonce and hashes, so they can land at most once; nonce holes
+    below them (e.g. a lost approval) are filled with zero-value transfers
+    so they can be mined. A send whose nonce was taken by another
+    transaction is marked dropped and will be sent again. Returns False if
+    some send is still pending, in which case resuming could pay its
+    recipients twice.
+    """
+    rebroadcast = []
+    for nonce, tx_hash, raw_tx in job.in_doubt():
+        replacements = job.journal.replacements(tx_hash)
+        status = await _mined_status(engine, tx_hash, replacements)
+        if status is not None:
+            job.record_outcome(tx_hash, status)
+            continue
+        engine.receipts.track(tx_hash)
+        for replacement, kind, _ in replacements:
+            engine.receipts.replace(tx_hash, replacement, cancel=kind == "cancel")
+        # The latest replacement the node accepts, or else the original
+        error = None
+        for raw in [raw for _, _, raw in reversed(replacements)] + [raw_tx]:
+            try:
+                await engine.w3.eth.send_raw_transaction(raw)
+            except Exception as e:
+                if "already known" not in str(e).lower():
+                    error = e
+                    continue
+            error = None
+            break
+        if error is not None:
+            engine.receipts.forget(tx_hash)
+            status = await _mined_status(engine, tx_hash, replacements)
+            if status is None:
+                if "nonce too low" not in str(error).lower():
+                    raise error
+                status = "dropped"
+            job.record_outcome(tx_hash, status)
+            continue
+        rebroadcast.append((nonce, tx_hash))
+
+    if rebroadcast:
+        nonces = {nonce for nonce, _ in rebroadcast}
+        next_nonce = await engine.w3.eth.get_transaction_count(engine.address, "pending")
+        for nonce in range(next_nonce, max(nonces)):
+            if nonce not in nonces:
+                await engine.send_filler(nonce)
+    for _, tx_hash in rebroadcast:
+        try:
+            receipt = await engine.receipts.wait(tx_hash)
+        except TransactionDropped:
+            job.record_outcome(tx_hash, "dropped")
+            continue
+        except TimeoutError:
+            return False
+        job.record_outcome(tx_hash, "success" if receipt.status == 1 else "reverted")
+    await engine.nonces.sync()
+    return True
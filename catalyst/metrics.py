@@ -0,0 +1,207 @@
+import bisect
+import json
+import time
+
+from web3.middleware.base import Web3Middleware
+
+# Upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf"))
+# (family, label name, help) for the Prometheus export
+FAMILIES = {
+    "rpc": ("catalyst_rpc_request", "method", "JSON-RPC requests, by method"),
+    "phase": ("catalyst_phase", "phase", "engine phases (quote, estimate, preflight, build, sign, send, receipt) and whole operations")
+}
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.failures = 0
+
+    def observe(self, seconds, failed=False):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        if failed:
+            self.failures += 1
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            running += count
+            yield bound, running
+
+
+class Timer:
+    __slots__ = ("metrics", "key", "started")
+
+    def __init__(self, metrics, key):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.key, time.perf_counter() - self.started, failed=exc_type is not None)
+        return False
+
+    # Also usable in `async with`, next to other async context managers
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class NullMetrics:
+    """Stand-in used when metrics are off: no middleware, and phases cost one no-op context manager."""
+
+    enabled = False
+
+    def phase(self, name):
+        return NULL_TIMER
+
+    def install(self, w3):
+        pass
+
+    def export(self):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+class Metrics:
+    """Request counts, failure counts and latency histograms for RPC methods and engine phases.
+
+    `install` times every JSON-RPC request made through `w3`; a batch,
+    including raw provider batches, is recorded as one "batch" request.
+    `phase` times a block of engine code. `export` writes Prometheus text
+    when `output` ends in .prom and appends one JSON line per series
+    otherwise.
+    """
+
+    enabled = True
+
+    def __init__(self, output):
+        self.output = output
+        self.histograms = {}
+        self.started = time.time()
+
+    @classmethod
+    def from_settings(cls, settings):
+        output = settings.get("metrics_output")
+        return cls(output) if output else NULL_METRICS
+
+    def observe(self, key, seconds, failed=False):
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds, failed)
+
+    def phase(self, name):
+        return Timer(self, ("phase", name))
+
+    def install(self, w3):
+        w3.middleware_onion.add(rpc_metrics_middleware(self), "metrics")
+        # Raw batches (batching.py, the receipt tracker) go straight to the
+        # provider, so batches are timed there rather than in the middleware
+        w3.provider.make_batch_request = timed_request(
+            self, lambda requests: "batch", w3.provider.make_batch_request
+        )
+
+    def prometheus(self):
+        lines = []
+        for family, (name, label, description) in FAMILIES.items():
+            series = sorted((key[1], histogram) for key, histogram in self.histograms.items() if key[0] == family)
+            if not series:
+                continue
+            lines += [f"# HELP {name}_seconds Latency of {description}", f"# TYPE {name}_seconds histogram"]
+            for value, histogram in series:
+                for bound, count in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_seconds_bucket{{{label}="{value}",le="{le}"}} {count}')
+                lines.append(f'{name}_seconds_sum{{{label}="{value}"}} {histogram.total}')
+                lines.append(f'{name}_seconds_count{{{label}="{value}"}} {histogram.count}')
+            lines += [f"# HELP {name}_failures_total Failed {description}", f"# TYPE {name}_failures_total counter"]
+            for value, histogram in series:
+                lines.append(f'{name}_failures_total{{{label}="{value}"}} {histogram.failures}')
+        return "\n".join(lines) + "\n"
+
+    def json_lines(self):
+        finished = time.time()
+        for (family, value), histogram in sorted(self.histograms.items()):
+            yield json.dumps({
+                "started": int(self.started),
+                "finished": int(finished),
+                "family": family,
+                FAMILIES[family][1]: value,
+                "count": histogram.count,
+                "failures": histogram.failures,
+                "seconds": round(histogram.total, 6),
+                "buckets": {
+                    "+Inf" if bound == float("inf") else str(bound): count for bound, count in histogram.cumulative()
+                }
+            })
+
+    def export(self):
+        if not self.histograms:
+            return
+        if self.output.endswith(".prom"):
+            with open(self.output, "w") as file:
+                file.write(self.prometheus())
+        else:
+            with open(self.output, "a") as file:
+                for line in self.json_lines():
+                    file.write(line + "\n")
+
+
+def is_failure(response):
+    responses = response if isinstance(response, list) else [response]
+    return any(isinstance(item, dict) and "error" in item for item in responses)
+
+
+def timed_request(metrics, method, make_request):
+    async def request(*args):
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = await make_request(*args)
+            failed = is_failure(response)
+            return response
+        finally:
+            metrics.observe(("rpc", method(*args)), time.perf_counter() - started, failed)
+    return request
+
+
+def rpc_metrics_middleware(metrics):
+    """Web3 middleware class that records every request in `metrics`."""
+
+    class RpcMetricsMiddleware(Web3Middleware):
+        async def async_wrap_make_request(self, make_request):
+            return timed_request(metrics, lambda method, params: method, make_request)
+
+    return RpcMetricsMiddleware
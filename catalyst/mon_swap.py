@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from .chunking import to_base_units
+from .config import SETTINGS_PATH, load_settings
+from .contracts import NATIVE_TOKEN, ROUTER_OPTIONS, USDC_ADDRESS, USDT_ADDRESS, WMON_ADDRESS
+from .engine import DEFAULT_MAX_IN_FLIGHT
+from .quotes import DEFAULT_SLIPPAGE_BPS, min_out
+from .swap_plan import read_plan, run_burst, run_plan
+from .wallet_pool import WalletPool
+
+TOKENS = {
+    "MON": NATIVE_TOKEN,  # Gas token (ETH)
+    "wMON": WMON_ADDRESS,
+    "USDT": USDT_ADDRESS,
+    "USDC": USDC_ADDRESS
+}
+
+token_list = ["MON", "wMON", "USDT", "USDC"]
+SYMBOLS = {address: symbol for symbol, address in TOKENS.items()}
+
+
+async def ainput(prompt):
+    return await asyncio.to_thread(input, prompt)
+
+
+async def select_token(prompt):
+    while True:
+        print(f"\n{prompt}")
+        for i, token in enumerate(token_list, 1):
+            print(f"{i}. {token}")
+        try:
+            choice = int(await ainput("Enter number: "))
+            if 1 <= choice <= len(token_list):
+                return token_list[choice - 1]
+            else:
+                print("Number out of range.")
+        except ValueError:
+            print("Please enter a valid number.")
+
+
+async def get_balances(engine, token_decimals):
+    balances_wei = await engine.get_balances([engine.address], list(TOKENS.values()))
+    balances = {}
+    for token, address in TOKENS.items():
+        balances[token] = balances_wei[(engine.address, address)] / (10 ** token_decimals[token])
+    return balances
+
+
+async def connect(settings):
+    pool = WalletPool.from_settings(settings)
+    try:
+        await pool.connect()
+    except Exception:
+        print("Failed to connect to Monad Testnet", file=sys.stderr)
+        return None, None
+    decimals_by_address = await pool.primary.get_decimals(list(TOKENS.values()))
+    token_decimals = {token: decimals_by_address[address] for token, address in TOKENS.items()}
+    routers = [address for _, address in ROUTER_OPTIONS.values()]
+    for engine in pool.engines:
+        await engine.prefetch_allowances(list(TOKENS.values()), routers)
+    return pool, token_decimals
+
+
+async def run_headless(settings, plan_path, output_path, burst=False):
+    """Execute a swap plan without prompts, writing one JSON result per plan row.
+
+    Rows are spread over every wallet in `private_keys`, or with `burst`
+    signed ahead of time by the first wallet and broadcast all at once.
+    """
+    slippage_bps = settings.get("slippage_bps", DEFAULT_SLIPPAGE_BPS)
+    pool, token_decimals = await connect(settings)
+    if pool is None:
+        return 1
+    await pool.refresh_balances(list(TOKENS.values()))
+    output = open(output_path, "w") if output_path else sys.stdout
+    try:
+        def emit(result):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+        if burst:
+            summary = await run_burst(pool.primary, read_plan(plan_path), TOKENS, token_decimals, emit, slippage_bps)
+        else:
+            window = 2 * settings.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT) * len(pool.engines)
+            summary = await run_plan(pool, read_plan(plan_path), TOKENS, token_decimals, emit, window, slippage_bps)
+    finally:
+        await pool.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"Plan finished: {summary}", file=sys.stderr)
+    return 0 if summary["failed"] == 0 and summary["error"] == 0 else 1
+
+
+async def run(settings):
+    """The interactive swap prompt."""
+    slippage_bps = settings.get("slippage_bps", DEFAULT_SLIPPAGE_BPS)
+    pool, token_decimals = await connect(settings)
+    if pool is None:
+        return
+    engine = pool.primary
+
+    while True:
+        balances = await get_balances(engine, token_decimals)
+        print("\nCurrent balances:")
+        for token in token_list:
+            print(f"{token}: {balances[token]:.4f}")
+
+        from_token = await select_token("Select token to swap from:")
+        to_token = await select_token("Select token to swap to:")
+
+        if from_token == to_token:
+            print("Cannot swap to the same token.")
+            continue
+
+        try:
+            amount = float(await ainput("Enter amount to swap: "))
+            if amount <= 0:
+                print("Amount must be positive.")
+                continue
+            if amount > balances[from_token]:
+                print(f"Insufficient {from_token} balance.")
+                continue
+            amount_in = to_base_units(amount, token_decimals[from_token])
+        except ValueError:
+            print("Amount must be a number.")
+            continue
+
+        try:
+            quotes = await engine.quote(TOKENS[from_token], TOKENS[to_token], amount_in)
+            if not quotes or quotes[0].amount_out == 0:
+                print("No router can quote this swap.")
+                continue
+            print("\nQuotes:")
+            for quote in quotes:
+                print(f"{quote.router_name}: {quote.amount_out / (10 ** token_decimals[to_token]):.6f} {to_token}")
+            best = quotes[0]
+            print(f"Routing through {best.router_name} (max slippage {slippage_bps / 100}%)")
+            if len(best.path) > 2:
+                print(f"Path: {' -> '.join(SYMBOLS.get(token, token) for token in best.path)}")
+            def on_sent(tx_hash):
+                print(f"Transaction sent: {tx_hash.hex()}")
+
+            plan = engine.plan_split(TOKENS[from_token], TOKENS[to_token], amount_in)
+            if plan and len(plan.legs) > 1 and plan.gain_bps > 0:
+                unit = 10 ** token_decimals[to_token]
+                print(f"\nSplit across {len(plan.legs)} routes: {plan.amount_out / unit:.6f} {to_token} "
+                      f"vs {plan.baseline.amount_out / unit:.6f} {to_token} on {best.router_name} "
+                      f"(+{plan.gain_bps / 100:.2f}%)")
+                for leg in plan.legs:
+                    route = " -> ".join(SYMBOLS.get(token, token) for token in leg.path)
+                    print(f"  {leg.amount_in / (10 ** token_decimals[from_token]):.6f} {from_token} via "
+                          f"{leg.router_name} ({route}): {leg.amount_out / unit:.6f} {to_token}")
+                if (await ainput("Split the order? (y/n): ")).lower() != "y":
+                    plan = None
+            else:
+                plan = None
+            if plan:
+                success, _ = await engine.split_swap(plan, slippage_bps, on_sent)
+            else:
+                success, _ = await engine.swap(
+                    best.router_address,
+                    TOKENS[from_token],
+                    TOKENS[to_token],
+                    amount_in,
+                    min_out(best.amount_out, slippage_bps),
+                    on_sent=on_sent,
+                    path=best.path
+                )
+            if success:
+                print("Transaction successful")
+            else:
+                print("Transaction failed")
+        except Exception as e:
+            print(f"Error during swap: {e}")
+
+        choice = (await ainput("Enter 'q' to quit or any other key to continue: ")).lower()
+        if choice == "q":
+            break
+    await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swap tokens on the Monad testnet")
+    parser.add_argument("--settings", default=SETTINGS_PATH, help="settings file (default: %(default)s)")
+    parser.add_argument("--plan", help="run the swaps in a CSV or JSONL plan file without prompts")
+    parser.add_argument("--output", help="write plan results to this file instead of stdout")
+    parser.add_argument("--burst", action="store_true", help="sign every plan swap first, then broadcast them at once")
+    args = parser.parse_args()
+    settings = load_settings(args.settings)
+    if args.plan:
+        sys.exit(asyncio.run(run_headless(settings, args.plan, args.output, args.burst)))
+    asyncio.run(run(settings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import asyncio
+import heapq
+import threading
+
+
+class NonceManager:
+    """Nonce bookkeeping for one account: what is reserved, broadcast and handed back.
+
+    Nonces handed back with `release` are reused before new ones, so a
+    failed send never leaves a hole behind it. AsyncNonceManager adds the
+    parts that talk to the node.
+    """
+
+    def __init__(self, w3, address):
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next = None
+        self._released = []
+        self._reserved = set()
+        self._broadcast = set()
+
+    def _apply_chain_count(self, count):
+        if self._next is None or count >= self._next:
+            # Fresh seed, or another sender used the account: everything below count is taken
+            self._next = count
+            self._released = []
+        else:
+            # Nonces the node has not seen and nobody is working on are gaps to fill
+            known = self._reserved | self._broadcast | set(self._released)
+            self._released = [nonce for nonce in self._released if nonce >= count]
+            self._released.extend(nonce for nonce in range(count, self._next) if nonce not in known)
+            heapq.heapify(self._released)
+        self._broadcast = {nonce for nonce in self._broadcast if nonce >= count}
+
+    def _take(self):
+        with self._lock:
+            if self._released:
+                nonce = heapq.heappop(self._released)
+            else:
+                nonce = self._next
+                self._next += 1
+            self._reserved.add(nonce)
+            return nonce
+
+    def mark_sent(self, nonce):
+        with self._lock:
+            self._reserved.discard(nonce)
+            self._broadcast.add(nonce)
+
+    def mark_confirmed(self, nonce):
+        with self._lock:
+            self._broadcast.discard(nonce)
+
+    def release(self, nonce):
+        """Hand back a nonce whose transaction never reached the node."""
+        with self._lock:
+            self._reserved.discard(nonce)
+            if nonce not in self._released:
+                heapq.heappush(self._released, nonce)
+
+    def blocking_gaps(self):
+        """Unused nonces that hold up transactions already broadcast after them."""
+        with self._lock:
+            if not self._broadcast:
+                return []
+            highest = max(self._broadcast)
+            return sorted(nonce for nonce in self._released if nonce < highest)
+
+    def _claim_gap(self, nonce):
+        with self._lock:
+            if nonce not in self._released:
+                return False
+            self._released.remove(nonce)
+            heapq.heapify(self._released)
+            self._reserved.add(nonce)
+            return True
+
+
+class AsyncNonceManager(NonceManager):
+    """Allocate nonces for one account locally instead of asking the node per transaction.
+
+    The manager is seeded from the node's pending transaction count on first
+    use and only goes back to the node when `sync` is called, which callers
+    do after a failed send.
+    """
+
+    async def sync(self):
+        """Re-read the pending count from the node and detect gaps."""
+        count = await self.w3.eth.get_transaction_count(self.address, "pending")
+        with self._lock:
+            self._apply_chain_count(count)
+
+    def __init__(self, w3, address):
+        super().__init__(w3, address)
+        self._seeding = None
+
+    async def allocate(self):
+        if self._next is None:
+            # Concurrent first allocations share one read of the pending count
+            if self._seeding is None:
+                self._seeding = asyncio.ensure_future(self.sync())
+                self._seeding.add_done_callback(lambda _: setattr(self, "_seeding", None))
+            await asyncio.shield(self._seeding)
+        return self._take()
+
+    async def fill_gaps(self, send_filler):
+        """Fill blocking gaps by awaiting `send_filler(nonce)` for each of them.
+
+        `send_filler` should broadcast a transaction with the given nonce,
+        typically a zero-value transfer to self.
+        """
+        filled = []
+        for nonce in self.blocking_gaps():
+            if not self._claim_gap(nonce):
+                continue
+            try:
+                await send_filler(nonce)
+            except Exception:
+                self.release(nonce)
+                raise
+            self.mark_sent(nonce)
+            filled.append(nonce)
+        return filled
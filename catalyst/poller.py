@@ -0,0 +1,39 @@
+import asyncio
+
+
+class Poller:
+    """Calls `tick()` every `seconds` from a background task until stopped.
+
+    With `wait_first` the first call comes one interval after `start`
+    rather than at once. A tick that raises is simply retried on the next
+    one; the owner keeps whatever state lets it pick up where it failed.
+    """
+
+    def __init__(self, tick, seconds, wait_first=False):
+        self.tick = tick
+        self.seconds = seconds
+        self.wait_first = wait_first
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        if self.wait_first:
+            await asyncio.sleep(self.seconds)
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                pass
+            await asyncio.sleep(self.seconds)
@@ -0,0 +1,101 @@
+import asyncio
+
+from eth_abi import decode
+from web3 import Web3
+
+ERROR_SELECTOR = bytes.fromhex("08c379a0")  # Error(string)
+PANIC_SELECTOR = bytes.fromhex("4e487b71")  # Panic(uint256)
+PANIC_CODES = {
+    0x01: "assertion failed",
+    0x11: "arithmetic overflow or underflow",
+    0x12: "division by zero",
+    0x21: "invalid enum value",
+    0x22: "invalid storage byte array",
+    0x31: "pop on an empty array",
+    0x32: "array index out of bounds",
+    0x41: "out of memory",
+    0x51: "call to an invalid function"
+}
+# Node error messages that mean the transaction itself would fail, as opposed to the node failing
+FAILURE_MESSAGES = ("revert", "insufficient funds", "out of gas", "gas required exceeds", "invalid opcode")
+# Simulations per JSON-RPC batch
+MAX_BATCH = 100
+
+
+class Reverted(Exception):
+    """Raised instead of sending a transaction that simulation showed would revert."""
+
+    def __init__(self, reason):
+        super().__init__(f"Transaction would revert: {reason}")
+        self.reason = reason
+
+
+def decode_revert(data):
+    """Readable reason from revert data: Error(string), Panic(uint256) or a custom error selector."""
+    if not data:
+        return "reverted without a reason"
+    try:
+        if data[:4] == ERROR_SELECTOR:
+            return decode(["string"], data[4:])[0]
+        if data[:4] == PANIC_SELECTOR:
+            code = decode(["uint256"], data[4:])[0]
+            return f"panic 0x{code:02x} ({PANIC_CODES.get(code, 'unknown')})"
+    except Exception:
+        pass
+    return f"custom error 0x{data[:4].hex()}"
+
+
+def failure_reason(error):
+    """Revert reason for an eth_call error, or None if the error is the node's rather than the call's."""
+    message = str(error.get("message", ""))
+    data = error.get("data")
+    if isinstance(data, dict):
+        # Some nodes nest the revert data one level down
+        data = data.get("data")
+    if error.get("code") != 3 and not any(text in message.lower() for text in FAILURE_MESSAGES):
+        return None
+    if isinstance(data, str) and data.startswith("0x"):
+        return decode_revert(Web3.to_bytes(hexstr=data))
+    return message or "reverted without a reason"
+
+
+class Preflight:
+    """Simulates transactions with eth_call against the pending block before they are signed.
+
+    Simulations requested by concurrent tasks in the same event loop turn
+    (the swaps of a plan, a window of distribution chunks) go out as one
+    JSON-RPC batch. A simulation the node cannot answer counts as passing,
+    so a flaky node never stops a transaction from being sent.
+    """
+
+    def __init__(self, w3, block="pending"):
+        self.w3 = w3
+        self.block = block
+        self._queue = []
+
+    async def simulate(self, tx):
+        """None if `tx` (from, to, data, value, gas) would succeed, else its revert reason."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((tx, future))
+        if len(self._queue) == 1:
+            asyncio.ensure_future(self._flush())
+        return await future
+
+    async def _flush(self):
+        # Let every task that is ready this turn add its simulation first
+        await asyncio.sleep(0)
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), MAX_BATCH):
+            batch = queue[start:start + MAX_BATCH]
+            try:
+                responses = await self.w3.provider.make_batch_request(
+                    [("eth_call", [tx, self.block]) for tx, _ in batch]
+                )
+            except Exception:
+                responses = None
+            if not isinstance(responses, list):
+                responses = [None] * len(batch)
+            for (_, future), response in zip(batch, responses):
+                error = response.get("error") if isinstance(response, dict) else None
+                if not future.done():
+                    future.set_result(failure_reason(error) if isinstance(error, dict) else None)
@@ -0,0 +1,153 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from eth_abi import encode
+from eth_account._utils.signing import sign_transaction_dict
+from eth_keys import keys
+from hexbytes import HexBytes
+from web3 import Web3
+
+# Transactions per worker task; bigger batches spread the cost of the hop between processes
+SIGN_BATCH = 64
+# Raw transactions per eth_sendRawTransaction batch request
+BROADCAST_BATCH = 100
+
+
+class CallTemplate:
+    """ABI encoder for one function with its selector computed once."""
+
+    def __init__(self, signature, types):
+        self.selector = Web3.keccak(text=signature)[:4]
+        self.types = list(types)
+
+    def encode(self, *args):
+        return self.selector + encode(self.types, list(args))
+
+
+DISTRIBUTE_TOKENS = CallTemplate("distributeTokens(address,uint256,address[])", ["address", "uint256", "address[]"])
+DEPOSIT = CallTemplate("deposit()", [])
+WITHDRAW = CallTemplate("withdraw(uint256)", ["uint256"])
+SWAP_EXACT_ETH_FOR_TOKENS = CallTemplate(
+    "swapExactETHForTokens(uint256,address[],address,uint256)", ["uint256", "address[]", "address", "uint256"]
+)
+SWAP_EXACT_TOKENS_FOR_ETH = CallTemplate(
+    "swapExactTokensForETH(uint256,uint256,address[],address,uint256)",
+    ["uint256", "uint256", "address[]", "address", "uint256"]
+)
+SWAP_EXACT_TOKENS_FOR_TOKENS = CallTemplate(
+    "swapExactTokensForTokens(uint256,uint256,address[],address,uint256)",
+    ["uint256", "uint256", "address[]", "address", "uint256"]
+)
+
+
+class SignedTx:
+    """A transaction signed ahead of time, with the same fields as eth_account's SignedTransaction.
+
+    `tx` is the dict it was signed from, kept so it can be replaced later.
+    """
+
+    __slots__ = ("nonce", "raw_transaction", "hash", "tx")
+
+    def __init__(self, nonce, raw_transaction, tx_hash, tx=None):
+        self.nonce = nonce
+        self.raw_transaction = raw_transaction
+        self.hash = tx_hash
+        self.tx = tx
+
+
+# Key objects of this process, by private key
+_keys = {}
+
+
+def _key_object(private_key):
+    key = _keys.get(private_key)
+    if key is None:
+        key = _keys[private_key] = keys.PrivateKey(private_key)
+    return key
+
+
+def _sign_batch(private_key, txs):
+    # Signing with a ready key object skips the public key derivation that
+    # Account.sign_transaction repeats on every call
+    key = _key_object(private_key)
+    signed = []
+    for tx in txs:
+        _, _, _, raw = sign_transaction_dict(key, tx)
+        signed.append((tx["nonce"], bytes(raw), bytes(Web3.keccak(raw))))
+    return signed
+
+
+class SigningPool:
+    """Worker processes that sign for any number of keys, started on first use when there is more than one CPU.
+
+    Every wallet of a WalletPool signs on the same workers, so their number
+    does not grow with the number of keys.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+
+    def executor(self):
+        if self.workers <= 1:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class Signer:
+    """Signs batches of transactions for one key on a SigningPool.
+
+    Transactions travel in batches of SIGN_BATCH, so the ECDSA work runs in
+    parallel and off the event loop; each worker derives the key object
+    once and keeps it for later batches.
+    """
+
+    def __init__(self, private_key, pool):
+        self.private_key = bytes(Web3.to_bytes(hexstr=private_key) if isinstance(private_key, str) else private_key)
+        self.pool = pool
+
+    async def sign(self, txs):
+        """Sign complete transaction dicts (nonce, gas and fees included); returns SignedTx in the same order."""
+        batches = [txs[start:start + SIGN_BATCH] for start in range(0, len(txs), SIGN_BATCH)]
+        executor = self.pool.executor()
+        if executor is None:
+            results = [await asyncio.to_thread(_sign_batch, self.private_key, batch) for batch in batches]
+        else:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(executor, _sign_batch, self.private_key, batch) for batch in batches
+            ))
+        signed = [(nonce, raw, tx_hash) for batch in results for nonce, raw, tx_hash in batch]
+        return [SignedTx(nonce, HexBytes(raw), HexBytes(tx_hash), tx) for (nonce, raw, tx_hash), tx in zip(signed, txs)]
+
+
+async def broadcast_raw(w3, signed_txs):
+    """Send signed transactions, lowest nonce first, as eth_sendRawTransaction batches.
+
+    Batches go out one after another so the node sees the nonces in order.
+    Returns one error per transaction, None where the node accepted it.
+    """
+    errors = []
+    for start in range(0, len(signed_txs), BROADCAST_BATCH):
+        batch = signed_txs[start:start + BROADCAST_BATCH]
+        try:
+            responses = await w3.provider.make_batch_request(
+                [("eth_sendRawTransaction", [Web3.to_hex(tx.raw_transaction)]) for tx in batch]
+            )
+        except Exception as e:
+            responses = [{"error": {"message": str(e)}}] * len(batch)
+        if isinstance(responses, dict):
+            responses = [responses] * len(batch)
+        for response in responses:
+            error = response.get("error")
+            # A node that already has the transaction has accepted it
+            errors.append(None if error is None or "already known" in str(error).lower() else error)
+    return errors
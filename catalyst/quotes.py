@@ -0,0 +1,92 @@
+from eth_abi import encode
+from web3 import Web3
+
+from .batching import Read, async_batch_read, selector
+from .contracts import ROUTER_OPTIONS, WMON_ADDRESS, is_native
+
+GET_AMOUNTS_OUT = selector("getAmountsOut(uint256,address[])")
+DEFAULT_SLIPPAGE_BPS = 50
+
+
+def is_wrap(from_token, to_token):
+    """MON <-> WMON goes through WMON deposit/withdraw at 1:1, not a router."""
+    return (is_native(from_token) and to_token == WMON_ADDRESS) or (from_token == WMON_ADDRESS and is_native(to_token))
+
+
+def swap_path(from_token, to_token):
+    """Router path for a swap; MON legs are routed through WMON."""
+    if is_native(from_token):
+        return [WMON_ADDRESS, to_token]
+    if is_native(to_token):
+        return [from_token, WMON_ADDRESS]
+    return [from_token, to_token]
+
+
+def min_out(amount_out, slippage_bps=DEFAULT_SLIPPAGE_BPS):
+    return amount_out * (10000 - slippage_bps) // 10000
+
+
+class Quote:
+    def __init__(self, router_name, router_address, path, amount_in, amount_out):
+        self.router_name = router_name
+        self.router_address = router_address
+        self.path = path
+        self.amount_in = amount_in
+        self.amount_out = amount_out
+
+
+def amounts_out_read(router_address, amount_in, path):
+    data = GET_AMOUNTS_OUT + encode(["uint256", "address[]"], [amount_in, path])
+    return Read(Web3.to_checksum_address(router_address), data, output_type="uint256[]")
+
+
+async def quote_all(w3, from_token, to_token, amount_in, routers=None, local=None):
+    """Quote a swap on every router in one batched call, best first.
+
+    `routers` is a list of (name, address) pairs and defaults to all of
+    ROUTER_OPTIONS. Routers without a pool for the path are left out.
+    A `local` quoter (ReserveMirror or RouteFinder) answers instead when
+    it is current for every router; a RouteFinder may quote multi-hop
+    paths.
+    """
+    return (await quote_many(w3, [(from_token, to_token, amount_in, routers)], local))[0]
+
+
+async def quote_many(w3, swaps, local=None):
+    """quote_all for several (from_token, to_token, amount_in, routers) swaps at once.
+
+    Whatever `local` cannot answer is quoted on the routers of every swap
+    in a single batched call, however many swaps there are.
+    """
+    results = [None] * len(swaps)
+    reads = []
+    pending = []
+    for i, (from_token, to_token, amount_in, routers) in enumerate(swaps):
+        if local is not None:
+            results[i] = local.quote_all(from_token, to_token, amount_in, routers)
+            if results[i] is not None:
+                continue
+        if is_wrap(from_token, to_token):
+            results[i] = [Quote("WMON", WMON_ADDRESS, [], amount_in, amount_in)]
+            continue
+        if routers is None:
+            routers = list(ROUTER_OPTIONS.values())
+        path = swap_path(from_token, to_token)
+        pending.append((i, routers, path, len(reads)))
+        reads.extend(amounts_out_read(address, amount_in, path) for _, address in routers)
+    values = await async_batch_read(w3, reads)
+    for i, routers, path, start in pending:
+        quotes = [
+            Quote(name, address, path, swaps[i][2], amounts[-1])
+            for (name, address), amounts in zip(routers, values[start:start + len(routers)])
+            if amounts
+        ]
+        results[i] = sorted(quotes, key=lambda quote: quote.amount_out, reverse=True)
+    return results
+
+
+async def best_quote(w3, from_token, to_token, amount_in, routers=None, local=None):
+    quotes = await quote_all(w3, from_token, to_token, amount_in, routers, local)
+    if not quotes or quotes[0].amount_out == 0:
+        raise Exception("No router can quote this swap")
+    return quotes[0]
@@ -0,0 +1,222 @@
+import asyncio
+
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from .poller import Poller
+
+DEFAULT_POLL_SECONDS = 0.5
+DEFAULT_RECEIPT_TIMEOUT = 120
+# Blocks re-scanned when polling resumes after an idle period
+RESCAN_BLOCKS = 4
+# How long a transaction may stay unmined before we ask the node whether it still knows it
+DROP_CHECK_BLOCKS = 20
+# Settled receipts kept around for callers that wait after the fact
+MAX_SETTLED = 4096
+
+
+class TransactionDropped(Exception):
+    pass
+
+
+class TransactionCancelled(TransactionDropped):
+    """Dropped in favour of a mined zero-value replacement, which used up its nonce."""
+
+
+class ReceiptTracker:
+    """Resolve receipts for every outstanding transaction from one block poller.
+
+    Transactions are registered with `track` before they are broadcast, so
+    no block that could contain them is missed. The poller follows new
+    blocks and fetches each block's receipts once, which makes the cost
+    proportional to the number of blocks rather than the number of pending
+    transactions. Transactions that stay unmined for DROP_CHECK_BLOCKS
+    blocks are looked up in one batched call, and ones the node no longer
+    knows fail with TransactionDropped.
+
+    A transaction replaced with the same nonce (see `replace`) forms a
+    group with its replacements: waiters on any of their hashes get the
+    receipt of whichever is mined, and the group is only dropped once the
+    node knows none of them.
+    """
+
+    def __init__(self, w3, poll_seconds=DEFAULT_POLL_SECONDS, timeout=DEFAULT_RECEIPT_TIMEOUT):
+        self.w3 = w3
+        self.timeout = timeout
+        self._futures = {}
+        self._pending = {}
+        self._tracked_at = {}
+        # Replacement hash -> hash of the transaction it replaces, and the hashes of each group
+        self._roots = {}
+        self._groups = {}
+        self._cancels = set()
+        self._last_block = None
+        self._poller = Poller(self._tick, poll_seconds)
+        self._block_receipts_supported = True
+
+    @staticmethod
+    def _key(tx_hash):
+        return (tx_hash if isinstance(tx_hash, str) else Web3.to_hex(tx_hash)).lower()
+
+    def track(self, tx_hash):
+        key = self._key(tx_hash)
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[key] = future
+            self._pending[key] = future
+            self._tracked_at[key] = None
+        self.start()
+        return self._futures[key]
+
+    def forget(self, tx_hash):
+        """Stop tracking a transaction and its replacements, e.g. because its broadcast failed."""
+        key = self._key(tx_hash)
+        future = self._futures.pop(key, None)
+        self._pending.pop(key, None)
+        self._tracked_at.pop(key, None)
+        for replacement in self._groups.pop(key, ()):
+            self._futures.pop(replacement, None)
+            self._pending.pop(replacement, None)
+            self._tracked_at.pop(replacement, None)
+            self._roots.pop(replacement, None)
+            self._cancels.discard(replacement)
+        if future and not future.done():
+            future.cancel()
+
+    def replace(self, tx_hash, replacement_hash, cancel=False):
+        """Track `replacement_hash`, which reuses the nonce of `tx_hash`, as part of the same group.
+
+        If the replacement is a `cancel`, waiters get TransactionCancelled
+        when it is mined instead of its receipt.
+        """
+        root = self._key(tx_hash)
+        root = self._roots.get(root, root)
+        future = self.track(root)
+        key = self._key(replacement_hash)
+        if future.done() or key in self._futures:
+            return
+        self._futures[key] = future
+        self._pending[key] = future
+        self._tracked_at[key] = None
+        self._roots[key] = root
+        self._groups.setdefault(root, {root}).add(key)
+        if cancel:
+            self._cancels.add(key)
+
+    def forget_replacement(self, replacement_hash):
+        """Stop tracking one replacement, e.g. because its broadcast failed; the rest of its group stays."""
+        key = self._key(replacement_hash)
+        root = self._roots.pop(key, None)
+        if root is None:
+            return
+        self._futures.pop(key, None)
+        self._pending.pop(key, None)
+        self._tracked_at.pop(key, None)
+        self._cancels.discard(key)
+        self._groups[root].discard(key)
+
+    async def wait(self, tx_hash, timeout=None):
+        """Wait for the receipt of a transaction.
+
+        Transactions that were never tracked (sent elsewhere, or before a
+        restart) are looked up directly once, since they may have been
+        mined long before the poller's window.
+        """
+        if self._key(tx_hash) not in self._futures:
+            try:
+                return await self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                pass
+        future = self.track(tx_hash)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Transaction {self._key(tx_hash)} not mined after {timeout or self.timeout} seconds")
+
+    def start(self):
+        self._poller.start()
+
+    async def stop(self):
+        await self._poller.stop()
+
+    async def _tick(self):
+        if not self._pending:
+            self._last_block = None
+        else:
+            # A failed poll leaves _last_block alone, so the next tick starts from the same block
+            await self.poll()
+
+    async def poll(self):
+        head = await self.w3.eth.block_number
+        if self._last_block is None:
+            self._last_block = head - RESCAN_BLOCKS
+        blocks = range(self._last_block + 1, head + 1)
+        if blocks:
+            for receipts in await asyncio.gather(*(self._receipts_in(number) for number in blocks)):
+                for receipt in receipts:
+                    self._resolve(receipt)
+            self._last_block = head
+        for key in self._pending:
+            if self._tracked_at[key] is None:
+                self._tracked_at[key] = head
+        await self._check_dropped(head)
+
+    async def _receipts_in(self, number):
+        if self._block_receipts_supported:
+            try:
+                return await self.w3.eth.get_block_receipts(number)
+            except Exception:
+                # eth_getBlockReceipts is not available everywhere; fall back to block + receipts
+                self._block_receipts_supported = False
+        block = await self.w3.eth.get_block(number)
+        hashes = [tx_hash for tx_hash in block["transactions"] if self._key(tx_hash) in self._pending]
+        return await asyncio.gather(*(self.w3.eth.get_transaction_receipt(tx_hash) for tx_hash in hashes))
+
+    def _settle(self, key, receipt=None, error=None):
+        root = self._roots.get(key, key)
+        if receipt is not None and key in self._cancels:
+            error = TransactionCancelled(f"Transaction {root} was cancelled by {key}")
+        future = None
+        for member in self._groups.pop(root, (key,)):
+            future = self._pending.pop(member, None) or future
+            self._tracked_at.pop(member, None)
+            self._roots.pop(member, None)
+            self._cancels.discard(member)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(receipt)
+        settled = len(self._futures) - len(self._pending)
+        if settled > MAX_SETTLED:
+            for old_key in [k for k in self._futures if k not in self._pending][:settled - MAX_SETTLED]:
+                del self._futures[old_key]
+
+    def _resolve(self, receipt):
+        self._settle(self._key(receipt["transactionHash"]), receipt=receipt)
+
+    async def _check_dropped(self, head):
+        stale = [key for key, since in self._tracked_at.items() if since is not None and head - since >= DROP_CHECK_BLOCKS]
+        if not stale:
+            return
+        responses = await self.w3.provider.make_batch_request([("eth_getTransactionByHash", [key]) for key in stale])
+        if isinstance(responses, dict):
+            return
+        for key, response in zip(stale, responses):
+            if "error" in response:
+                continue
+            if response.get("result") is None:
+                root = self._roots.get(key, key)
+                group = self._groups.get(root, ())
+                if len(group) > 1:
+                    # Evicted, most likely by its own replacement; the group lives on in the others
+                    group.discard(key)
+                    self._pending.pop(key, None)
+                    self._tracked_at.pop(key, None)
+                    self._roots.pop(key, None)
+                else:
+                    self._settle(key, error=TransactionDropped(f"Transaction {root} was dropped by the node"))
+            elif key in self._pending:
+                # Still in the mempool; check again after another DROP_CHECK_BLOCKS blocks
+                self._tracked_at[key] = head
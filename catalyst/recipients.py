@@ -0,0 +1,211 @@
+import re
+from itertools import islice
+
+from web3 import Web3
+
+from .chunking import to_base_units
+
+ADDRESS_PATTERN = re.compile(r"^(0x)?[0-9a-fA-F]{40}$")
+ZERO_ADDRESS = bytes(20)
+# Lines parsed and validated per batch
+BATCH_LINES = 10_000
+# Recipient groups buffered at once when amounts differ per recipient
+MAX_OPEN_GROUPS = 64
+MAX_REPORTED_ERRORS = 5
+
+
+class AddressSet:
+    """Set of 20-byte addresses in one open-addressing table.
+
+    Each slot is 20 raw bytes in a single bytearray, so an entry costs
+    about 40 bytes at the maximum load factor instead of the ~100 bytes of
+    a bytes object in a Python set. The all-zero address marks an empty
+    slot and can therefore not be stored.
+    """
+
+    def __init__(self, capacity=1024):
+        self._capacity = capacity
+        self._table = bytearray(20 * capacity)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _slot(self, address):
+        mask = self._capacity - 1
+        index = hash(address) & mask
+        table = self._table
+        while True:
+            start = index * 20
+            entry = table[start:start + 20]
+            if entry == address or entry == ZERO_ADDRESS:
+                return start, entry == address
+            index = (index + 1) & mask
+
+    def __contains__(self, address):
+        return self._slot(address)[1]
+
+    def add(self, address):
+        """Add `address`; returns False if it was already present."""
+        if address == ZERO_ADDRESS:
+            raise ValueError("The zero address cannot be stored")
+        start, found = self._slot(address)
+        if found:
+            return False
+        self._table[start:start + 20] = address
+        self._size += 1
+        if self._size * 2 > self._capacity:
+            self._grow()
+        return True
+
+    def _grow(self):
+        old = self._table
+        self._capacity *= 2
+        self._table = bytearray(20 * self._capacity)
+        for start in range(0, len(old), 20):
+            entry = bytes(old[start:start + 20])
+            if entry != ZERO_ADDRESS:
+                slot, _ = self._slot(entry)
+                self._table[slot:slot + 20] = entry
+
+
+def parse_line(line):
+    """Split a recipient line into (address bytes, amount text or None).
+
+    Accepts `address` or `address,amount` (commas, semicolons or
+    whitespace). Mixed-case addresses must carry a valid checksum.
+    """
+    fields = re.split(r"[,;\s]+", line.strip())
+    address = fields[0]
+    if not ADDRESS_PATTERN.match(address):
+        raise ValueError(f"Invalid address: {address}")
+    digits = address[2:] if address.startswith("0x") else address
+    if digits != digits.lower() and digits != digits.upper() and not Web3.is_checksum_address("0x" + digits):
+        raise ValueError(f"Bad checksum: {address}")
+    raw = bytes.fromhex(digits)
+    if raw == ZERO_ADDRESS:
+        raise ValueError("The zero address cannot receive tokens")
+    if len(fields) > 2:
+        raise ValueError(f"Too many fields: {line.strip()}")
+    return raw, fields[1] if len(fields) == 2 else None
+
+
+class RecipientFile:
+    """Recipients read from a text or CSV file of any size, one per line.
+
+    `scan` makes a first pass that validates every line in batches and
+    counts recipients (and their total when lines carry amounts);
+    `chunks` makes a second pass that yields (recipients, amount) pairs
+    ready for distributeTokens. Only the set of addresses already seen is
+    kept in memory; duplicates after the first occurrence, blank lines,
+    '#' comments and a header line are skipped.
+    """
+
+    def __init__(self, path, decimals):
+        self.path = path
+        self.decimals = decimals
+        self.count = 0
+        self.total = 0
+        self.has_amounts = None
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors = []
+
+    def _records(self):
+        """Yield (line_number, address bytes, amount in base units or None, error) for every recipient line.
+
+        A duplicate comes back with address None and no error.
+        """
+        seen = AddressSet()
+        has_amounts = None
+        first = True
+        with open(self.path, "r", newline="") as file:
+            line_number = 0
+            while True:
+                batch = list(islice(file, BATCH_LINES))
+                if not batch:
+                    break
+                for line in batch:
+                    line_number += 1
+                    text = line.strip()
+                    if not text or text.startswith("#"):
+                        continue
+                    header_allowed, first = first, False
+                    try:
+                        raw, amount = parse_line(text)
+                        if has_amounts is None:
+                            has_amounts = amount is not None
+                        if has_amounts != (amount is not None):
+                            raise ValueError("Either every line or no line must have an amount")
+                        amount_wei = None if amount is None else to_base_units(amount, self.decimals)
+                        if amount_wei is not None and amount_wei <= 0:
+                            raise ValueError(f"Amount must be positive: {amount}")
+                    except Exception as e:
+                        # An unparseable first line (after blanks and comments) is a header
+                        if not header_allowed:
+                            yield line_number, None, None, e
+                        continue
+                    if seen.add(raw):
+                        yield line_number, raw, amount_wei, None
+                    else:
+                        yield line_number, None, None, None
+
+    def scan(self):
+        self.count = self.total = self.duplicates = self.invalid = 0
+        self.has_amounts = None
+        self.errors = []
+        for line_number, raw, amount, error in self._records():
+            if error is not None:
+                self.invalid += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append(f"line {line_number}: {error}")
+            elif raw is None:
+                self.duplicates += 1
+            else:
+                self.count += 1
+                if amount is not None:
+                    self.has_amounts = True
+                    self.total += amount
+        if self.has_amounts is None:
+            self.has_amounts = False
+        return self
+
+    def chunks(self, size, total=None):
+        """Yield (recipients, amount) pairs of at most `size` checksummed recipients.
+
+        Without per-line amounts `total` is split like chunking.split_amount
+        does, so the chunk amounts add up to exactly `total`. With amounts,
+        the distributor splits each call evenly, so recipients are grouped
+        by amount and each chunk carries amount x recipients.
+        """
+        if self.has_amounts is None:
+            self.scan()
+        if not self.has_amounts and total is None:
+            raise ValueError("A total amount is needed for a file without amounts")
+        count = self.count
+        index = 0
+        chunk = []
+        groups = {}
+        for _, raw, amount, _ in self._records():
+            if raw is None:
+                continue
+            address = Web3.to_checksum_address(raw)
+            if not self.has_amounts:
+                chunk.append(address)
+                index += 1
+                if len(chunk) == size or index == count:
+                    start = index - len(chunk)
+                    yield chunk, total * index // count - total * start // count
+                    chunk = []
+                continue
+            group = groups.setdefault(amount, [])
+            group.append(address)
+            if len(group) == size:
+                yield groups.pop(amount), amount * size
+            elif len(groups) > MAX_OPEN_GROUPS:
+                # Too many distinct amounts buffered; send the largest group early
+                largest = max(groups, key=lambda value: len(groups[value]))
+                recipients = groups.pop(largest)
+                yield recipients, largest * len(recipients)
+        for amount, recipients in groups.items():
+            yield recipients, amount * len(recipients)
@@ -0,0 +1,143 @@
+import time
+
+from web3 import Web3
+
+from .contracts import CHAIN_ID
+from .fees import FEE_FIELDS, replacement_fees
+from .journal import JOURNAL_PATH, Journal
+from .poller import Poller
+
+DEFAULT_REPLACE_AFTER_SECONDS = 15
+# Fee bumps sent for one nonce before it is left to confirm or be cancelled; the cancel itself is never capped
+MAX_BUMPS = 6
+CHECK_SECONDS = 1
+
+
+class _Watched:
+    __slots__ = ("engine", "nonce", "tx", "tx_hash", "first_sent", "last_sent", "bumps", "cancelled")
+
+    def __init__(self, engine, nonce, tx, tx_hash, now):
+        self.engine = engine
+        self.nonce = nonce
+        self.tx = tx
+        self.tx_hash = tx_hash
+        self.first_sent = now
+        self.last_sent = now
+        self.bumps = 0
+        self.cancelled = False
+
+
+class ReplacementManager:
+    """Resubmits transactions that miss a confirmation latency target, so one stuck nonce cannot hold up the rest.
+
+    Every transaction the engines broadcast is watched until a receipt
+    settles it. One still unmined `replace_after` seconds after it, or its
+    last replacement, was sent is signed again with the same nonce and
+    every fee field bumped by REPLACEMENT_BUMP_PERCENT (and at least the
+    current fees), which nodes accept as a replacement. Once
+    `cancel_after` seconds have passed since the first send, the
+    replacement is a zero-value transfer to ourselves instead, which frees
+    the nonce for good. Waiters on the original hash get the receipt of
+    whichever transaction is mined, or TransactionCancelled (a kind of
+    TransactionDropped) if it was the cancellation, so `cancel_after` plus
+    a few blocks bounds how long any send can stay unsettled. Every
+    replacement is appended to the journal before it is broadcast.
+    """
+
+    def __init__(self, fees, receipts, replace_after=DEFAULT_REPLACE_AFTER_SECONDS, cancel_after=None,
+                 journal_path=JOURNAL_PATH, check_seconds=CHECK_SECONDS):
+        self.fees = fees
+        self.receipts = receipts
+        self.replace_after = replace_after
+        self.cancel_after = cancel_after
+        self.journal_path = journal_path
+        self._watched = {}
+        self._journal = None
+        # A failed check leaves every entry watched, so the next tick looks at them again
+        self._poller = Poller(lambda: self.check(time.monotonic()), check_seconds, wait_first=True)
+
+    @property
+    def journal(self):
+        if self._journal is None:
+            self._journal = Journal(self.journal_path)
+        return self._journal
+
+    def watch(self, engine, nonce, tx, tx_hash):
+        """Watch a broadcast transaction of `engine`'s wallet until it is mined; `tx` is the dict it was signed from."""
+        future = self.receipts.track(tx_hash)
+        if future.done():
+            return
+        key = Web3.to_hex(tx_hash)
+        self._watched[key] = _Watched(engine, nonce, dict(tx), tx_hash, time.monotonic())
+        future.add_done_callback(lambda _: self._watched.pop(key, None))
+        self.start()
+
+    async def check(self, now):
+        """Replace every watched transaction that has waited `replace_after` seconds since its last send, and
+        cancel every one that has waited `cancel_after` seconds since its first."""
+        due = [(key, entry) for key, entry in self._watched.items() if self._due(entry, now)]
+        for key, entry in due:
+            await self._replace(key, entry, now)
+
+    def _cancel_due(self, entry, now):
+        if entry.cancelled or not self.cancel_after or now - entry.first_sent < self.cancel_after:
+            return False
+        # The first attempt goes out at once, however recent the last bump; a failed one is retried like a bump
+        return entry.last_sent - entry.first_sent < self.cancel_after or now - entry.last_sent >= self.replace_after
+
+    def _due(self, entry, now):
+        if self._cancel_due(entry, now):
+            return True
+        return now - entry.last_sent >= self.replace_after and entry.bumps < MAX_BUMPS
+
+    async def _replace(self, key, entry, now):
+        engine = entry.engine
+        cancel = entry.cancelled or self._cancel_due(entry, now)
+        fees = replacement_fees(entry.tx, await self.fees.fee_fields())
+        if cancel:
+            tx = {
+                "from": engine.address, "to": engine.address, "value": 0, "nonce": entry.nonce, "gas": 21000,
+                "chainId": CHAIN_ID, **fees
+            }
+        else:
+            tx = {name: value for name, value in entry.tx.items() if name not in FEE_FIELDS}
+            tx.update(fees)
+        signed_tx = engine.account.sign_transaction(tx)
+        # On record before it is broadcast, like every distribution chunk, so a resume can follow it
+        self.journal.record_replacement(entry.tx_hash, engine.address, entry.nonce, "cancel" if cancel else "bump",
+                                        fees, signed_tx)
+        self.receipts.replace(entry.tx_hash, signed_tx.hash, cancel)
+        if not cancel or entry.cancelled:
+            entry.bumps += 1
+        entry.last_sent = now
+        try:
+            with engine.metrics.phase("replace"):
+                await engine.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception as e:
+            message = str(e).lower()
+            if "already known" in message:
+                pass
+            elif "nonce too low" in message:
+                # Something with this nonce was mined; its receipt settles the waiters
+                self.receipts.forget_replacement(signed_tx.hash)
+                self._watched.pop(key, None)
+                return
+            else:
+                self.receipts.forget_replacement(signed_tx.hash)
+                if "underpriced" in message:
+                    # Bump from these fees next time, so the following attempt clears the node's bar
+                    for name in FEE_FIELDS:
+                        entry.tx.pop(name, None)
+                    entry.tx.update(fees)
+                return
+        entry.tx = tx
+        entry.cancelled = cancel
+
+    def start(self):
+        self._poller.start()
+
+    async def stop(self):
+        await self._poller.stop()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
@@ -0,0 +1,231 @@
+import time
+from itertools import combinations
+
+from eth_abi import encode
+from web3 import Web3
+
+from .batching import Read, async_batch_read, selector
+from .contracts import KNOWN_TOKENS, ROUTER_OPTIONS, WMON_ADDRESS, is_native
+from .poller import Poller
+from .quotes import Quote, amounts_out_read, is_wrap, swap_path
+
+FACTORY = selector("factory()")
+GET_PAIR = selector("getPair(address,address)")
+TOKEN0 = selector("token0()")
+GET_RESERVES = selector("getReserves()")
+SYNC_TOPIC = Web3.to_hex(Web3.keccak(text="Sync(uint112,uint112)"))
+
+# Swap fees (numerator, denominator) of UniswapV2 forks; each router's is found by comparing with getAmountsOut
+FEE_CANDIDATES = ((997, 1000), (9975, 10000), (998, 1000), (999, 1000))
+DEFAULT_POLL_SECONDS = 0.5
+# Local quotes are only used while the last successful poll is at most this old
+MAX_STALENESS_SECONDS = 5
+# Widest eth_getLogs range asked for; after a longer gap the reserves are reloaded instead
+MAX_LOG_BLOCKS = 100
+
+
+class Pair:
+    __slots__ = ("address", "router", "token0", "token1", "reserve0", "reserve1", "version")
+
+    def __init__(self, address, router, token0, token1, reserve0=0, reserve1=0):
+        self.address = address
+        self.router = router
+        self.token0 = token0
+        self.token1 = token1
+        self.reserve0 = reserve0
+        self.reserve1 = reserve1
+        # Bumped on every reserve change, so anything derived from the reserves can tell it is stale
+        self.version = 0
+
+    def reserves(self, token_in):
+        """(reserve in, reserve out) for a swap that sells `token_in`."""
+        if token_in == self.token0:
+            return self.reserve0, self.reserve1
+        return self.reserve1, self.reserve0
+
+
+class ReserveMirror:
+    """Local copy of the UniswapV2 pair reserves behind every router, for quoting without RPC.
+
+    `load` finds each router's factory and pairs for all token pairs and
+    reads their reserves and the router's swap fee (four batched calls in
+    total). After that the mirror fetches the Sync logs of every pair once
+    per block with a single eth_getLogs and applies them, so quotes are
+    computed locally from the constant-product formula and need no RPC at
+    all. Routers whose factory or fee cannot be determined are not
+    mirrored; quotes involving them go to the router as before.
+    """
+
+    def __init__(self, w3, tokens=None, routers=None, poll_seconds=DEFAULT_POLL_SECONDS):
+        self.w3 = w3
+        if tokens is None:
+            tokens = [token["address"] for token in KNOWN_TOKENS if not is_native(token["address"])]
+        self.tokens = [Web3.to_checksum_address(token) for token in tokens]
+        self.routers = list(ROUTER_OPTIONS.values()) if routers is None else routers
+        self.fees = {}
+        self.pairs = {}
+        # Bumped on every full load, which replaces the set of pairs
+        self.generation = 0
+        self._by_tokens = {}
+        self._last_block = None
+        self._synced_at = None
+        self._poller = Poller(self.poll, poll_seconds)
+
+    @property
+    def fresh(self):
+        return self._synced_at is not None and time.monotonic() - self._synced_at <= MAX_STALENESS_SECONDS
+
+    async def load(self):
+        """Read every pair's reserves from scratch."""
+        head = await self.w3.eth.block_number
+        routers = [address for _, address in self.routers]
+        factories = await async_batch_read(self.w3, [Read(router, FACTORY, output_type="address") for router in routers])
+
+        candidates = [
+            (router, token_a, token_b)
+            for router, factory in zip(routers, factories) if factory
+            for token_a, token_b in combinations(self.tokens, 2)
+        ]
+        factory_of = dict(zip(routers, factories))
+        pair_addresses = await async_batch_read(self.w3, [
+            Read(factory_of[router], GET_PAIR + encode(["address", "address"], [token_a, token_b]), output_type="address")
+            for router, token_a, token_b in candidates
+        ])
+        found = [
+            (Web3.to_checksum_address(address), router, token_a, token_b)
+            for (router, token_a, token_b), address in zip(candidates, pair_addresses)
+            if address and int(address, 16) != 0
+        ]
+
+        reads = []
+        for address, _, _, _ in found:
+            reads.append(Read(address, TOKEN0, output_type="address"))
+            reads.append(Read(address, GET_RESERVES, output_type="(uint112,uint112,uint32)"))
+        values = await async_batch_read(self.w3, reads)
+        pairs = {}
+        for (address, router, token_a, token_b), token0, reserves in zip(found, values[::2], values[1::2]):
+            if token0 is None or reserves is None:
+                continue
+            token0 = Web3.to_checksum_address(token0)
+            token1 = token_b if token0 == token_a else token_a
+            pairs[address] = Pair(address, router, token0, token1, reserves[0], reserves[1])
+
+        self.fees = await self._calibrate(pairs.values())
+        self.pairs = {address: pair for address, pair in pairs.items() if pair.router in self.fees}
+        self._by_tokens = {}
+        for pair in self.pairs.values():
+            self._by_tokens[(pair.router, pair.token0, pair.token1)] = pair
+            self._by_tokens[(pair.router, pair.token1, pair.token0)] = pair
+        self.generation += 1
+        self._last_block = head
+        self._synced_at = time.monotonic()
+
+    async def _calibrate(self, pairs):
+        """Find each router's fee by asking it to quote a swap on one of its pairs."""
+        probes = {}
+        for pair in pairs:
+            if pair.router not in probes and pair.reserve0 > 1000 and pair.reserve1 > 0:
+                probes[pair.router] = (pair, pair.reserve0 // 100)
+        routers = list(probes)
+        quoted = await async_batch_read(self.w3, [
+            amounts_out_read(router, probe, [pair.token0, pair.token1]) for router, (pair, probe) in probes.items()
+        ])
+        fees = {}
+        for router, amounts in zip(routers, quoted):
+            if not amounts:
+                continue
+            pair, amount = probes[router]
+            for fee in FEE_CANDIDATES:
+                if amount_out(amount, pair.reserve0, pair.reserve1, *fee) == amounts[-1]:
+                    fees[router] = fee
+                    break
+        return fees
+
+    async def poll(self):
+        """Apply the Sync logs of every block since the last poll."""
+        head = await self.w3.eth.block_number
+        if self._last_block is None or head - self._last_block > MAX_LOG_BLOCKS:
+            await self.load()
+            return
+        if head > self._last_block and self.pairs:
+            logs = await self.w3.eth.get_logs({
+                "fromBlock": self._last_block + 1,
+                "toBlock": head,
+                "address": list(self.pairs),
+                "topics": [SYNC_TOPIC]
+            })
+            # Sync carries absolute reserves, so applying the logs in order leaves the latest ones
+            for log in logs:
+                pair = self.pairs.get(Web3.to_checksum_address(log["address"]))
+                if pair is not None:
+                    data = bytes(log["data"])
+                    pair.reserve0 = int.from_bytes(data[:32], "big")
+                    pair.reserve1 = int.from_bytes(data[32:64], "big")
+                    pair.version += 1
+        self._last_block = head
+        self._synced_at = time.monotonic()
+
+    def start(self):
+        self._poller.start()
+
+    async def stop(self):
+        await self._poller.stop()
+
+    def pair(self, router, token_in, token_out):
+        return self._by_tokens.get((router, token_in, token_out))
+
+    def amounts_out(self, router, path, amounts):
+        """Output of `path` on `router` for each of `amounts`, or None if a hop has no liquidity.
+
+        Computed exactly like UniswapV2Library.getAmountsOut, one hop at a
+        time over the whole list of amounts.
+        """
+        if router not in self.fees:
+            return None
+        numerator, denominator = self.fees[router]
+        for token_in, token_out in zip(path, path[1:]):
+            pair = self.pair(router, token_in, token_out)
+            if pair is None:
+                return None
+            reserve_in, reserve_out = pair.reserves(token_in)
+            if not reserve_in or not reserve_out:
+                return None
+            scaled_reserve_in = reserve_in * denominator
+            amounts = [
+                amount * numerator * reserve_out // (scaled_reserve_in + amount * numerator) for amount in amounts
+            ]
+        return amounts
+
+    def covers(self, routers=None):
+        """Whether local quotes for `routers` (default: all) are complete and current."""
+        routers = self.routers if routers is None else routers
+        return self.fresh and all(address in self.fees for _, address in routers)
+
+    def quote_all(self, from_token, to_token, amount_in, routers=None):
+        """quotes.quote_all from local reserves; None when some router is not mirrored or the mirror is stale."""
+        if not self.covers(routers):
+            return None
+        return self.quote_many(from_token, to_token, [amount_in], routers)[0]
+
+    def quote_many(self, from_token, to_token, amounts, routers=None):
+        """Quotes for each of `amounts`, every router's quote best first, from local reserves."""
+        if routers is None:
+            routers = self.routers
+        if is_wrap(from_token, to_token):
+            return [[Quote("WMON", WMON_ADDRESS, [], amount, amount)] for amount in amounts]
+        path = swap_path(from_token, to_token)
+        quotes = [[] for _ in amounts]
+        for name, address in routers:
+            outputs = self.amounts_out(address, path, amounts)
+            if outputs is None:
+                continue
+            for amount_quotes, amount, output in zip(quotes, amounts, outputs):
+                amount_quotes.append(Quote(name, address, path, amount, output))
+        for amount_quotes in quotes:
+            amount_quotes.sort(key=lambda quote: quote.amount_out, reverse=True)
+        return quotes
+
+
+def amount_out(amount_in, reserve_in, reserve_out, numerator=997, denominator=1000):
+    amount_in_with_fee = amount_in * numerator
+    return amount_in_with_fee * reserve_out // (reserve_in * denominator + amount_in_with_fee)
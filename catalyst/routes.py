@@ -0,0 +1,186 @@
+from .contracts import WMON_ADDRESS, is_native
+from .quotes import Quote, is_wrap
+
+# Longest path searched, in swaps
+MAX_HOPS = 3
+# Cached (from, to, size bucket) lookups kept before the cache is cleared
+MAX_CACHED_ROUTES = 4096
+# Slices a split order is divided into; each goes to the route with the best marginal output
+SPLIT_STEPS = 100
+# Legs smaller than this share of a split order are not worth their gas, in basis points
+MIN_LEG_BPS = 500
+
+
+class SplitPlan:
+    """A swap divided into legs (Quotes) over pools that share no pair, next to the best single-route quote."""
+
+    def __init__(self, from_token, to_token, legs, baseline):
+        self.from_token = from_token
+        self.to_token = to_token
+        self.legs = legs
+        self.baseline = baseline
+        self.amount_in = sum(leg.amount_in for leg in legs)
+        self.amount_out = sum(leg.amount_out for leg in legs)
+
+    @property
+    def gain_bps(self):
+        """Extra output over the baseline, in basis points."""
+        if not self.baseline.amount_out:
+            return 0
+        return (self.amount_out - self.baseline.amount_out) * 10000 // self.baseline.amount_out
+
+
+class RouteFinder:
+    """Best multi-hop paths over the pair graph of a ReserveMirror.
+
+    The mirror's pairs are indexed as one adjacency map per router, and
+    for each (from, to) the simple paths of up to `max_hops` swaps are
+    enumerated once. A lookup evaluates those paths locally for the amount
+    and keeps the best one per router, cached per size bucket (amounts of
+    the same bit length). A cached entry is reused until a reserve of any
+    pair it considered changes; a reload of the mirror rebuilds the index.
+    """
+
+    def __init__(self, reserves, max_hops=MAX_HOPS):
+        self.reserves = reserves
+        self.max_hops = max_hops
+        self._generation = None
+        self._graph = {}
+        self._paths = {}
+        self._cache = {}
+
+    def _index(self):
+        if self._generation == self.reserves.generation:
+            return
+        graph = {}
+        for pair in self.reserves.pairs.values():
+            adjacency = graph.setdefault(pair.router, {})
+            adjacency.setdefault(pair.token0, []).append((pair.token1, pair))
+            adjacency.setdefault(pair.token1, []).append((pair.token0, pair))
+        self._graph = graph
+        self._paths = {}
+        self._cache = {}
+        self._generation = self.reserves.generation
+
+    def paths(self, router, start, end):
+        """Every path from `start` to `end` on `router` of at most max_hops swaps, as (tokens, pairs)."""
+        key = (router, start, end)
+        if key not in self._paths:
+            adjacency = self._graph.get(router, {})
+            found = []
+
+            def walk(tokens, pairs):
+                for token, pair in adjacency.get(tokens[-1], ()):
+                    if token == end:
+                        found.append((tokens + [token], pairs + [pair]))
+                    elif token not in tokens and len(pairs) + 1 < self.max_hops:
+                        walk(tokens + [token], pairs + [pair])
+
+            walk([start], [])
+            self._paths[key] = found
+        return self._paths[key]
+
+    def _best_paths(self, routers, start, end, amount_in):
+        """[(name, router, tokens)] with each router's best path for `amount_in`, and the pairs that decided it."""
+        best = []
+        considered = []
+        for name, router in routers:
+            top = None
+            for tokens, pairs in self.paths(router, start, end):
+                considered.extend(pairs)
+                amounts = self.reserves.amounts_out(router, tokens, [amount_in])
+                if amounts is not None and (top is None or amounts[0] > top[0]):
+                    top = (amounts[0], tokens)
+            if top is not None:
+                best.append((name, router, top[1]))
+        return best, considered
+
+    def routes(self, start, end, amount_in, routers):
+        self._index()
+        key = (start, end, amount_in.bit_length(), tuple(routers))
+        cached = self._cache.get(key)
+        if cached is not None:
+            best, considered, versions = cached
+            if all(pair.version == version for pair, version in zip(considered, versions)):
+                return best
+        best, considered = self._best_paths(routers, start, end, amount_in)
+        if len(self._cache) >= MAX_CACHED_ROUTES:
+            self._cache.clear()
+        self._cache[key] = (best, considered, [pair.version for pair in considered])
+        return best
+
+    def _candidates(self, routers, start, end, amount_in):
+        """Routes whose pools are disjoint, best first: each router's paths that share no pair with a better one."""
+        routes = []
+        for name, router in routers:
+            for tokens, pairs in self.paths(router, start, end):
+                amounts = self.reserves.amounts_out(router, tokens, [amount_in])
+                if amounts is not None and amounts[0] > 0:
+                    routes.append((amounts[0], name, router, tokens, pairs))
+        routes.sort(key=lambda route: route[0], reverse=True)
+        used = set()
+        candidates = []
+        for _, name, router, tokens, pairs in routes:
+            if not used.intersection(pairs):
+                used.update(pairs)
+                candidates.append((name, router, tokens))
+        return candidates
+
+    def split(self, from_token, to_token, amount_in, routers=None, steps=SPLIT_STEPS):
+        """SplitPlan that maximizes the total output of `amount_in`; None when the mirror cannot answer.
+
+        Pools that share no pair move independently, so each candidate
+        route's output is tabulated at every multiple of amount_in / steps
+        in one vectorized call, and slices are handed out one at a time to
+        the route whose next slice adds the most output. For these concave
+        curves that is optimal to within one slice. Legs below MIN_LEG_BPS
+        are dropped and the order is split again without them.
+        """
+        quotes = self.quote_all(from_token, to_token, amount_in, routers)
+        if not quotes or is_wrap(from_token, to_token):
+            return None
+        self._index()
+        start = WMON_ADDRESS if is_native(from_token) else from_token
+        end = WMON_ADDRESS if is_native(to_token) else to_token
+        routers = self.reserves.routers if routers is None else routers
+        candidates = self._candidates(routers, start, end, amount_in // len(routers))
+        step = amount_in // steps
+        if not candidates or not step:
+            return None
+        while True:
+            tables = [
+                self.reserves.amounts_out(router, tokens, [step * count for count in range(steps + 1)])
+                for _, router, tokens in candidates
+            ]
+            shares = [0] * len(candidates)
+            for _ in range(steps):
+                best = max(range(len(candidates)), key=lambda i: tables[i][shares[i] + 1] - tables[i][shares[i]])
+                shares[best] += 1
+            kept = [i for i, share in enumerate(shares) if share * 10000 >= steps * MIN_LEG_BPS]
+            if not kept or len(kept) == len([share for share in shares if share]):
+                break
+            candidates = [candidates[i] for i in kept]
+        legs = []
+        # The rounding remainder goes to the largest leg
+        largest = max(range(len(shares)), key=lambda i: shares[i])
+        for i, ((name, router, tokens), share) in enumerate(zip(candidates, shares)):
+            if share:
+                leg_in = step * share + (amount_in - step * steps if i == largest else 0)
+                legs.append(Quote(name, router, tokens, leg_in, self.reserves.amounts_out(router, tokens, [leg_in])[0]))
+        return SplitPlan(from_token, to_token, legs, quotes[0])
+
+    def quote_all(self, from_token, to_token, amount_in, routers=None):
+        """quotes.quote_all over the best path on each router; None when the mirror cannot answer."""
+        if not self.reserves.covers(routers):
+            return None
+        if is_wrap(from_token, to_token):
+            return [Quote("WMON", WMON_ADDRESS, [], amount_in, amount_in)]
+        # MON legs trade WMON on the router
+        start = WMON_ADDRESS if is_native(from_token) else from_token
+        end = WMON_ADDRESS if is_native(to_token) else to_token
+        routers = self.reserves.routers if routers is None else routers
+        quotes = [
+            Quote(name, router, tokens, amount_in, self.reserves.amounts_out(router, tokens, [amount_in])[0])
+            for name, router, tokens in self.routes(start, end, amount_in, routers)
+        ]
+        return sorted(quotes, key=lambda quote: quote.amount_out, reverse=True)
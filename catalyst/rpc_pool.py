@@ -0,0 +1,225 @@
+import asyncio
+import time
+
+from aiohttp import ClientError, ClientResponseError, ClientSession, ClientTimeout, TCPConnector
+from web3 import AsyncWeb3, Web3
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from .poller import Poller
+
+DEFAULT_HEALTH_SECONDS = 5
+REQUEST_TIMEOUT_SECONDS = 10
+# Keep-alive connections held open to each node
+CONNECTIONS_PER_ENDPOINT = 32
+KEEPALIVE_SECONDS = 60
+# Weight of the newest sample in a node's moving-average latency
+LATENCY_SMOOTHING = 0.3
+# Reads skip nodes this many blocks behind the highest head seen
+MAX_LAG_BLOCKS = 3
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 0.25
+MAX_COOLDOWN_SECONDS = 30
+# Answers that depend on the node's mempool, so they come from the node we broadcast to
+PINNED_METHODS = {"eth_sendRawTransaction", "eth_getTransactionCount", "eth_getTransactionByHash"}
+RATE_LIMIT_CODES = {-32005, -32090, 429}
+CONNECTION_ERRORS = (ClientError, asyncio.TimeoutError, OSError)
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("Rate limited by RPC endpoint")
+        self.retry_after = retry_after
+
+
+def is_rate_limit(response):
+    responses = response if isinstance(response, list) else [response]
+    for item in responses:
+        error = item.get("error") if isinstance(item, dict) else None
+        if isinstance(error, dict):
+            message = str(error.get("message", "")).lower()
+            if error.get("code") in RATE_LIMIT_CODES or "rate limit" in message or "too many requests" in message:
+                return True
+    return False
+
+
+def retry_after(headers):
+    try:
+        return float(headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class Endpoint:
+    """One RPC node with its moving-average latency, last head and failure state."""
+
+    def __init__(self, url):
+        self.url = url
+        # Retries are handled by the pool, which can move them to another node
+        self.provider = AsyncWeb3.AsyncHTTPProvider(
+            url, request_kwargs={"timeout": ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)},
+            exception_retry_configuration=None
+        )
+        self.latency = None
+        self.head = None
+        self.failures = 0
+        self.down_until = 0
+        self.throttled_until = 0
+
+    def healthy(self, now):
+        return now >= self.down_until
+
+    def record_success(self, seconds):
+        self.latency = seconds if self.latency is None else self.latency + LATENCY_SMOOTHING * (seconds - self.latency)
+        self.failures = 0
+        self.down_until = 0
+
+    def record_failure(self):
+        self.failures += 1
+        self.down_until = time.monotonic() + min(BACKOFF_SECONDS * 2**self.failures, MAX_COOLDOWN_SECONDS)
+
+
+class RpcPool(AsyncJSONBaseProvider):
+    """Async web3 provider spreading requests over several RPC nodes.
+
+    Every node is reached through one shared keep-alive session instead of
+    a new connection per request. A background task samples each node's
+    head and latency every `health_seconds`; real requests feed the same
+    latency average. Reads go to the fastest healthy node that is not
+    lagging behind, while sends (and the nonce and mempool lookups that
+    must agree with them) stay pinned to one node until it fails.
+
+    Connection errors put a node in a growing cooldown and the request
+    moves to the next node; rate limits (HTTP 429 or the usual JSON-RPC
+    codes) are retried with exponential backoff. Any URL works, so the
+    pool can be pointed at local stand-in nodes.
+    """
+
+    def __init__(self, urls, health_seconds=DEFAULT_HEALTH_SECONDS):
+        super().__init__()
+        if isinstance(urls, str):
+            urls = [urls]
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+        self.endpoints = [Endpoint(url) for url in dict.fromkeys(urls)]
+        self._pinned = self.endpoints[0]
+        self._session = None
+        self._poller = Poller(self.check, health_seconds, wait_first=True)
+
+    def __str__(self):
+        return f"RPC pool {', '.join(endpoint.url for endpoint in self.endpoints)}"
+
+    async def _open(self):
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                raise_for_status=True,
+                connector=TCPConnector(limit_per_host=CONNECTIONS_PER_ENDPOINT, keepalive_timeout=KEEPALIVE_SECONDS)
+            )
+            for endpoint in self.endpoints:
+                await endpoint.provider.cache_async_session(self._session)
+
+    def read_endpoint(self):
+        """The fastest healthy, in-sync and unthrottled node.
+
+        Nodes that have not been measured yet go first so they get a
+        latency, unless they failed recently.
+        """
+        now = time.monotonic()
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy(now)]
+        heads = [endpoint.head for endpoint in healthy if endpoint.head is not None]
+        if heads:
+            healthy = [e for e in healthy if e.head is None or e.head >= max(heads) - MAX_LAG_BLOCKS]
+        candidates = [e for e in healthy if now >= e.throttled_until] or healthy
+        if not candidates:
+            return min(self.endpoints, key=lambda endpoint: endpoint.down_until)
+        return min(candidates, key=lambda e: (e.failures, e.latency is not None, e.latency or 0))
+
+    def send_endpoint(self):
+        """The node sends are pinned to; it only changes when that node fails."""
+        now = time.monotonic()
+        if not self._pinned.healthy(now):
+            healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy(now)]
+            if healthy:
+                self._pinned = healthy[0]
+        return self._pinned
+
+    async def _call(self, endpoint, request):
+        await self._open()
+        started = time.monotonic()
+        try:
+            response = await request(endpoint.provider)
+        except ClientResponseError as e:
+            if e.status == 429:
+                raise RateLimited(retry_after(e.headers))
+            raise
+        if is_rate_limit(response):
+            raise RateLimited()
+        endpoint.record_success(time.monotonic() - started)
+        return response
+
+    async def _route(self, pinned, request):
+        error = None
+        for attempt in range(MAX_ATTEMPTS):
+            endpoint = self.send_endpoint() if pinned else self.read_endpoint()
+            try:
+                return attempt, await self._call(endpoint, request)
+            except RateLimited as e:
+                error = e
+                delay = e.retry_after or BACKOFF_SECONDS * 2**attempt
+                endpoint.throttled_until = time.monotonic() + delay
+                # Reads move on to another node at once; sends wait for theirs
+                if pinned or self.read_endpoint() is endpoint:
+                    await asyncio.sleep(delay)
+            except CONNECTION_ERRORS as e:
+                error = e
+                endpoint.record_failure()
+        raise error
+
+    async def make_request(self, method, params):
+        attempt, response = await self._route(method in PINNED_METHODS, lambda provider: provider.make_request(method, params))
+        if method == "eth_sendRawTransaction" and attempt > 0 and "already known" in str(response.get("error", "")):
+            # An earlier attempt reached a node before the connection failed
+            raw = params[0]
+            tx_hash = Web3.keccak(hexstr=raw) if isinstance(raw, str) else Web3.keccak(raw)
+            return {"jsonrpc": "2.0", "id": response.get("id"), "result": Web3.to_hex(tx_hash)}
+        return response
+
+    async def make_batch_request(self, requests):
+        pinned = any(method in PINNED_METHODS for method, _ in requests)
+        _, response = await self._route(pinned, lambda provider: provider.make_batch_request(requests))
+        return response
+
+    async def check(self):
+        """Sample every node's head and latency once."""
+        await self._open()
+
+        async def probe(endpoint):
+            try:
+                response = await self._call(endpoint, lambda provider: provider.make_request("eth_blockNumber", []))
+                endpoint.head = int(response["result"], 16)
+            except RateLimited as e:
+                endpoint.throttled_until = time.monotonic() + (e.retry_after or BACKOFF_SECONDS)
+            except Exception:
+                endpoint.record_failure()
+
+        await asyncio.gather(*(probe(endpoint) for endpoint in self.endpoints))
+
+    async def is_connected(self, show_traceback=False):
+        """Whether any node answers, probing rate-limited and failing nodes again with the same backoff as requests."""
+        for attempt in range(MAX_ATTEMPTS):
+            await self.check()
+            now = time.monotonic()
+            if any(endpoint.healthy(now) and endpoint.head is not None for endpoint in self.endpoints):
+                return True
+            if attempt < MAX_ATTEMPTS - 1:
+                ready = min(max(endpoint.throttled_until, endpoint.down_until) for endpoint in self.endpoints)
+                await asyncio.sleep(max(ready - now, BACKOFF_SECONDS * 2**attempt))
+        return False
+
+    def start(self):
+        self._poller.start()
+
+    async def stop(self):
+        await self._poller.stop()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import toml
+
+from .config import SETTINGS_PATH, load_settings
+from .mon_swap import TOKENS, connect
+from .quotes import DEFAULT_SLIPPAGE_BPS, min_out, quote_many
+from .swap_plan import parse_order
+
+SCHEDULE_STATE_PATH = "schedule.json"
+DEFAULT_TICK_SECONDS = 5
+# Price-only jobs wait this long after firing before they may fire again, unless they set `cooldown`
+DEFAULT_COOLDOWN_SECONDS = 300
+
+# (lowest, highest) value of each cron field: minute, hour, day of month, month, day of week (0 or 7 = Sunday)
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _cron_field(text, low, high):
+    values = set()
+    for part in text.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step else start
+        step = int(step) if step else 1
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Invalid cron field: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Cron:
+    """A five-field cron expression (minute hour day-of-month month day-of-week), in local time."""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"A cron expression has five fields: {expression}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)
+        )
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        # As in cron, a restricted day of month and day of week match when either does
+        self.either_day = fields[2] != "*" and fields[4] != "*"
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        return day or weekday if self.either_day else day and weekday
+
+    def next_after(self, timestamp):
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError("Cron expression never matches")
+
+
+class ScheduledJob:
+    """One [[jobs]] entry of a jobs file: a plan row (from, to, amount, router, min_out) plus when to send it.
+
+    `every` (seconds) or `cron` schedule the job; `above` and `below` are
+    price conditions, in `to` tokens per `from` token at the quoted
+    output. A scheduled job with a condition skips the runs where it does
+    not hold; a job with only a condition fires whenever it holds, at most
+    once per `cooldown` seconds.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = spec.get("name")
+        if not self.name:
+            raise ValueError("Every job needs a name")
+        self.every = spec.get("every")
+        self.cron = Cron(spec["cron"]) if spec.get("cron") else None
+        self.above = spec.get("above")
+        self.below = spec.get("below")
+        self.cooldown = spec.get("cooldown", DEFAULT_COOLDOWN_SECONDS)
+        if self.every is not None and self.cron is not None:
+            raise ValueError(f"Job {self.name} has both every and cron")
+        if self.every is None and self.cron is None and self.above is None and self.below is None:
+            raise ValueError(f"Job {self.name} needs every, cron, above or below")
+        self.row = {field: spec.get(field) for field in ("from", "to", "amount", "router", "min_out")}
+        self.order = None
+        self.next_run = None
+        self.last_run = None
+        self.runs = 0
+        self.last_status = None
+
+    @property
+    def scheduled(self):
+        return self.every is not None or self.cron is not None
+
+    @property
+    def conditional(self):
+        return self.above is not None or self.below is not None
+
+    @property
+    def fingerprint(self):
+        return json.dumps(self.spec, sort_keys=True)
+
+    def first_run(self, now):
+        return self.cron.next_after(now) if self.cron else now
+
+    def holds(self, price):
+        return (self.above is None or price > self.above) and (self.below is None or price < self.below)
+
+    def advance(self, now, fired):
+        """Set next_run after the run due at `now`; `fired` when the swap was attempted."""
+        if fired:
+            self.runs += 1
+            self.last_run = now
+        if self.cron:
+            self.next_run = self.cron.next_after(now)
+        elif self.every is not None:
+            # A run missed while the scheduler was stopped is made up once, not once per interval
+            self.next_run = self.next_run + self.every if self.next_run + self.every > now else now + self.every
+        elif fired:
+            self.next_run = now + self.cooldown
+
+
+def load_jobs(path):
+    """ScheduledJobs from the [[jobs]] tables of a TOML file."""
+    with open(path, "r") as file:
+        jobs = [ScheduledJob(spec) for spec in toml.load(file).get("jobs", [])]
+    names = [job.name for job in jobs]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate job names: {', '.join(sorted(duplicates))}")
+    return jobs
+
+
+class Scheduler:
+    """Runs recurring and conditional swap jobs from one long-lived process.
+
+    Every tick the jobs that are due form one window. Their quotes, for
+    price conditions, routing and min_out, come from one batched call (or
+    locally from the reserve mirror), balances are looked up once for all
+    wallets, gas limits and fees come from the engine's shared caches, and
+    the swaps that go ahead are signed and broadcast together, one burst
+    per wallet. Each job's next run and last result are saved after every
+    window, so a restart carries on from the last window's schedule.
+    """
+
+    def __init__(self, pool, jobs, token_decimals, emit, slippage_bps=DEFAULT_SLIPPAGE_BPS,
+                 state_path=SCHEDULE_STATE_PATH, tick_seconds=DEFAULT_TICK_SECONDS):
+        self.pool = pool
+        self.engine = pool.primary
+        self.jobs = jobs
+        self.token_decimals = token_decimals
+        self.emit = emit
+        self.slippage_bps = slippage_bps
+        self.state_path = state_path
+        self.tick_seconds = tick_seconds
+        self.decimals = {address: token_decimals[symbol] for symbol, address in TOKENS.items()}
+        for job in jobs:
+            job.order = parse_order(job.row, TOKENS, token_decimals)
+
+    def load_state(self, now):
+        state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r") as file:
+                state = json.load(file)
+        for job in self.jobs:
+            saved = state.get(job.name)
+            # A job whose definition changed starts over
+            if saved and saved["spec"] == job.fingerprint:
+                job.next_run, job.last_run, job.runs, job.last_status = (
+                    saved["next_run"], saved["last_run"], saved["runs"], saved["last_status"]
+                )
+            else:
+                job.next_run = job.first_run(now)
+
+    def save_state(self):
+        state = {
+            job.name: {
+                "spec": job.fingerprint, "next_run": job.next_run, "last_run": job.last_run, "runs": job.runs,
+                "last_status": job.last_status
+            }
+            for job in self.jobs
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(state, file, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _price(self, job, quote):
+        _, from_address, to_address, amount_in, _ = job.order
+        return (quote.amount_out / 10 ** self.decimals[to_address]) / (amount_in / 10 ** self.decimals[from_address])
+
+    async def run_window(self, now):
+        """Run every job due at `now` together; returns the results emitted."""
+        due = [job for job in self.jobs if job.next_run <= now]
+        if not due:
+            return []
+        quoted = [job for job in due if job.conditional or job.order[0] is None or job.order[4] is None]
+        # Jobs swapping the same amount between the same tokens share one quote
+        swaps = {
+            job: (from_address, to_address, amount_in, None if router is None else ((router, router),))
+            for job, (router, from_address, to_address, amount_in, _) in ((job, job.order) for job in quoted)
+        }
+        unique = list(dict.fromkeys(swaps.values()))
+        try:
+            with self.engine.metrics.phase("quote"):
+                quotes = dict(zip(unique, await quote_many(self.engine.w3, unique, self.engine.routes)))
+            quotes = [quotes[swaps[job]] for job in quoted]
+        except Exception as e:
+            # These jobs stay due and are quoted again on the next tick
+            for job in quoted:
+                self.emit({"job": job.name, "time": int(now), "status": "error", "error": f"Quote failed: {e}"})
+            due = [job for job in due if job not in quoted]
+            quoted = quotes = []
+        quote_of = dict(zip(quoted, quotes))
+
+        results = []
+        firing = []
+        orders = []
+        for job in due:
+            router, from_address, to_address, amount_in, amount_out_min = job.order
+            result = {"job": job.name, "time": int(now)}
+            path = None
+            if job in quote_of:
+                job_quotes = quote_of[job]
+                if not job_quotes or job_quotes[0].amount_out == 0:
+                    result.update(status="error", error="No router can quote this swap")
+                    job.last_status = "error"
+                    job.advance(now, False)
+                    results.append(result)
+                    continue
+                quote = job_quotes[0]
+                result["expected_out"] = str(quote.amount_out)
+                if job.conditional:
+                    price = self._price(job, quote)
+                    result["price"] = price
+                    if not job.holds(price):
+                        job.advance(now, False)
+                        if job.scheduled:
+                            result["status"] = "skipped"
+                            results.append(result)
+                        continue
+                router, path = quote.router_address, quote.path
+                if amount_out_min is None:
+                    amount_out_min = min_out(quote.amount_out, self.slippage_bps)
+            orders.append((router, from_address, to_address, amount_in, amount_out_min, path))
+            firing.append((job, result))
+
+        if orders:
+            try:
+                outcomes = await self.pool.burst_swaps(orders)
+            except Exception as e:
+                # Nothing was sent (the wallets' own failures come back per order), so these jobs stay due
+                for job, _ in firing:
+                    self.emit({"job": job.name, "time": int(now), "status": "error", "error": f"Swap failed: {e}"})
+                firing = orders = outcomes = []
+            for (job, result), order, outcome in zip(firing, orders, outcomes):
+                if isinstance(outcome, Exception):
+                    result.update(status="error", error=str(outcome))
+                else:
+                    success, tx_hash = outcome
+                    result.update(status="success" if success else "failed", router=order[0], tx_hash=tx_hash)
+                job.last_status = result["status"]
+                job.advance(now, True)
+                results.append(result)
+        for result in results:
+            self.emit(result)
+        self.save_state()
+        return results
+
+    async def run(self):
+        """Tick until cancelled."""
+        self.load_state(time.time())
+        while True:
+            now = time.time()
+            try:
+                await self.run_window(now)
+            except Exception as e:
+                # Jobs the window did not get to stay due and are tried again on the next tick
+                for job in self.jobs:
+                    if job.next_run <= now:
+                        self.emit({"job": job.name, "time": int(now), "status": "error", "error": str(e)})
+            await asyncio.sleep(self.tick_seconds)
+
+
+async def run(settings, jobs_path, state_path, output_path, tick_seconds):
+    jobs = load_jobs(jobs_path)
+    pool, token_decimals = await connect(settings)
+    if pool is None:
+        return 1
+    output = open(output_path, "a") if output_path else sys.stdout
+    try:
+        def emit(result):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+        scheduler = Scheduler(pool, jobs, token_decimals, emit, settings.get("slippage_bps", DEFAULT_SLIPPAGE_BPS),
+                              state_path, tick_seconds)
+        print(f"Scheduling {len(jobs)} jobs", file=sys.stderr)
+        await scheduler.run()
+    finally:
+        await pool.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run recurring and price-triggered swaps from a jobs file")
+    parser.add_argument("jobs", help="TOML file with one [[jobs]] table per job")
+    parser.add_argument("--settings", default=SETTINGS_PATH, help="settings file (default: %(default)s)")
+    parser.add_argument("--state", default=SCHEDULE_STATE_PATH, help="where job state is kept (default: %(default)s)")
+    parser.add_argument("--output", help="append JSON results to this file instead of stdout")
+    parser.add_argument("--tick", type=float, default=DEFAULT_TICK_SECONDS, help="seconds between checks")
+    args = parser.parse_args()
+    try:
+        sys.exit(asyncio.run(run(load_settings(args.settings), args.jobs, args.state, args.output, args.tick)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import asyncio
+import csv
+import json
+
+from web3 import Web3
+
+from .chunking import to_base_units
+from .contracts import ROUTER_OPTIONS
+from .quotes import best_quote, min_out
+
+PLAN_FIELDS = ("router", "from", "to", "amount", "min_out")
+
+
+def read_plan(path):
+    """Yield (line_number, row) pairs from a CSV or JSONL swap plan, one row at a time.
+
+    CSV plans need a header with from, to, amount and optionally router
+    and min_out; JSONL plans hold one object with the same keys per line.
+    """
+    with open(path, "r", newline="") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(file, 1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+        else:
+            # Line 1 is the header
+            for line_number, row in enumerate(csv.DictReader(file), 2):
+                yield line_number, row
+
+
+def resolve_router(value):
+    """Accept a ROUTER_OPTIONS number, a router name or a router address.
+
+    An empty router or "auto" returns None, meaning the best quoted router.
+    """
+    value = str(value or "").strip()
+    if value.lower() in ("", "auto"):
+        return None
+    if value.isdigit() and int(value) in ROUTER_OPTIONS:
+        return ROUTER_OPTIONS[int(value)][1]
+    for name, address in ROUTER_OPTIONS.values():
+        if value.lower() == name.lower():
+            return address
+    if Web3.is_address(value):
+        return Web3.to_checksum_address(value)
+    raise ValueError(f"Unknown router: {value}")
+
+
+def resolve_token(value, tokens):
+    value = str(value).strip()
+    for symbol, address in tokens.items():
+        if value.lower() == symbol.lower():
+            return symbol, address
+    raise ValueError(f"Unknown token: {value}")
+
+
+def parse_order(row, tokens, token_decimals):
+    """Turn a plan row into engine.swap arguments, amounts in base units.
+
+    The router and amount_out_min come back as None when they should be
+    taken from a quote.
+    """
+    missing = [field for field in PLAN_FIELDS[1:4] if not str(row.get(field) or "").strip()]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+    from_symbol, from_address = resolve_token(row["from"], tokens)
+    to_symbol, to_address = resolve_token(row["to"], tokens)
+    if from_address == to_address:
+        raise ValueError("Cannot swap to the same token.")
+    amount_in = to_base_units(str(row["amount"]).strip(), token_decimals[from_symbol])
+    if amount_in <= 0:
+        raise ValueError("Amount must be positive.")
+    min_out_text = str(row.get("min_out") or "").strip()
+    amount_out_min = to_base_units(min_out_text, token_decimals[to_symbol]) if min_out_text else None
+    return resolve_router(row.get("router")), from_address, to_address, amount_in, amount_out_min
+
+
+async def plan_order(engine, row, tokens, token_decimals, slippage_bps):
+    """Parse a plan row and quote it if needed; returns engine.swap arguments and the expected output.
+
+    The expected output is None when the row names both a router and a
+    min_out, since it is then sent without a quote.
+    """
+    router, from_address, to_address, amount_in, amount_out_min = parse_order(row, tokens, token_decimals)
+    path = expected_out = None
+    if router is None or amount_out_min is None:
+        routers = None if router is None else [(router, router)]
+        with engine.metrics.phase("quote"):
+            quote = await best_quote(engine.w3, from_address, to_address, amount_in, routers, engine.routes)
+        router, path, expected_out = quote.router_address, quote.path, quote.amount_out
+        if amount_out_min is None:
+            amount_out_min = min_out(quote.amount_out, slippage_bps)
+    return (router, from_address, to_address, amount_in, amount_out_min, path), expected_out
+
+
+async def execute_row(engine, line_number, row, tokens, token_decimals, slippage_bps):
+    result = {"line": line_number}
+    try:
+        order, expected_out = await plan_order(engine, row, tokens, token_decimals, slippage_bps)
+        if expected_out is not None:
+            result["expected_out"] = str(expected_out)
+        router, from_address, to_address, amount_in, amount_out_min, path = order
+        success, tx_hash = await engine.swap(router, from_address, to_address, amount_in, amount_out_min, path=path)
+        result.update(status="success" if success else "failed", router=router, tx_hash=tx_hash)
+    except Exception as e:
+        result.update(status="error", error=str(e))
+    return result
+
+
+async def run_plan(engine, rows, tokens, token_decimals, emit, window, slippage_bps):
+    """Execute plan rows with at most `window` of them pending, emitting results as they finish.
+
+    Rows are pulled from `rows` lazily, so memory use does not depend on
+    the size of the plan. Returns a {status: count} summary.
+    """
+    summary = {"success": 0, "failed": 0, "error": 0}
+    pending = set()
+
+    def collect(done):
+        for task in done:
+            result = task.result()
+            summary[result["status"]] += 1
+            emit(result)
+
+    for line_number, row in rows:
+        if len(pending) >= window:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            collect(done)
+        pending.add(asyncio.create_task(execute_row(engine, line_number, row, tokens, token_decimals, slippage_bps)))
+    if pending:
+        done, _ = await asyncio.wait(pending)
+        collect(done)
+    return summary
+
+
+async def run_burst(engine, rows, tokens, token_decimals, emit, slippage_bps):
+    """Execute a plan as one burst: every row is quoted and signed first, then all are broadcast at once.
+
+    Unlike run_plan the whole plan is held in memory and runs on the one
+    wallet of `engine`. Returns a {status: count} summary.
+    """
+    summary = {"success": 0, "failed": 0, "error": 0}
+    orders = []
+    results = []
+    for line_number, row in rows:
+        result = {"line": line_number}
+        try:
+            order, expected_out = await plan_order(engine, row, tokens, token_decimals, slippage_bps)
+        except Exception as e:
+            result.update(status="error", error=str(e))
+            summary["error"] += 1
+            emit(result)
+            continue
+        if expected_out is not None:
+            result["expected_out"] = str(expected_out)
+        orders.append(order)
+        results.append(result)
+    if not orders:
+        return summary
+    try:
+        outcomes = await engine.burst_swaps(orders)
+    except Exception as e:
+        outcomes = [e] * len(orders)
+    for order, result, outcome in zip(orders, results, outcomes):
+        if isinstance(outcome, Exception):
+            result.update(status="error", error=str(outcome))
+        else:
+            success, tx_hash = outcome
+            result.update(status="success" if success else "failed", router=order[0], tx_hash=tx_hash)
+        summary[result["status"]] += 1
+        emit(result)
+    return summary
@@ -0,0 +1,74 @@
+import json
+import os
+
+from web3 import Web3
+
+from .batching import async_batch_read, decimals_read, name_read, symbol_read
+from .contracts import KNOWN_TOKENS
+
+TOKEN_CACHE_PATH = "tokens.json"
+
+
+class TokenRegistry:
+    """Token metadata (decimals, symbol, name) per chain, cached on disk.
+
+    Tokens in KNOWN_TOKENS and tokens seen before are answered locally;
+    anything else is looked up on-chain in a single batched call and then
+    written to the cache.
+    """
+
+    def __init__(self, chain_id, path=TOKEN_CACHE_PATH):
+        self.chain_id = str(chain_id)
+        self.path = path
+        self._data = {}
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                self._data = json.load(file)
+        self._tokens = {token["address"].lower(): dict(token) for token in KNOWN_TOKENS}
+        self._tokens.update(self._data.get(self.chain_id, {}))
+
+    def get(self, address):
+        return self._tokens.get(address.lower())
+
+    def __contains__(self, address):
+        return address.lower() in self._tokens
+
+    async def resolve(self, w3, addresses):
+        """Return {address: metadata} for every address, discovering unknown tokens on-chain."""
+        unknown = []
+        for address in addresses:
+            if address not in self and Web3.to_checksum_address(address) not in unknown:
+                unknown.append(Web3.to_checksum_address(address))
+        if unknown:
+            await self._discover(w3, unknown)
+        return {address: self.get(address) for address in addresses}
+
+    async def decimals(self, w3, addresses):
+        tokens = await self.resolve(w3, addresses)
+        return {address: token["decimals"] for address, token in tokens.items()}
+
+    async def _discover(self, w3, addresses):
+        reads = []
+        for address in addresses:
+            reads += [decimals_read(address), symbol_read(address), name_read(address)]
+        values = await async_batch_read(w3, reads)
+        discovered = {}
+        for i, address in enumerate(addresses):
+            decimals, symbol, name = values[3 * i:3 * i + 3]
+            if decimals is None:
+                raise ValueError(f"{address} does not look like an ERC20 token")
+            discovered[address.lower()] = {
+                "address": address,
+                "decimals": decimals,
+                "symbol": symbol or address[:8],
+                "name": name or symbol or "Custom Token"
+            }
+        self._tokens.update(discovered)
+        self._data.setdefault(self.chain_id, {}).update(discovered)
+        self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self._data, file, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,132 @@
+import asyncio
+
+from web3 import Web3
+
+from .engine import Engine, private_keys
+
+
+class WalletPool:
+    """Shard swaps across several wallets.
+
+    Each wallet gets its own Engine, i.e. its own key, nonce stream and
+    in-flight limit, while the connection, fee engine, signing processes,
+    receipt tracker and caches are shared, so closing the first wallet's
+    Engine closes them all. Every operation is assigned to the wallet with the
+    fewest operations pending among those whose balance covers it, so
+    throughput grows with the number of wallets instead of being capped by
+    one nonce sequence. Distributions and withdrawals stay on the first
+    wallet, whose address their journal is keyed by.
+
+    Balances are read for all wallets in one batched call and then kept
+    locally: amounts are reserved while an operation runs and deducted once
+    it succeeds. They are only re-read when no wallet seems to have enough.
+    """
+
+    def __init__(self, engines):
+        if not engines:
+            raise ValueError("A wallet pool needs at least one key")
+        self.engines = engines
+        self.primary = engines[0]
+        self.w3 = self.primary.w3
+        self.metrics = self.primary.metrics
+        self.routes = self.primary.routes
+        self._pending = {engine.address: 0 for engine in engines}
+        self._balances = {}
+        self._reserved = {}
+
+    @classmethod
+    def from_settings(cls, settings):
+        primary = Engine.from_settings(settings)
+        return cls([primary] + [primary.for_wallet(key) for key in private_keys(settings)[1:]])
+
+    @property
+    def addresses(self):
+        return [engine.address for engine in self.engines]
+
+    async def connect(self):
+        await self.primary.connect()
+
+    async def close(self):
+        await self.primary.close()
+
+    async def refresh_balances(self, tokens):
+        self._balances.update(await self.primary.get_balances(self.addresses, tokens))
+
+    def _available(self, engine, token):
+        key = (engine.address, token)
+        return self._balances.get(key, 0) - self._reserved.get(key, 0)
+
+    def _pick(self, token, amount):
+        candidates = [engine for engine in self.engines if self._available(engine, token) >= amount]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda engine: (self._pending[engine.address], -self._available(engine, token)))
+
+    async def run(self, token, amount, operation):
+        """Run `operation(engine)` on the best wallet holding at least `amount` of `token`.
+
+        The amount counts as spent when the first element of the result, a
+        success flag as returned by Engine.swap, is true.
+        """
+        token = Web3.to_checksum_address(token)
+        engine = self._pick(token, amount)
+        if engine is None:
+            await self.refresh_balances([token])
+            engine = self._pick(token, amount)
+            if engine is None:
+                raise Exception(f"No wallet in the pool holds {amount} of {token}")
+        key = (engine.address, token)
+        self._pending[engine.address] += 1
+        self._reserved[key] = self._reserved.get(key, 0) + amount
+        success = False
+        try:
+            result = await operation(engine)
+            success = bool(result[0])
+            return result
+        finally:
+            self._pending[engine.address] -= 1
+            self._reserved[key] -= amount
+            if success:
+                self._balances[key] = self._balances.get(key, 0) - amount
+
+    async def swap(self, router_address, from_token, to_token, amount_in, amount_out_min=0, on_sent=None, path=None):
+        return await self.run(from_token, amount_in, lambda engine: engine.swap(
+            router_address, from_token, to_token, amount_in, amount_out_min, on_sent, path
+        ))
+
+    async def burst_swaps(self, orders, on_sent=None):
+        """Engine.burst_swaps across the pool: each wallet signs and broadcasts its share of `orders` as one burst.
+
+        Orders are assigned like `run` assigns operations, with balances
+        refreshed once for all of them. An order no wallet can cover gets
+        an Exception in place of its (success, tx_hash).
+        """
+        await self.refresh_balances(list(dict.fromkeys(Web3.to_checksum_address(order[1]) for order in orders)))
+        outcomes = [None] * len(orders)
+        shares = {}
+        for i, (_, from_token, _, amount_in, _, _) in enumerate(orders):
+            token = Web3.to_checksum_address(from_token)
+            engine = self._pick(token, amount_in)
+            if engine is None:
+                outcomes[i] = Exception(f"No wallet in the pool holds {amount_in} of {token}")
+                continue
+            key = (engine.address, token)
+            self._reserved[key] = self._reserved.get(key, 0) + amount_in
+            self._pending[engine.address] += 1
+            shares.setdefault(engine, []).append(i)
+
+        async def burst(engine, indexes):
+            try:
+                results = await engine.burst_swaps([orders[i] for i in indexes], on_sent)
+            except Exception as e:
+                results = [e] * len(indexes)
+            for i, result in zip(indexes, results):
+                key = (engine.address, Web3.to_checksum_address(orders[i][1]))
+                self._pending[engine.address] -= 1
+                self._reserved[key] -= orders[i][3]
+                if not isinstance(result, Exception) and result[0]:
+                    self._balances[key] = self._balances.get(key, 0) - orders[i][3]
+                outcomes[i] = result
+
+        await asyncio.gather(*(burst(engine, indexes) for engine, indexes in shares.items()))
+        return outcomes
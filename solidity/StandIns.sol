@@ -0,0 +1,214 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+// Minimal stand-ins for the contracts Catalyst uses on Monad testnet, for
+// benchmarking against a local node. benchmark.py copies their runtime code
+// to the real addresses, so nothing here may rely on storage written by a
+// constructor; constructor arguments are immutables, which live in the code.
+
+interface IERC20 {
+    function transfer(address to, uint256 amount) external returns (bool);
+    function transferFrom(address from, address to, uint256 amount) external returns (bool);
+}
+
+contract StandInToken {
+    uint8 public immutable decimals;
+    mapping(address => uint256) public balanceOf;
+    mapping(address => mapping(address => uint256)) public allowance;
+
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(address indexed owner, address indexed spender, uint256 value);
+
+    constructor(uint8 decimals_) {
+        decimals = decimals_;
+    }
+
+    function name() external pure returns (string memory) {
+        return "Stand-in Token";
+    }
+
+    function symbol() external pure returns (string memory) {
+        return "STAND";
+    }
+
+    function mint(address to, uint256 amount) external {
+        balanceOf[to] += amount;
+        emit Transfer(address(0), to, amount);
+    }
+
+    function approve(address spender, uint256 amount) external returns (bool) {
+        allowance[msg.sender][spender] = amount;
+        emit Approval(msg.sender, spender, amount);
+        return true;
+    }
+
+    function transfer(address to, uint256 amount) external returns (bool) {
+        _move(msg.sender, to, amount);
+        return true;
+    }
+
+    function transferFrom(address from, address to, uint256 amount) external returns (bool) {
+        uint256 allowed = allowance[from][msg.sender];
+        if (allowed != type(uint256).max) {
+            allowance[from][msg.sender] = allowed - amount;
+        }
+        _move(from, to, amount);
+        return true;
+    }
+
+    function _move(address from, address to, uint256 amount) internal {
+        balanceOf[from] -= amount;
+        balanceOf[to] += amount;
+        emit Transfer(from, to, amount);
+    }
+}
+
+contract StandInWMON is StandInToken {
+    constructor() StandInToken(18) {}
+
+    receive() external payable {
+        deposit();
+    }
+
+    function deposit() public payable {
+        balanceOf[msg.sender] += msg.value;
+        emit Transfer(address(0), msg.sender, msg.value);
+    }
+
+    function withdraw(uint256 wad) external {
+        balanceOf[msg.sender] -= wad;
+        emit Transfer(msg.sender, address(0), wad);
+        (bool ok, ) = msg.sender.call{value: wad}("");
+        require(ok, "Transfer failed");
+    }
+}
+
+contract StandInDistributor {
+    receive() external payable {}
+
+    // Splits totalAmount evenly; the rounding remainder stays in the contract
+    function distributeTokens(address tokenAddress, uint256 totalAmount, address[] calldata recipients) external payable {
+        require(recipients.length > 0, "No recipients");
+        uint256 share = totalAmount / recipients.length;
+        if (tokenAddress == address(0)) {
+            require(msg.value == totalAmount, "Wrong value");
+            for (uint256 i = 0; i < recipients.length; i++) {
+                (bool ok, ) = recipients[i].call{value: share}("");
+                require(ok, "Transfer failed");
+            }
+        } else {
+            IERC20(tokenAddress).transferFrom(msg.sender, address(this), totalAmount);
+            for (uint256 i = 0; i < recipients.length; i++) {
+                IERC20(tokenAddress).transfer(recipients[i], share);
+            }
+        }
+    }
+
+    function withdrawTokens(address tokenAddress, uint256 amount) external {
+        if (tokenAddress == address(0)) {
+            (bool ok, ) = msg.sender.call{value: amount}("");
+            require(ok, "Transfer failed");
+        } else {
+            IERC20(tokenAddress).transfer(msg.sender, amount);
+        }
+    }
+}
+
+// UniswapV2-style router holding its own reserves: one constant-product
+// pool per token pair, with the usual 0.3% fee. MON legs use WETH in the
+// path and are paid in native MON from the router's balance.
+contract StandInRouter {
+    address public immutable WETH;
+    // reserves[a][b] is the reserve of token a in the a/b pool
+    mapping(address => mapping(address => uint256)) public reserves;
+
+    constructor(address weth) {
+        WETH = weth;
+    }
+
+    receive() external payable {}
+
+    modifier ensure(uint256 deadline) {
+        require(deadline >= block.timestamp, "EXPIRED");
+        _;
+    }
+
+    function setReserves(address tokenA, address tokenB, uint256 reserveA, uint256 reserveB) external {
+        reserves[tokenA][tokenB] = reserveA;
+        reserves[tokenB][tokenA] = reserveB;
+    }
+
+    function getAmountsOut(uint256 amountIn, address[] memory path) public view returns (uint256[] memory amounts) {
+        require(path.length >= 2, "INVALID_PATH");
+        amounts = new uint256[](path.length);
+        amounts[0] = amountIn;
+        for (uint256 i = 0; i < path.length - 1; i++) {
+            uint256 reserveIn = reserves[path[i]][path[i + 1]];
+            uint256 reserveOut = reserves[path[i + 1]][path[i]];
+            require(reserveIn > 0 && reserveOut > 0, "INSUFFICIENT_LIQUIDITY");
+            uint256 amountInWithFee = amounts[i] * 997;
+            amounts[i + 1] = amountInWithFee * reserveOut / (reserveIn * 1000 + amountInWithFee);
+        }
+    }
+
+    function swapExactETHForTokens(uint256 amountOutMin, address[] calldata path, address to, uint256 deadline)
+        external payable ensure(deadline) returns (uint256[] memory amounts)
+    {
+        require(path[0] == WETH, "INVALID_PATH");
+        amounts = _swap(msg.value, amountOutMin, path);
+        IERC20(path[path.length - 1]).transfer(to, amounts[amounts.length - 1]);
+    }
+
+    function swapExactTokensForTokens(uint256 amountIn, uint256 amountOutMin, address[] calldata path, address to, uint256 deadline)
+        external ensure(deadline) returns (uint256[] memory amounts)
+    {
+        IERC20(path[0]).transferFrom(msg.sender, address(this), amountIn);
+        amounts = _swap(amountIn, amountOutMin, path);
+        IERC20(path[path.length - 1]).transfer(to, amounts[amounts.length - 1]);
+    }
+
+    function swapExactTokensForETH(uint256 amountIn, uint256 amountOutMin, address[] calldata path, address to, uint256 deadline)
+        external ensure(deadline) returns (uint256[] memory amounts)
+    {
+        require(path[path.length - 1] == WETH, "INVALID_PATH");
+        IERC20(path[0]).transferFrom(msg.sender, address(this), amountIn);
+        amounts = _swap(amountIn, amountOutMin, path);
+        (bool ok, ) = to.call{value: amounts[amounts.length - 1]}("");
+        require(ok, "Transfer failed");
+    }
+
+    function _swap(uint256 amountIn, uint256 amountOutMin, address[] calldata path) internal returns (uint256[] memory amounts) {
+        amounts = getAmountsOut(amountIn, path);
+        require(amounts[amounts.length - 1] >= amountOutMin, "INSUFFICIENT_OUTPUT_AMOUNT");
+        for (uint256 i = 0; i < path.length - 1; i++) {
+            reserves[path[i]][path[i + 1]] += amounts[i];
+            reserves[path[i + 1]][path[i]] -= amounts[i + 1];
+        }
+    }
+}
+
+contract StandInMulticall3 {
+    struct Call3 {
+        address target;
+        bool allowFailure;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    function aggregate3(Call3[] calldata calls) external payable returns (Result[] memory returnData) {
+        returnData = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool success, bytes memory data) = calls[i].target.call(calls[i].callData);
+            require(success || calls[i].allowFailure, "Multicall3: call failed");
+            returnData[i] = Result(success, data);
+        }
+    }
+
+    function getEthBalance(address addr) external view returns (uint256) {
+        return addr.balance;
+    }
+}
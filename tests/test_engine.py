@@ -0,0 +1,104 @@
+import asyncio
+
+from catalyst.chunking import GasModel, split_amount
+from catalyst.contracts import USDC_ADDRESS, WMON_ADDRESS
+from catalyst.engine import Engine
+from catalyst.metrics import NULL_METRICS
+from catalyst.receipts import TransactionCancelled
+
+ROUTER = "0x" + "aa" * 20
+
+
+def address(n):
+    return "0x" + format(n, "040x")
+
+
+class BurstEngine(Engine):
+    """An Engine whose sends and receipts are scripted: `outcomes[i]` is what waiting on order i gives."""
+
+    def __init__(self, outcomes):
+        self.slots = asyncio.Semaphore(10)
+        self.metrics = NULL_METRICS
+        self.outcomes = outcomes
+        self.forgotten = []
+
+    async def swap_call(self, router_address, from_token, to_token, amount_in, amount_out_min=0, path=None):
+        return (router_address, b"", 0, 200000), []
+
+    async def presign(self, calls):
+        return list(range(len(calls)))
+
+    async def broadcast(self, signed, on_sent=None):
+        return [None if self.outcomes[nonce] is None else (nonce, bytes([nonce]) * 32) for nonce in signed]
+
+    async def wait(self, nonce, tx_hash):
+        await asyncio.sleep(0)
+        outcome = self.outcomes[nonce]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def forget_allowance(self, token_address, spender):
+        self.forgotten.append(token_address)
+
+
+def test_burst_reports_each_order_on_its_own():
+    cancelled = TransactionCancelled("cancelled")
+    timed_out = TimeoutError("not mined")
+    engine = BurstEngine([True, cancelled, False, None, timed_out])
+    orders = [(ROUTER, USDC_ADDRESS, WMON_ADDRESS, 10**6, 0, None)] * 5
+
+    summary = asyncio.run(engine.burst_swaps(orders))
+
+    assert summary == [
+        (True, (bytes([0]) * 32).hex()), cancelled, (False, (bytes([2]) * 32).hex()), (False, None), timed_out
+    ]
+    # Only the swaps that did not go through drop the cached allowance
+    assert engine.forgotten == [USDC_ADDRESS] * 4
+
+
+class DistributionEngine(Engine):
+    """An Engine whose distributeTokens estimates cost `base` plus `per_new` per address not in `holders`."""
+
+    def __init__(self, holders, base=30000, per_new=22000, per_holder=5000):
+        self.gas_models = {}
+        self.holders = set(holders)
+        self.base, self.per_new, self.per_holder = base, per_new, per_holder
+        self.estimated = []
+
+    async def approve(self, token_address, spender, amount, on_sent=None):
+        return 0, b"\0" * 32
+
+    async def wait(self, nonce, tx_hash):
+        return True
+
+    async def estimate_distribution(self, token_address, amount_wei, recipients, native):
+        self.estimated.append(len(recipients))
+        return self.base + sum(self.per_holder if r in self.holders else self.per_new for r in recipients)
+
+
+def test_gas_model_is_fitted_on_fresh_recipients():
+    holders = [address(n) for n in range(1, 17)]
+    recipients = holders + [address(n) for n in range(17, 2001)]
+    engine = DistributionEngine(holders)
+    model = asyncio.run(engine.prepare_distribution(
+        USDC_ADDRESS, 2000, lambda size: split_amount(2000, recipients, size)
+    ))
+    # The first 16 recipients already hold the token, but the model still prices every one as new
+    assert model.per_recipient == 22000
+    # So a chunk of new holders only still fits
+    chunk = split_amount(2000, recipients, model.chunk_size())[1][0]
+    assert model.gas_for(len(chunk)) >= asyncio.run(engine.estimate_distribution(USDC_ADDRESS, 0, chunk, False))
+
+
+def test_cached_gas_model_is_checked_against_the_first_chunk():
+    recipients = [address(n) for n in range(1, 2001)]
+    engine = DistributionEngine([])
+    engine.gas_models[USDC_ADDRESS] = GasModel(30000, 5000)
+    model = asyncio.run(engine.prepare_distribution(
+        USDC_ADDRESS, 2000, lambda size: split_amount(2000, recipients, size)
+    ))
+    assert model.per_recipient == 22000
+    assert engine.gas_models[USDC_ADDRESS] is model
+    # One estimate of the first chunk, then the two samples
+    assert engine.estimated == [GasModel(30000, 5000).chunk_size(), 16, 1]
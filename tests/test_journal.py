@@ -0,0 +1,162 @@
+import asyncio
+
+from eth_account import Account
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound
+
+from catalyst.journal import Journal, reconcile
+from catalyst.receipts import ReceiptTracker
+
+ACCOUNT = Account.from_key("0x" + "11" * 32)
+TOKEN = {"address": "0x" + "22" * 20, "decimals": 18, "symbol": "TKN", "name": "Token"}
+RECIPIENTS = ["0x" + format(n, "040x") for n in range(1, 5)]
+
+
+class FakeEth:
+    """A chain that mines everything in its mempool into the next block whenever the head is read."""
+
+    def __init__(self, mined=(), pending_count=0, mine=True):
+        self.block = 100
+        self.blocks = {}
+        self.receipts = dict(mined)
+        self.pending_count = pending_count
+        self.mine = mine
+        self.mempool = []
+        self.rejections = {}
+        self.broadcasts = []
+
+    async def send_raw_transaction(self, raw):
+        tx_hash = Web3.to_hex(Web3.keccak(raw))
+        self.broadcasts.append(tx_hash)
+        if tx_hash in self.rejections:
+            raise ValueError(self.rejections[tx_hash])
+        self.mempool.append(tx_hash)
+        return tx_hash
+
+    @property
+    async def block_number(self):
+        if self.mine and self.mempool:
+            self.block += 1
+            self.blocks[self.block] = [self._receipt(tx_hash, 1) for tx_hash in self.mempool]
+            for tx_hash in self.mempool:
+                self.receipts[tx_hash] = 1
+            self.mempool = []
+        return self.block
+
+    async def get_block_receipts(self, number):
+        return self.blocks.get(number, [])
+
+    async def get_transaction_receipt(self, tx_hash):
+        tx_hash = tx_hash if isinstance(tx_hash, str) else Web3.to_hex(tx_hash)
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(tx_hash)
+        return self._receipt(tx_hash, self.receipts[tx_hash])
+
+    async def get_transaction_count(self, address, block):
+        return self.pending_count
+
+    @staticmethod
+    def _receipt(tx_hash, status):
+        return AttributeDict({"transactionHash": tx_hash, "status": status})
+
+
+class FakeProvider:
+    async def make_batch_request(self, requests):
+        return [{"result": {}} for _ in requests]
+
+
+class FakeNonces:
+    async def sync(self):
+        pass
+
+
+class FakeEngine:
+    def __init__(self, eth, timeout=5):
+        self.w3 = AttributeDict({"eth": eth, "provider": FakeProvider()})
+        self.receipts = ReceiptTracker(self.w3, poll_seconds=0.01, timeout=timeout)
+        self.address = ACCOUNT.address
+        self.nonces = FakeNonces()
+        self.fillers = []
+
+    async def send_filler(self, nonce):
+        self.fillers.append(nonce)
+
+
+def signed(nonce):
+    return ACCOUNT.sign_transaction({
+        "to": ACCOUNT.address, "value": 0, "gas": 21000, "nonce": nonce, "chainId": 10143,
+        "maxFeePerGas": 10, "maxPriorityFeePerGas": 1
+    })
+
+
+def journaled_job(tmp_path, nonces):
+    journal = Journal(str(tmp_path / "distributions.db"))
+    job = journal.create_job(10143, ACCOUNT.address, TOKEN, 400, recipients=RECIPIENTS)
+    sends = {}
+    for seq, nonce in enumerate(nonces):
+        tx = signed(nonce)
+        job.record_send(seq, 1, nonce, tx, [RECIPIENTS[seq]], 100)
+        sends[nonce] = Web3.to_hex(tx.hash)
+    return journal, job, sends
+
+
+def outcomes(journal):
+    return dict(journal.db.execute("SELECT tx_hash, status FROM outcomes").fetchall())
+
+
+def run(engine, job):
+    async def main():
+        try:
+            return await reconcile(engine, job)
+        finally:
+            await engine.receipts.stop()
+
+    return asyncio.run(main())
+
+
+def test_reconcile_settles_mined_dropped_and_missing_sends(tmp_path):
+    journal, job, sends = journaled_job(tmp_path, [4, 5, 6, 8])
+    eth = FakeEth(mined=[(sends[4], 0), (sends[5], 1)], pending_count=7)
+    # Another transaction took nonce 6
+    eth.rejections[sends[6]] = "nonce too low"
+    engine = FakeEngine(eth)
+
+    assert run(engine, job)
+    assert outcomes(journal) == {sends[4]: "reverted", sends[5]: "success", sends[6]: "dropped", sends[8]: "success"}
+    # Only the send the chain had not seen is rebroadcast, and the hole below it is filled
+    assert eth.broadcasts == [sends[6], sends[8]]
+    assert engine.fillers == [7]
+    assert job.settled() == {1, 3}
+    assert job.in_doubt() == []
+
+
+def test_rebroadcast_that_is_already_known_is_waited_for(tmp_path):
+    journal, job, sends = journaled_job(tmp_path, [3])
+    eth = FakeEth(pending_count=3)
+    eth.rejections[sends[3]] = "already known"
+    engine = FakeEngine(eth)
+
+    async def mine_later():
+        await asyncio.sleep(0.05)
+        eth.mempool.append(sends[3])
+
+    async def main():
+        asyncio.ensure_future(mine_later())
+        try:
+            return await reconcile(engine, job)
+        finally:
+            await engine.receipts.stop()
+
+    assert asyncio.run(main())
+    assert outcomes(journal) == {sends[3]: "success"}
+    assert engine.fillers == []
+
+
+def test_reconcile_reports_sends_still_pending(tmp_path):
+    journal, job, sends = journaled_job(tmp_path, [2])
+    engine = FakeEngine(FakeEth(pending_count=2, mine=False), timeout=0.1)
+
+    assert not run(engine, job)
+    assert outcomes(journal) == {}
+    assert [tx_hash for _, tx_hash, _ in job.in_doubt()] == [sends[2]]
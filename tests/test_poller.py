@@ -0,0 +1,44 @@
+import asyncio
+
+from catalyst.poller import Poller
+
+
+def test_failed_ticks_are_retried_until_stopped():
+    ticks = []
+
+    async def tick():
+        ticks.append(len(ticks))
+        if len(ticks) < 3:
+            raise ConnectionError("node went away")
+
+    async def main():
+        poller = Poller(tick, 0.01)
+        poller.start()
+        poller.start()
+        while len(ticks) < 4:
+            await asyncio.sleep(0.01)
+        await poller.stop()
+        stopped_at = len(ticks)
+        await asyncio.sleep(0.05)
+        return stopped_at
+
+    assert asyncio.run(main()) == len(ticks)
+    assert ticks[:4] == [0, 1, 2, 3]
+
+
+def test_wait_first_delays_the_first_tick():
+    ticks = []
+
+    async def tick():
+        ticks.append(True)
+
+    async def main():
+        poller = Poller(tick, 0.2, wait_first=True)
+        poller.start()
+        await asyncio.sleep(0.05)
+        before = len(ticks)
+        await poller.stop()
+        return before
+
+    assert asyncio.run(main()) == 0
+    assert ticks == []
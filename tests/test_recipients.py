@@ -0,0 +1,90 @@
+import pytest
+from web3 import Web3
+
+from catalyst.contracts import WMON_ADDRESS
+from catalyst.recipients import AddressSet, RecipientFile, parse_line
+
+
+def address(n):
+    return "0x" + format(n, "040x")
+
+
+def write(tmp_path, lines):
+    path = tmp_path / "recipients.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_address_set_grows_and_dedupes():
+    addresses = AddressSet(capacity=4)
+    for n in range(1, 1001):
+        assert addresses.add(bytes.fromhex(address(n)[2:]))
+    assert len(addresses) == 1000
+    assert not addresses.add(bytes.fromhex(address(500)[2:]))
+    assert bytes.fromhex(address(999)[2:]) in addresses
+    assert bytes.fromhex(address(1001)[2:]) not in addresses
+    with pytest.raises(ValueError):
+        addresses.add(bytes(20))
+
+
+def test_parse_line_rejects_bad_checksum_and_zero_address():
+    assert parse_line(f"{WMON_ADDRESS},1.5") == (bytes.fromhex(WMON_ADDRESS[2:]), "1.5")
+    assert parse_line(WMON_ADDRESS.lower()) == (bytes.fromhex(WMON_ADDRESS[2:]), None)
+    # Still mixed-case, but with one letter's case flipped
+    with pytest.raises(ValueError, match="checksum"):
+        parse_line(WMON_ADDRESS.replace("AfE", "afE"))
+    with pytest.raises(ValueError):
+        parse_line(address(0))
+
+
+def test_scan_skips_duplicates_and_counts_invalid_lines(tmp_path):
+    path = write(tmp_path, [
+        address(1),
+        address(2),
+        address(1),
+        "not-an-address",
+        "",
+        "# a comment",
+        address(2).upper().replace("0X", "0x"),
+        address(3),
+    ])
+    recipients = RecipientFile(path, 18).scan()
+    assert recipients.count == 3
+    assert recipients.duplicates == 2
+    assert recipients.invalid == 1
+    assert recipients.errors == ["line 4: Invalid address: not-an-address"]
+    assert not recipients.has_amounts
+
+
+def test_header_after_comment_is_not_an_error(tmp_path):
+    path = write(tmp_path, ["# airdrop", "", "address,amount", f"{address(1)},2", f"{address(2)},3"])
+    recipients = RecipientFile(path, 6).scan()
+    assert (recipients.count, recipients.invalid, recipients.errors) == (2, 0, [])
+    assert recipients.total == 5_000_000
+
+
+def test_mixing_lines_with_and_without_amounts_is_invalid(tmp_path):
+    path = write(tmp_path, [f"{address(1)},1", address(2), f"{address(3)},0"])
+    recipients = RecipientFile(path, 18).scan()
+    assert recipients.count == 1
+    assert recipients.invalid == 2
+
+
+def test_chunks_split_total_exactly(tmp_path):
+    path = write(tmp_path, [address(n) for n in range(1, 11)])
+    chunks = list(RecipientFile(path, 18).scan().chunks(3, total=100))
+    assert [len(recipients) for recipients, _ in chunks] == [3, 3, 3, 1]
+    assert sum(amount for _, amount in chunks) == 100
+    assert chunks[0][0][0] == Web3.to_checksum_address(address(1))
+
+
+def test_chunks_group_recipients_by_amount(tmp_path):
+    path = write(tmp_path, [f"{address(n)},{1 if n % 2 else 2}" for n in range(1, 8)])
+    recipients = RecipientFile(path, 0).scan()
+    chunks = list(recipients.chunks(2))
+    assert sum(amount for _, amount in chunks) == recipients.total == 10
+    for chunk, amount in chunks:
+        assert amount % len(chunk) == 0
+    assert sorted(address for chunk, _ in chunks for address in chunk) == sorted(
+        Web3.to_checksum_address(address(n)) for n in range(1, 8)
+    )
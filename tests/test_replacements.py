@@ -0,0 +1,63 @@
+import asyncio
+
+from eth_account import Account
+from web3.datastructures import AttributeDict
+
+from catalyst.metrics import NULL_METRICS
+from catalyst.replacements import MAX_BUMPS, ReplacementManager
+
+ACCOUNT = Account.from_key("0x" + "33" * 32)
+
+
+class FakeFees:
+    async def fee_fields(self):
+        return {"maxFeePerGas": 10, "maxPriorityFeePerGas": 1}
+
+
+class FakeReceipts:
+    def __init__(self):
+        self.replacements = []
+
+    def track(self, tx_hash):
+        return asyncio.get_running_loop().create_future()
+
+    def replace(self, tx_hash, replacement_hash, cancel=False):
+        self.replacements.append(cancel)
+
+    def forget_replacement(self, replacement_hash):
+        pass
+
+
+class FakeEth:
+    async def send_raw_transaction(self, raw):
+        pass
+
+
+class FakeEngine:
+    def __init__(self):
+        self.account = ACCOUNT
+        self.address = ACCOUNT.address
+        self.metrics = NULL_METRICS
+        self.w3 = AttributeDict({"eth": FakeEth()})
+
+
+def test_cancel_is_sent_after_the_bumps_run_out(tmp_path):
+    async def main():
+        receipts = FakeReceipts()
+        manager = ReplacementManager(FakeFees(), receipts, replace_after=10, cancel_after=90,
+                                     journal_path=str(tmp_path / "journal.db"), check_seconds=3600)
+        tx = {"to": ACCOUNT.address, "value": 1, "gas": 21000, "nonce": 4, "chainId": 10143,
+              "maxFeePerGas": 10, "maxPriorityFeePerGas": 1}
+        manager.watch(FakeEngine(), 4, tx, ACCOUNT.sign_transaction(tx).hash)
+        (entry,) = manager._watched.values()
+        start = entry.first_sent
+        try:
+            for elapsed in range(1, 121):
+                await manager.check(start + elapsed)
+        finally:
+            await manager.stop()
+        return receipts.replacements
+
+    replacements = asyncio.run(main())
+    # Bumps every 10 seconds until the cap, then the cancel at 90 seconds despite it
+    assert replacements == [False] * MAX_BUMPS + [True]
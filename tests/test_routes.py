@@ -0,0 +1,72 @@
+import time
+
+from catalyst.contracts import NATIVE_TOKEN, USDC_ADDRESS, USDT_ADDRESS, WMON_ADDRESS
+from catalyst.reserves import Pair, ReserveMirror
+from catalyst.routes import MIN_LEG_BPS, RouteFinder
+
+ROUTER_A = "0x" + "aa" * 20
+ROUTER_B = "0x" + "bb" * 20
+ROUTERS = [("A", ROUTER_A), ("B", ROUTER_B)]
+
+
+def mirror(pools):
+    """A ReserveMirror loaded with `pools`: (router, token0, token1, reserve0, reserve1) tuples."""
+    reserves = ReserveMirror(None, tokens=[WMON_ADDRESS, USDC_ADDRESS, USDT_ADDRESS], routers=ROUTERS)
+    for index, (router, token0, token1, reserve0, reserve1) in enumerate(pools):
+        pair = Pair("0x" + format(index + 1, "040x"), router, token0, token1, reserve0, reserve1)
+        reserves.pairs[pair.address] = pair
+        reserves._by_tokens[(router, token0, token1)] = pair
+        reserves._by_tokens[(router, token1, token0)] = pair
+    reserves.fees = {router: (997, 1000) for _, router in ROUTERS}
+    reserves.generation += 1
+    reserves._synced_at = time.monotonic()
+    return reserves
+
+
+def test_split_legs_sum_to_the_order():
+    routes = RouteFinder(mirror([
+        (ROUTER_A, WMON_ADDRESS, USDC_ADDRESS, 10**24, 2 * 10**24),
+        (ROUTER_B, WMON_ADDRESS, USDC_ADDRESS, 6 * 10**23, 12 * 10**23),
+    ]))
+    amount_in = 10**23 + 12345
+    plan = routes.split(WMON_ADDRESS, USDC_ADDRESS, amount_in)
+    assert plan is not None
+    assert len(plan.legs) == 2
+    assert plan.amount_in == sum(leg.amount_in for leg in plan.legs) == amount_in
+    assert plan.amount_out > plan.baseline.amount_out
+    # The deeper pool takes the larger share
+    by_router = {leg.router_address: leg.amount_in for leg in plan.legs}
+    assert by_router[ROUTER_A] > by_router[ROUTER_B]
+
+
+def test_small_legs_are_dropped():
+    routes = RouteFinder(mirror([
+        (ROUTER_A, WMON_ADDRESS, USDC_ADDRESS, 10**24, 2 * 10**24),
+        (ROUTER_B, WMON_ADDRESS, USDC_ADDRESS, 10**21, 2 * 10**21),
+    ]))
+    amount_in = 10**21 + 7
+    plan = routes.split(WMON_ADDRESS, USDC_ADDRESS, amount_in)
+    assert all(leg.amount_in * 10000 >= amount_in * MIN_LEG_BPS for leg in plan.legs)
+    # The shallow pool's share falls under MIN_LEG_BPS, so the deep one takes the whole order
+    assert [(leg.router_address, leg.amount_in) for leg in plan.legs] == [(ROUTER_A, amount_in)]
+
+
+def test_split_uses_disjoint_multi_hop_paths():
+    routes = RouteFinder(mirror([
+        (ROUTER_A, WMON_ADDRESS, USDC_ADDRESS, 10**24, 2 * 10**24),
+        (ROUTER_A, WMON_ADDRESS, USDT_ADDRESS, 10**24, 2 * 10**24),
+        (ROUTER_A, USDT_ADDRESS, USDC_ADDRESS, 10**24, 10**24),
+    ]))
+    amount_in = 3 * 10**23 + 1
+    plan = routes.split(WMON_ADDRESS, USDC_ADDRESS, amount_in, routers=[("A", ROUTER_A)])
+    assert plan.amount_in == amount_in
+    assert sorted(len(leg.path) for leg in plan.legs) == [2, 3]
+    pairs = [
+        (token_in, token_out) for leg in plan.legs for token_in, token_out in zip(leg.path, leg.path[1:])
+    ]
+    assert len(pairs) == len(set(pairs))
+
+
+def test_wrap_is_not_split():
+    routes = RouteFinder(mirror([(ROUTER_A, WMON_ADDRESS, USDC_ADDRESS, 10**24, 2 * 10**24)]))
+    assert routes.split(NATIVE_TOKEN, WMON_ADDRESS, 10**18) is None
@@ -0,0 +1,40 @@
+import asyncio
+
+from aiohttp import web
+
+from catalyst.rpc_pool import RpcPool
+
+
+async def serve(handler):
+    app = web.Application()
+    app.router.add_post("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}/"
+
+
+def test_startup_probe_waits_out_rate_limits():
+    calls = []
+
+    async def handler(request):
+        body = await request.json()
+        calls.append(body["method"])
+        if len(calls) <= 2:
+            return web.Response(status=429, headers={"Retry-After": "0.05"})
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": "0x2a"})
+
+    async def main():
+        runner, url = await serve(handler)
+        pool = RpcPool([url])
+        try:
+            return await pool.is_connected(), pool.endpoints[0].head
+        finally:
+            await pool.stop()
+            await runner.cleanup()
+
+    assert asyncio.run(main()) == (True, 42)
+    assert calls == ["eth_blockNumber"] * 3
+
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from catalyst.metrics import NULL_METRICS
+from catalyst.mon_swap import TOKENS
+from catalyst.scheduler import Cron, ScheduledJob, Scheduler
+
+
+def at(*fields):
+    return datetime(*fields).timestamp()
+
+
+def next_run(expression, *start):
+    return datetime.fromtimestamp(Cron(expression).next_after(at(*start)))
+
+
+def test_restricted_day_of_month_and_day_of_week_match_on_either():
+    # 2026-02-06 and 2026-02-20 are Fridays, 2026-02-13 is a Friday the 13th
+    assert next_run("0 9 13 * 5", 2026, 2, 1) == datetime(2026, 2, 6, 9, 0)
+    assert next_run("0 9 13 * 5", 2026, 2, 6, 9, 0) == datetime(2026, 2, 13, 9, 0)
+    assert next_run("0 9 13 * 5", 2026, 2, 13, 9, 0) == datetime(2026, 2, 20, 9, 0)
+
+
+def test_unrestricted_day_field_does_not_widen_the_other():
+    assert next_run("0 9 13 * *", 2026, 2, 1) == datetime(2026, 2, 13, 9, 0)
+    assert next_run("0 9 * * 5", 2026, 2, 7) == datetime(2026, 2, 13, 9, 0)
+    # 0 and 7 both mean Sunday
+    assert next_run("0 12 * * 7", 2026, 2, 1) == datetime(2026, 2, 1, 12, 0)
+    assert next_run("0 12 * * 0", 2026, 2, 1) == datetime(2026, 2, 1, 12, 0)
+
+
+def test_month_rollover():
+    # April has no 31st
+    assert next_run("30 23 31 * *", 2026, 4, 1) == datetime(2026, 5, 31, 23, 30)
+    assert next_run("30 23 31 * *", 2026, 12, 31, 23, 45) == datetime(2027, 1, 31, 23, 30)
+    assert next_run("0 0 29 2 *", 2026, 3, 1) == datetime(2028, 2, 29, 0, 0)
+    assert next_run("59 23 * * *", 2026, 2, 28, 23, 59) == datetime(2026, 3, 1, 23, 59)
+
+
+def test_steps_ranges_and_lists():
+    assert next_run("*/15 * * * *", 2026, 2, 1, 10, 1) == datetime(2026, 2, 1, 10, 15)
+    assert next_run("5-10/5 8,20 * * *", 2026, 2, 1, 8, 10) == datetime(2026, 2, 1, 20, 5)
+    assert next_run("0 9 * * 1-5", 2026, 2, 6, 9, 0) == datetime(2026, 2, 9, 9, 0)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "5-1 * * * *", "*/0 * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        Cron(expression)
+
+
+def test_missed_interval_runs_are_made_up_once():
+    job = ScheduledJob({"name": "dca", "from": "MON", "to": "USDC", "amount": "1", "every": 60})
+    job.next_run = 1000
+    job.advance(1010, True)
+    assert job.next_run == 1060
+    # Stopped for ten intervals: one catch-up run now, then back on the interval
+    job.advance(1700, True)
+    assert job.next_run == 1760
+    assert job.runs == 2
+
+
+def test_condition_only_job_waits_for_its_cooldown():
+    job = ScheduledJob({"name": "dip", "from": "USDC", "to": "MON", "amount": "5", "above": 2, "cooldown": 120})
+    job.next_run = 0
+    assert not job.holds(1.5) and job.holds(2.5)
+    job.advance(500, False)
+    assert job.next_run == 0
+    job.advance(500, True)
+    assert job.next_run == 620
+
+
+class FlakyPool:
+    """A wallet pool whose first `failures` bursts raise before sending anything."""
+
+    def __init__(self, failures):
+        self.primary = type("Engine", (), {"metrics": NULL_METRICS})()
+        self.failures = failures
+
+    async def burst_swaps(self, orders):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("balance read failed")
+        return [(True, "0xab")] * len(orders)
+
+
+def scheduler(tmp_path, pool, rows):
+    jobs = [ScheduledJob({"name": "dca", "from": "MON", "to": "USDC", "amount": "1", "router": "1",
+                          "min_out": "0.5", "every": 60})]
+    token_decimals = {symbol: 18 for symbol in TOKENS}
+    return Scheduler(pool, jobs, token_decimals, rows.append, state_path=str(tmp_path / "schedule.json"),
+                     tick_seconds=0)
+
+
+def test_failed_burst_leaves_jobs_due(tmp_path):
+    rows = []
+    jobs = scheduler(tmp_path, FlakyPool(1), rows)
+    jobs.load_state(1000)
+    (job,) = jobs.jobs
+    asyncio.run(jobs.run_window(1000))
+    assert [(row["status"], row["error"]) for row in rows] == [("error", "Swap failed: balance read failed")]
+    assert job.next_run == 1000 and job.runs == 0
+    asyncio.run(jobs.run_window(1005))
+    assert rows[-1]["status"] == "success"
+    assert job.next_run == 1060
+
+
+def test_daemon_keeps_ticking_after_a_failed_window(tmp_path, monkeypatch):
+    rows = []
+    jobs = scheduler(tmp_path, FlakyPool(0), rows)
+    windows = []
+
+    async def run_window(now):
+        windows.append(now)
+        if len(windows) == 1:
+            raise RuntimeError("node went away")
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(jobs, "run_window", run_window)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(jobs.run())
+    assert len(windows) == 2
+    assert [(row["job"], row["status"], row["error"]) for row in rows] == [("dca", "error", "node went away")]